@@ -1,5 +1,6 @@
 import redis
 import json
+from typing import Optional
 from loguru import logger
 from app.core.config import settings
 
@@ -43,5 +44,44 @@ class RedisClient:
             except Exception as e:
                 logger.error(f"Redis Delete Error: {e}")
 
+    # --- Generic JSON values & locks (used by app.single_flight) ---
+
+    def get_json(self, key: str):
+        if self.client:
+            try:
+                data = self.client.get(key)
+                return json.loads(data) if data else None
+            except Exception as e:
+                logger.error(f"Redis Get Error: {e}")
+        return None
+
+    def set_json(self, key: str, data, expire: int = 60):
+        if self.client:
+            try:
+                self.client.set(key, json.dumps(data), ex=expire)
+            except Exception as e:
+                logger.error(f"Redis Set Error: {e}")
+
+    def acquire_lock(self, key: str, token: str, expire: int = 120) -> Optional[bool]:
+        """
+        SET NX with expiry: True if this caller now holds the lock, False if someone else does,
+        None if Redis couldn't be asked (callers shouldn't wait on a lock nobody can hold).
+        """
+        if self.client:
+            try:
+                return bool(self.client.set(key, token, nx=True, ex=expire))
+            except Exception as e:
+                logger.error(f"Redis Lock Error: {e}")
+        return None
+
+    def release_lock(self, key: str, token: str):
+        """Delete the lock only if it is still ours (it may have expired and been re-taken)."""
+        if self.client:
+            try:
+                if self.client.get(key) == token:
+                    self.client.delete(key)
+            except Exception as e:
+                logger.error(f"Redis Unlock Error: {e}")
+
 # Global instance
 redis_client = RedisClient()
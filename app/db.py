@@ -1,10 +1,16 @@
 from sqlalchemy.orm import Session
 from app.database import SessionLocal, engine, Base
-from app.models.models import Candidate, Recruiter, InterviewSession, InterviewMessage
+from app.models.models import Candidate, CandidateFeatures, CandidateMinHash, CandidateLshBand, CandidateSkill, Recruiter, InterviewSession, InterviewMessage, RoleTemplate
 import uuid
 import json
+import numpy as np
 from typing import List, Dict, Optional
 from datetime import datetime
+from sqlalchemy import func, distinct, select, case
+from app.skill_index import canonical_skill, canonical_skills
+
+# Stored without an LLM evaluation (two-stage cascade); their pre-rank score is relative to the upload
+SCREENED_OUT_STATUS = "Screened Out (Pre-rank)"
 
 # Initialize tables (auto-create if not exist for Dev simplicity, ideally use alembic upgrade head)
 # Base.metadata.create_all(bind=engine)
@@ -12,6 +18,18 @@ from datetime import datetime
 def get_db_session():
     return SessionLocal()
 
+# (table, column, DDL type) - columns added after the first release
+_COLUMN_MIGRATIONS = [
+    ("candidates", "interview_enabled", "BOOLEAN DEFAULT 1"),
+    ("upload_jobs", "interview_enabled", "BOOLEAN DEFAULT 1"),
+    ("upload_jobs", "metrics", "TEXT DEFAULT '{}'"),
+    ("interview_sessions", "llm_usage", "TEXT DEFAULT '{}'"),
+    ("candidates", "template_key", "VARCHAR"),
+    ("candidates", "upload_job_id", "VARCHAR"),
+    ("candidates", "prompt_text", "TEXT"),
+    ("candidates", "resume_threshold", "FLOAT"),
+]
+
 def run_migrations():
     """
     Lightweight auto-migration to add missing columns.
@@ -19,24 +37,25 @@ def run_migrations():
     session = get_db_session()
     try:
         from sqlalchemy import text
-        # Check Candidate table
+        for table, column, ddl in _COLUMN_MIGRATIONS:
+            try:
+                session.execute(text(f"SELECT {column} FROM {table} LIMIT 1"))
+            except Exception:
+                print(f"⚠️ Migration: Adding '{column}' to {table} table...")
+                session.rollback()
+                session.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+                session.commit()
+
+        # Tables created before the constraint existed
         try:
-            session.execute(text("SELECT interview_enabled FROM candidates LIMIT 1"))
-        except Exception:
-            print("⚠️ Migration: Adding 'interview_enabled' to candidates table...")
-            session.rollback()
-            session.execute(text("ALTER TABLE candidates ADD COLUMN interview_enabled BOOLEAN DEFAULT 1"))
+            session.execute(text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_role_templates_key_recruiter ON role_templates (key, recruiter_username)"
+            ))
             session.commit()
-            
-        # Check UploadJob table
-        try:
-            session.execute(text("SELECT interview_enabled FROM upload_jobs LIMIT 1"))
-        except Exception:
-            print("⚠️ Migration: Adding 'interview_enabled' to upload_jobs table...")
+        except Exception as e:
             session.rollback()
-            session.execute(text("ALTER TABLE upload_jobs ADD COLUMN interview_enabled BOOLEAN DEFAULT 1"))
-            session.commit()
-            
+            print(f"⚠️ Migration: role_templates has duplicate (key, recruiter) rows, unique index not created: {e}")
+
     except Exception as e:
         print(f"Migration Error: {e}")
     finally:
@@ -46,6 +65,9 @@ def init_db():
     # In production, use Alembic. For now, we can ensure tables exist.
     Base.metadata.create_all(bind=engine)
     run_migrations() # Run auto-migration
+    from app.fulltext import setup_fulltext
+    setup_fulltext()
+    backfill_candidate_skills()
     print("✅ Database initialized (SQLAlchemy)")
 
 def clear_db():
@@ -53,6 +75,10 @@ def clear_db():
     try:
         session.query(InterviewMessage).delete()
         session.query(InterviewSession).delete()
+        session.query(CandidateFeatures).delete()
+        session.query(CandidateSkill).delete()
+        session.query(CandidateLshBand).delete()
+        session.query(CandidateMinHash).delete()
         session.query(Candidate).delete()
         session.commit()
     except Exception as e:
@@ -63,7 +89,7 @@ def clear_db():
 
 # --- Candidate Functions ---
 
-def add_candidate(name: str, resume_text: str, jd: str, match_score: float, matched_skills: list, missing_skills: list, resume_evaluation: dict = {}, status: str = "Matched", recruiter_username: str = None, interview_enabled: bool = True, final_score: float = 0.0) -> str:
+def add_candidate(name: str, resume_text: str, jd: str, match_score: float, matched_skills: list, missing_skills: list, resume_evaluation: dict = {}, status: str = "Matched", recruiter_username: str = None, interview_enabled: bool = True, final_score: float = 0.0, template_key: str = None, upload_job_id: str = None, prompt_text: str = None, features: dict = None, minhash=None, resume_threshold: float = None) -> str:
     session = get_db_session()
     try:
         cid = str(uuid.uuid4())
@@ -71,6 +97,7 @@ def add_candidate(name: str, resume_text: str, jd: str, match_score: float, matc
             id=cid,
             name=name,
             resume_text=resume_text,
+            prompt_text=prompt_text,
             job_description=jd,
             match_score=match_score,
             status=status,
@@ -81,9 +108,17 @@ def add_candidate(name: str, resume_text: str, jd: str, match_score: float, matc
             interview_enabled=interview_enabled,
             interview_score=0.0,
             final_score=final_score,
-            feedback_data="{}"
+            feedback_data="{}",
+            template_key=template_key,
+            upload_job_id=upload_job_id,
+            resume_threshold=resume_threshold
         )
         session.add(new_candidate)
+        if features:
+            session.add(_features_row(cid, features))
+        if minhash is not None:
+            session.add_all(_minhash_rows(cid, minhash))
+        session.add_all(_skill_rows(cid, recruiter_username, (features or {}).get("skills", []) + list(matched_skills or [])))
         session.commit()
         return cid
     except Exception as e:
@@ -103,13 +138,30 @@ def get_candidate(cid: str) -> Optional[Dict]:
     finally:
         session.close()
 
-def get_leaderboard(recruiter_username: str = None) -> List[Dict]:
+def get_leaderboard(recruiter_username: str = None, min_years: float = None, min_degree_level: int = None, skill: str = None) -> List[Dict]:
     session = get_db_session()
     try:
-        query = session.query(Candidate).order_by(Candidate.final_score.desc(), Candidate.match_score.desc())
+        # Screened-out candidates were never scored on the same scale: always after the evaluated ones
+        query = session.query(Candidate).order_by(
+            case((Candidate.status == SCREENED_OUT_STATUS, 1), else_=0),
+            Candidate.final_score.desc(), Candidate.match_score.desc()
+        )
         
         if recruiter_username:
              query = query.filter(Candidate.recruiter_username == recruiter_username)
+
+        # Filters on the ingest-time features (candidates without a features row are excluded)
+        if min_years is not None or min_degree_level is not None:
+             query = query.join(CandidateFeatures, CandidateFeatures.candidate_id == Candidate.id)
+             if min_years is not None:
+                 query = query.filter(CandidateFeatures.total_years >= min_years)
+             if min_degree_level is not None:
+                 query = query.filter(CandidateFeatures.degree_level >= min_degree_level)
+        if skill:
+             # Inverted skill index, canonical names ("JS" finds "JavaScript")
+             query = query.filter(Candidate.id.in_(
+                 select(CandidateSkill.candidate_id).where(CandidateSkill.skill == canonical_skill(skill))
+             ))
              
         candidates = query.all()
         return [{k: v for k, v in c.__dict__.items() if not k.startswith('_')} for c in candidates]
@@ -159,10 +211,180 @@ def flag_candidate(cid: str, violation: str) -> int:
     finally:
         session.close()
 
+def get_candidates_for_rescore(recruiter_username: str, upload_job_id: str = None) -> List[Dict]:
+    """Only the columns rescoring needs, for a recruiter's pool (optionally one upload)."""
+    session = get_db_session()
+    try:
+        query = session.query(
+            Candidate.id, Candidate.status, Candidate.interview_enabled, Candidate.interview_score,
+            Candidate.template_key, Candidate.resume_threshold, Candidate.resume_evaluation_data
+        ).filter(Candidate.recruiter_username == recruiter_username)
+        if upload_job_id:
+            query = query.filter(Candidate.upload_job_id == upload_job_id)
+        return [row._asdict() for row in query.all()]
+    finally:
+        session.close()
+
+def get_candidate_ids(recruiter_username: str = None, among: List[str] = None) -> List[str]:
+    """Candidate ids (optionally one recruiter's, optionally restricted to `among`)."""
+    session = get_db_session()
+    try:
+        query = session.query(Candidate.id)
+        if recruiter_username:
+            query = query.filter(Candidate.recruiter_username == recruiter_username)
+        if among is None:
+            return [row.id for row in query.all()]
+        found = []
+        for i in range(0, len(among), 500):
+            found += [row.id for row in query.filter(Candidate.id.in_(among[i:i + 500])).all()]
+        return found
+    finally:
+        session.close()
+
+def get_candidate_summaries(ids: List[str]) -> Dict[str, Dict]:
+    """candidate_id -> lightweight summary (no resume text / evaluation JSON), chunked IN queries."""
+    session = get_db_session()
+    try:
+        summaries = {}
+        for i in range(0, len(ids), 500):
+            rows = session.query(
+                Candidate.id, Candidate.name, Candidate.status, Candidate.match_score, Candidate.final_score,
+                Candidate.upload_job_id, CandidateFeatures.total_years, CandidateFeatures.degree_level
+            ).outerjoin(CandidateFeatures, CandidateFeatures.candidate_id == Candidate.id).filter(
+                Candidate.id.in_(ids[i:i + 500])
+            ).all()
+            summaries.update({row.id: row._asdict() for row in rows})
+        return summaries
+    finally:
+        session.close()
+
+def get_resume_texts(ids: List[str]) -> Dict[str, str]:
+    """candidate_id -> resume_text for just these ids (chunked IN queries)."""
+    session = get_db_session()
+    try:
+        texts = {}
+        for i in range(0, len(ids), 500):
+            rows = session.query(Candidate.id, Candidate.resume_text).filter(Candidate.id.in_(ids[i:i + 500])).all()
+            texts.update({row.id: row.resume_text or "" for row in rows})
+        return texts
+    finally:
+        session.close()
+
+def bulk_update_candidates(mappings: List[Dict]) -> int:
+    """Primary-key bulk UPDATE; each mapping holds "id" plus the columns to set."""
+    if not mappings:
+        return 0
+    session = get_db_session()
+    try:
+        session.bulk_update_mappings(Candidate, mappings)
+        session.commit()
+        return len(mappings)
+    except Exception as e:
+        session.rollback()
+        print(f"DB Error bulk_update_candidates: {e}")
+        raise e
+    finally:
+        session.close()
+
+# --- Candidate Feature Functions ---
+
+def _features_row(cid: str, features: dict) -> CandidateFeatures:
+    return CandidateFeatures(
+        candidate_id=cid,
+        email=features.get("email") or None,
+        phone=features.get("phone") or None,
+        skills=json.dumps(features.get("skills", [])),
+        education=json.dumps(features.get("education", [])),
+        experience=json.dumps(features.get("experience", [])),
+        total_years=features.get("total_years", 0.0),
+        degree_level=features.get("degree_level", 1)
+    )
+
+def save_candidate_features(cid: str, features: dict):
+    session = get_db_session()
+    try:
+        session.merge(_features_row(cid, features))
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        print(f"DB Error save_candidate_features: {e}")
+    finally:
+        session.close()
+
+def get_candidate_features(cid: str) -> Optional[Dict]:
+    session = get_db_session()
+    try:
+        row = session.query(CandidateFeatures).filter(CandidateFeatures.candidate_id == cid).first()
+        if not row:
+            return None
+        data = {k: v for k, v in row.__dict__.items() if not k.startswith('_')}
+        for key in ("skills", "education", "experience"):
+            data[key] = json.loads(data[key] or "[]")
+        return data
+    finally:
+        session.close()
+
+# --- Role Template Functions ---
+
+def _template_dict(t: RoleTemplate) -> Dict:
+    return {
+        "key": t.key,
+        "recruiter_username": t.recruiter_username,
+        "parameters": json.loads(t.parameters or "{}"),
+        "thresholds": json.loads(t.thresholds or "{}"),
+        "updated_at": t.updated_at,
+    }
+
+def get_role_template_db(key: str, recruiter_username: str = None) -> Optional[Dict]:
+    """Recruiter's own template for `key`, else the shared (recruiter-less) one, else None."""
+    session = get_db_session()
+    try:
+        rows = session.query(RoleTemplate).filter(
+            RoleTemplate.key == key,
+            (RoleTemplate.recruiter_username == recruiter_username) | (RoleTemplate.recruiter_username.is_(None))
+        ).all()
+        own = [t for t in rows if recruiter_username and t.recruiter_username == recruiter_username]
+        chosen = (own or rows or [None])[0]
+        return _template_dict(chosen) if chosen else None
+    finally:
+        session.close()
+
+def list_role_templates_db(recruiter_username: str = None) -> List[Dict]:
+    session = get_db_session()
+    try:
+        rows = session.query(RoleTemplate).filter(
+            (RoleTemplate.recruiter_username == recruiter_username) | (RoleTemplate.recruiter_username.is_(None))
+        ).all()
+        return [_template_dict(t) for t in rows]
+    finally:
+        session.close()
+
+def upsert_role_template(key: str, parameters: dict, thresholds: dict, recruiter_username: str = None) -> Dict:
+    session = get_db_session()
+    try:
+        template = session.query(RoleTemplate).filter(
+            RoleTemplate.key == key,
+            RoleTemplate.recruiter_username.is_(None) if recruiter_username is None else RoleTemplate.recruiter_username == recruiter_username
+        ).first()
+        if not template:
+            template = RoleTemplate(key=key, recruiter_username=recruiter_username)
+            session.add(template)
+        template.parameters = json.dumps(parameters)
+        template.thresholds = json.dumps(thresholds)
+        session.commit()
+        session.refresh(template)
+        return _template_dict(template)
+    except Exception as e:
+        session.rollback()
+        print(f"DB Error upsert_role_template: {e}")
+        raise e
+    finally:
+        session.close()
+
 
 # --- Session Functions ---
 
-def save_session_db(session_id: str, candidate_id: str, role: str, is_active: bool = True):
+def save_session_db(session_id: str, candidate_id: str, role: str, is_active: bool = True, llm_usage: dict = None):
     session = get_db_session()
     try:
         # Check if exists (upsert)
@@ -171,6 +393,8 @@ def save_session_db(session_id: str, candidate_id: str, role: str, is_active: bo
             existing.candidate_id = candidate_id
             existing.role = role
             existing.is_active = is_active
+            if llm_usage is not None:
+                existing.llm_usage = json.dumps(llm_usage)
         else:
             new_sess = InterviewSession(
                 session_id=session_id,
@@ -178,7 +402,8 @@ def save_session_db(session_id: str, candidate_id: str, role: str, is_active: bo
                 role=role,
                 is_active=is_active,
                 current_question="",
-                scores="[]"
+                scores="[]",
+                llm_usage=json.dumps(llm_usage or {})
             )
             session.add(new_sess)
         session.commit()
@@ -198,7 +423,7 @@ def get_session_db(session_id: str):
     finally:
         session.close()
 
-def update_session_db(session_id: str, current_question: str, scores: list, is_active: bool):
+def update_session_db(session_id: str, current_question: str, scores: list, is_active: bool, llm_usage: dict = None):
     session = get_db_session()
     try:
         sess = session.query(InterviewSession).filter(InterviewSession.session_id == session_id).first()
@@ -206,6 +431,8 @@ def update_session_db(session_id: str, current_question: str, scores: list, is_a
             sess.current_question = current_question
             sess.scores = json.dumps(scores)
             sess.is_active = is_active
+            if llm_usage is not None:
+                sess.llm_usage = json.dumps(llm_usage)
             session.commit()
     except Exception as e:
         session.rollback()
@@ -306,3 +533,103 @@ def get_user_by_token(token: str) -> Optional[str]:
         return None
     finally:
         session.close()
+
+# --- Near-duplicate signatures (see app.near_duplicates) ---
+
+def _minhash_rows(cid: str, signature) -> list:
+    from app.near_duplicates import band_keys
+    return [CandidateMinHash(candidate_id=cid, signature=np.asarray(signature, dtype=np.uint32).tobytes())] + [
+        CandidateLshBand(band_key=key, candidate_id=cid) for key in set(band_keys(signature))
+    ]
+
+def get_minhash_matches(band_keys: List[str], recruiter_username: str = None, job_description: str = None) -> Dict[str, tuple]:
+    """candidate_id -> (band keys it shares with `band_keys`, signature) for a recruiter's candidates (for one JD)."""
+    session = get_db_session()
+    try:
+        shared: Dict[str, list] = {}
+        for i in range(0, len(band_keys), 500):
+            query = session.query(CandidateLshBand.candidate_id, CandidateLshBand.band_key).filter(
+                CandidateLshBand.band_key.in_(band_keys[i:i + 500])
+            )
+            if recruiter_username or job_description is not None:
+                query = query.join(Candidate, Candidate.id == CandidateLshBand.candidate_id)
+            if recruiter_username:
+                query = query.filter(Candidate.recruiter_username == recruiter_username)
+            if job_description is not None:
+                query = query.filter(Candidate.job_description == job_description)
+            for row in query.all():
+                shared.setdefault(row.candidate_id, []).append(row.band_key)
+        ids = list(shared)
+        matches = {}
+        for i in range(0, len(ids), 500):
+            for row in session.query(CandidateMinHash).filter(CandidateMinHash.candidate_id.in_(ids[i:i + 500])).all():
+                matches[row.candidate_id] = (shared[row.candidate_id], np.frombuffer(row.signature, dtype=np.uint32))
+        return matches
+    finally:
+        session.close()
+
+# --- Inverted skill index (see app.skill_index) ---
+
+def _skill_rows(cid: str, recruiter_username: str, skills: List[str]) -> List[CandidateSkill]:
+    """A candidate's skills: listed in the resume (features) plus JD skills it matched."""
+    return [CandidateSkill(candidate_id=cid, recruiter_username=recruiter_username, skill=s) for s in canonical_skills(skills)]
+
+def backfill_candidate_skills() -> int:
+    """Index candidates ingested before the skill index existed (no-op once it has rows)."""
+    session = get_db_session()
+    try:
+        if session.query(CandidateSkill.id).first() is not None:
+            return 0
+        rows = session.query(
+            Candidate.id, Candidate.recruiter_username, Candidate.matched_skills, CandidateFeatures.skills
+        ).outerjoin(CandidateFeatures, CandidateFeatures.candidate_id == Candidate.id).all()
+        added = 0
+        for row in rows:
+            skills = json.loads(row.skills or "[]") + json.loads(row.matched_skills or "[]")
+            new_rows = _skill_rows(row.id, row.recruiter_username, skills)
+            session.add_all(new_rows)
+            added += len(new_rows)
+        session.commit()
+        return added
+    except Exception as e:
+        session.rollback()
+        print(f"Error backfilling skill index: {e}")
+        return 0
+    finally:
+        session.close()
+
+def skill_facets(recruiter_username: str, has: List[str] = None, lacks: List[str] = None, facet_limit: int = 30) -> Dict:
+    """
+    Candidates of a recruiter having every skill in `has` and none in `lacks`, and how many of
+    them have each skill - set operations over the (recruiter, skill) index, no JSON parsing.
+    """
+    has, lacks = canonical_skills(has or []), canonical_skills(lacks or [])
+    session = get_db_session()
+    try:
+        if has:
+            matching = select(CandidateSkill.candidate_id).where(
+                CandidateSkill.recruiter_username == recruiter_username, CandidateSkill.skill.in_(has)
+            ).group_by(CandidateSkill.candidate_id).having(func.count(distinct(CandidateSkill.skill)) == len(has))
+        else:
+            matching = select(Candidate.id.label("candidate_id")).where(Candidate.recruiter_username == recruiter_username)
+        if lacks:
+            matching = matching.except_(select(CandidateSkill.candidate_id).where(
+                CandidateSkill.recruiter_username == recruiter_username, CandidateSkill.skill.in_(lacks)
+            ))
+        matching = matching.subquery()
+
+        ids = [row[0] for row in session.execute(select(matching.c.candidate_id))]
+        counts = session.execute(
+            select(CandidateSkill.skill, func.count().label("count")).where(
+                CandidateSkill.recruiter_username == recruiter_username,
+                CandidateSkill.candidate_id.in_(select(matching.c.candidate_id))
+            ).group_by(CandidateSkill.skill).order_by(func.count().desc(), CandidateSkill.skill).limit(facet_limit)
+        ).all()
+        return {
+            "filters": {"has": has, "lacks": lacks},
+            "total": len(ids),
+            "candidate_ids": ids,
+            "facets": [{"skill": skill, "count": count} for skill, count in counts],
+        }
+    finally:
+        session.close()
@@ -0,0 +1,207 @@
+"""
+Persistent resume embeddings, shared by every worker through memory-mapped files.
+
+One directory per encoder under EMBEDDING_STORE_DIR (default data/embeddings):
+    vectors.f16   raw float16 matrix, one row per entry, appended on insert
+    ids.tsv       "<candidate_id>\t<content_hash>" per row, appended after its vector
+Chunk embeddings (app.utils.chunk_text) use a sibling "<encoder>.chunks" store where each
+candidate's chunks are appended together, so they form one contiguous block of rows.
+
+Readers map vectors.f16 with np.memmap(mode="r"), so gunicorn workers share the page cache
+and opening the store costs the same whatever the candidate count; the id table is the
+source of truth for the row count (a vector is always written before its id). Appends and
+clears take an exclusive flock, reads a shared one. Rows are never rewritten: deleted
+candidates are filtered by callers, and `clear()` drops the whole store and writes a new
+`epoch`; every reader that sees a different epoch (or a shorter id file) discards what it
+had read and starts over, and callers holding derived state compare `generation()`.
+"""
+import fcntl
+import hashlib
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+CHUNK_ROWS = 8192  # rows upcast to float32 at a time when scoring
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+
+def store_root() -> str:
+    return os.getenv("EMBEDDING_STORE_DIR", "data/embeddings")
+
+
+class EmbeddingStore:
+    def __init__(self, directory: str, dim: int):
+        self.directory = directory
+        self.dim = dim
+        self._vectors_path = os.path.join(directory, "vectors.f16")
+        self._ids_path = os.path.join(directory, "ids.tsv")
+        self._lock = threading.Lock()
+        self._ids: List[str] = []
+        self._hashes: List[str] = []
+        self._ids_offset = 0  # bytes of ids.tsv already read
+        self._ranges: Dict[str, Tuple[int, int, str]] = {}  # candidate_id -> (start, stop, hash) of its latest block
+        self._block_start = 0
+        self._matrix: Optional[np.memmap] = None
+        self._epoch_path = os.path.join(directory, "epoch")
+        self._epoch = ""
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def _file_lock(self, shared: bool = False):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, ".lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_epoch(self) -> str:
+        try:
+            with open(self._epoch_path, encoding="utf-8") as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return ""
+
+    def _reset(self):
+        self._ids, self._hashes, self._ids_offset, self._matrix = [], [], 0, None
+        self._ranges, self._block_start = {}, 0
+
+    def _refresh(self):
+        """Pick up rows appended since the last read (by this or another process); start over after a clear."""
+        with self._file_lock(shared=True):
+            self._refresh_locked()
+
+    def _refresh_locked(self):
+        epoch = self._read_epoch()
+        size = os.path.getsize(self._ids_path) if os.path.exists(self._ids_path) else 0
+        if epoch != self._epoch or size < self._ids_offset:
+            self._reset()
+            self._epoch = epoch
+        if not size:
+            return
+        if size > self._ids_offset:
+            with open(self._ids_path, "rb") as f:
+                f.seek(self._ids_offset)
+                data = f.read()
+            complete = data[:data.rfind(b"\n") + 1]  # ignore a half-written last line
+            for line in complete.decode("utf-8").splitlines():
+                cid, _, digest = line.partition("\t")
+                row = len(self._ids)
+                if not row or (self._ids[-1], self._hashes[-1]) != (cid, digest):
+                    self._block_start = row
+                self._ranges[cid] = (self._block_start, row + 1, digest)
+                self._ids.append(cid)
+                self._hashes.append(digest)
+            self._ids_offset += len(complete)
+        if self._ids and (self._matrix is None or len(self._matrix) != len(self._ids)):
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float16, mode="r", shape=(len(self._ids), self.dim))
+
+    def snapshot(self) -> Tuple[List[str], List[str], np.ndarray]:
+        """(ids, content hashes, read-only (n, dim) float16 memmap)."""
+        with self._lock:
+            self._refresh()
+            matrix = self._matrix if self._matrix is not None else np.zeros((0, self.dim), dtype=np.float16)
+            return list(self._ids), list(self._hashes), matrix
+
+    def __len__(self) -> int:
+        return len(self.snapshot()[0])
+
+    def generation(self) -> str:
+        """Changes whenever any process clears the store."""
+        with self._lock:
+            self._refresh()
+            return self._epoch
+
+    def blocks(self) -> Tuple[Dict[str, Tuple[int, int, str]], np.ndarray]:
+        """(candidate_id -> (start, stop, content hash) of its latest run of rows, matrix)."""
+        with self._lock:
+            self._refresh()
+            matrix = self._matrix if self._matrix is not None else np.zeros((0, self.dim), dtype=np.float16)
+            return dict(self._ranges), matrix
+
+    def rows_for(self, ids: List[str]) -> List[Optional[int]]:
+        """Row of each id's latest vector (None if not stored)."""
+        with self._lock:
+            self._refresh()
+            return [self._ranges[cid][1] - 1 if cid in self._ranges else None for cid in ids]
+
+    def known(self) -> Dict[str, str]:
+        """candidate_id -> content hash (latest row wins)."""
+        ids, hashes, _ = self.snapshot()
+        return dict(zip(ids, hashes))
+
+    def add(self, ids: List[str], hashes: List[str], vectors: np.ndarray) -> int:
+        if not ids:
+            return 0
+        vectors = np.asarray(vectors, dtype=np.float16).reshape(len(ids), self.dim)
+        with self._lock, self._file_lock():
+            # Sync first: if another process cleared the store, ids.tsv must restart at row 0
+            self._refresh_locked()
+            with open(self._vectors_path, "ab") as f:
+                f.write(vectors.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self._ids_path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{cid}\t{digest}\n" for cid, digest in zip(ids, hashes)))
+        return len(ids)
+
+    def similarities(self, query: np.ndarray, matrix: Optional[np.ndarray] = None) -> np.ndarray:
+        """Cosine similarity of one normalized query against every stored row, in float32 chunks."""
+        if matrix is None:
+            matrix = self.snapshot()[2]
+        query = np.asarray(query, dtype=np.float32)
+        out = np.empty(len(matrix), dtype=np.float32)
+        for start in range(0, len(matrix), CHUNK_ROWS):
+            out[start:start + CHUNK_ROWS] = np.asarray(matrix[start:start + CHUNK_ROWS], dtype=np.float32) @ query
+        return out
+
+    def clear(self):
+        with self._lock, self._file_lock():
+            for path in (self._vectors_path, self._ids_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._reset()
+            self._epoch = uuid.uuid4().hex
+            with open(self._epoch_path, "w", encoding="utf-8") as f:
+                f.write(self._epoch)
+
+
+_stores: Dict[Tuple[str, str, str], EmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(encoder, kind: str = "") -> EmbeddingStore:
+    """Store for vectors of `encoder` (one directory per encoder name, plus `kind` e.g. "chunks")."""
+    root = store_root()
+    key = (root, encoder.name, kind)
+    with _stores_lock:
+        if key not in _stores:
+            safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in encoder.name)
+            _stores[key] = EmbeddingStore(os.path.join(root, f"{safe_name}.{kind}" if kind else safe_name), encoder.dim)
+        return _stores[key]
+
+
+def clear_stores():
+    """
+    Clear every store under the root (used when the candidate table is cleared). Directories
+    stay in place with a new epoch, so other workers' open stores notice and reload.
+    """
+    root = store_root()
+    with _stores_lock:
+        for (store_dir_root, _, _), store in _stores.items():
+            if store_dir_root == root:
+                store.clear()
+        cleared = {store.directory for store in _stores.values()}
+    if os.path.isdir(root):
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            if os.path.isdir(path) and path not in cleared:
+                EmbeddingStore(path, 1).clear()
@@ -1,76 +1,281 @@
-# from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+"""
+Resume embeddings: storage, duplicate checks and JD similarity.
+
+Resume vectors live in the persistent embedding store (app.embedding_store), appended at
+ingest, together with per-chunk vectors (app.utils.chunk_text). JD similarity pools the
+chunk x JD similarities of each resume, so a long resume is scored on its best-matching
+sections rather than on one diluted whole-document vector.
+
+Env:
+    DUPLICATE_THRESHOLD   Cosine similarity at which a resume is flagged as a duplicate (default 0.90)
+    SEMANTIC_POOLING      topk | max | document (default topk: mean of the best SEMANTIC_TOP_K chunks)
+    SEMANTIC_TOP_K        Chunks averaged by topk pooling (default 3)
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
 import numpy as np
 
-# Global model - DISABLED for Virex Logic (and to fix timeout error)
-# model = SentenceTransformer("all-MiniLM-L6-v2")
-
-class DummyModel:
-    def encode(self, texts):
-        # Return dummy zero embeddings of shape (len(texts), 384)
-        if isinstance(texts, str):
-            texts = [texts]
-        # 384 is typical BERT dim
-        return np.zeros((len(texts), 384))
-
-model = DummyModel()
-
-# In-memory storage for duplicates (list of dicts or embeddings)
-# We store embeddings as a numpy array for speed if possible, but list is fine for small scale.
-# Format: {'id': str, 'embedding': np.array}
-_known_embeddings = []
-_embeddings_loaded = False
-
-def get_known_embeddings():
-    global _embeddings_loaded, _known_embeddings
-    if not _embeddings_loaded:
-        _load_embeddings_lazy()
-    return _known_embeddings
-
-def _load_embeddings_lazy():
-    global _embeddings_loaded, _known_embeddings
-    # Avoid circular imports
-    from app.db import get_leaderboard
-    
-    # print("⏳ Lazy loading embeddings...")
-    candidates = get_leaderboard()
-    texts = [c['resume_text'] for c in candidates if c.get('resume_text')]
-    
-    if texts:
-        embeddings = model.encode(texts)
-        _known_embeddings = list(embeddings)
-    
-    _embeddings_loaded = True
-    # print("✅ Embeddings loaded.")
+from app.encoders import encode, get_encoder, on_encoder_thread
+from app.embedding_store import clear_stores, content_hash, get_store
+from app.utils import chunk_text
+from app.vector_index import vector_index
+
+CHUNKS = "chunks"  # embedding-store kind for per-chunk vectors
+
+# Texts checked for duplicates but never stored are kept here for the process lifetime.
+_runtime_embeddings = {}  # encoder name -> list of vectors
+_synced_encoders = {}  # encoder name -> store generation it was synced against
+_sync_lock = threading.Lock()
+# (encoder name, JD content hash) -> JD vector; scoring a whole pool encodes the JD once
+_jd_vectors: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+_jd_lock = threading.Lock()
+JD_CACHE_SIZE = 64
+
+def _unstored(store, ids: List[str], texts: List[str]):
+    """(ids, hashes, texts) of the rows whose current content is not in the store yet."""
+    known = store.known()
+    rows = [(cid, content_hash(t), t) for cid, t in zip(ids, texts)]
+    rows = [r for r in rows if known.get(r[0]) != r[1]]
+    return [list(col) for col in zip(*rows)] if rows else ([], [], [])
+
+def index_candidates(ids: List[str], texts: List[str], encoder=None) -> int:
+    """Encode and append candidates to the store (skips rows whose content is already stored)."""
+    encoder = encoder or get_encoder()
+    store = get_store(encoder)
+    ids, hashes, texts = _unstored(store, ids, texts)
+    return store.add(ids, hashes, encode(texts, encoder)) if ids else 0
+
+def store_candidate_vectors(ids: List[str], texts: List[str], vectors: np.ndarray, encoder, recruiter_username: str = None, chunk_vectors: List[np.ndarray] = None) -> int:
+    """Persist already-encoded candidates (and their chunks) and add them to the loaded vector index partitions."""
+    if not ids:
+        return 0
+    hashes = [content_hash(t) for t in texts]
+    added = get_store(encoder).add(ids, hashes, vectors)
+    if chunk_vectors is not None:
+        _store_chunks(ids, hashes, chunk_vectors, encoder)
+    vector_index.add(recruiter_username, ids, vectors, encoder)
+    return added
+
+def _store_chunks(ids: List[str], hashes: List[str], chunk_vectors: List[np.ndarray], encoder):
+    rows = [(cid, h) for cid, h, m in zip(ids, hashes, chunk_vectors) for _ in range(len(m))]
+    if rows:
+        # One append: each candidate's chunks stay one contiguous block
+        get_store(encoder, CHUNKS).add([r[0] for r in rows], [r[1] for r in rows], np.vstack(chunk_vectors))
+
+def encode_chunks(texts: List[str], encoder=None) -> List[np.ndarray]:
+    """(n_chunks, dim) matrix per text; every chunk of every text goes through one batched encode."""
+    encoder = encoder or get_encoder()
+    chunks = [list(chunk_text(t)) for t in texts]
+    flat = encode([c for cs in chunks for c in cs], encoder) if any(chunks) else np.zeros((0, encoder.dim), dtype=np.float32)
+    bounds = np.cumsum([0] + [len(cs) for cs in chunks])
+    return [flat[start:stop] for start, stop in zip(bounds, bounds[1:])]
+
+async def encode_chunks_async(texts: List[str], encoder=None) -> List[np.ndarray]:
+    """encode_chunks() on the encoder thread, off the event loop."""
+    return await on_encoder_thread(encode_chunks, list(texts), encoder or get_encoder())
+
+def candidate_chunks(ids: List[str], texts: List[str], encoder=None) -> List[np.ndarray]:
+    """
+    Chunk matrices of stored candidates, read as one contiguous block each from the chunk store;
+    candidates without chunks for their current text are encoded and appended once.
+    """
+    encoder = encoder or get_encoder()
+    store = get_store(encoder, CHUNKS)
+    blocks, matrix = store.blocks()
+    hashes = [content_hash(t) for t in texts]
+    out: List[Optional[np.ndarray]] = []
+    missing = []
+    for i, (cid, digest) in enumerate(zip(ids, hashes)):
+        block = blocks.get(cid)
+        if block and block[2] == digest:
+            out.append(np.asarray(matrix[block[0]:block[1]], dtype=np.float32))
+        else:
+            out.append(None)
+            missing.append(i)
+    if missing:
+        fresh = encode_chunks([texts[i] for i in missing], encoder)
+        _store_chunks([ids[i] for i in missing], [hashes[i] for i in missing], fresh, encoder)
+        for i, m in zip(missing, fresh):
+            out[i] = m
+    return out
+
+def duplicate_threshold() -> float:
+    return float(os.getenv("DUPLICATE_THRESHOLD", "0.90"))
+
+def find_duplicates(recruiter_username: str, vectors: np.ndarray, encoder, threshold: float = 0.90) -> List[Optional[Tuple[str, float]]]:
+    """
+    For each row of an upload: (candidate_id, similarity) of the closest existing candidate in
+    the recruiter's pool, or of an earlier resume in the same upload ("upload:<row>"), when the
+    similarity exceeds `threshold`; else None. One batch search for the whole upload.
+    """
+    if not len(vectors):
+        return []
+    sync_store(encoder)
+    nearest = vector_index.search(recruiter_username, vectors, encoder, k=1)
+    within = np.triu(vectors @ vectors.T, k=1)  # row i vs later rows j
+    found = []
+    for j, hits in enumerate(nearest):
+        best = hits[0] if hits and hits[0][1] > threshold else None
+        earlier = within[:j, j]
+        if len(earlier) and earlier.max() > threshold and (best is None or earlier.max() > best[1]):
+            best = (f"upload:{int(earlier.argmax())}", float(earlier.max()))
+        found.append(best)
+    return found
+
+def search_candidates(recruiter_username: str, query: str, k: int = 10, encoder=None) -> List[Tuple[str, float]]:
+    """Top-k (candidate_id, cosine) of a recruiter's pool for a free-text query (a JD, a skill description)."""
+    encoder = encoder or get_encoder()
+    if not query or not query.strip():
+        return []
+    sync_store(encoder)
+    return vector_index.search(recruiter_username, jd_vector(query, encoder)[None, :], encoder, k=k)[0]
+
+def sync_store(encoder=None) -> int:
+    """
+    Backfill candidates missing from the store (rows ingested before it existed, or a newly
+    loaded encoder). Only ids are read for the whole table; texts only for missing rows.
+    Runs once per encoder per process and store generation (again after any worker clears
+    it); afterwards ingest keeps the store current.
+    """
+    encoder = encoder or get_encoder()
+    with _sync_lock:
+        store = get_store(encoder)
+        generation = store.generation()
+        if _synced_encoders.get(encoder.name) == generation:
+            return 0
+        # Avoid circular imports
+        from app.db import get_candidate_ids, get_resume_texts
+
+        stored = store.known()
+        missing = [cid for cid in get_candidate_ids() if cid not in stored]
+        added = 0
+        for i in range(0, len(missing), 500):
+            texts = get_resume_texts(missing[i:i + 500])
+            ids = [cid for cid in missing[i:i + 500] if texts.get(cid)]
+            added += index_candidates(ids, [texts[cid] for cid in ids], encoder)
+        _synced_encoders[encoder.name] = generation
+        return added
+
+def reset_embeddings():
+    """Drop stored vectors, loaded index partitions and runtime vectors (candidate table cleared)."""
+    with _sync_lock:
+        clear_stores()
+        vector_index.reset()
+        _synced_encoders.clear()
+        _runtime_embeddings.clear()
+
+def get_known_embeddings(encoder=None) -> np.ndarray:
+    """Stored resume vectors (memory-mapped, float16) for the active encoder."""
+    encoder = encoder or get_encoder()
+    sync_store(encoder)
+    return get_store(encoder).snapshot()[2]
+
+def jd_vector(jd_text: str, encoder=None) -> np.ndarray:
+    """Encoded JD, cached by encoder and content hash (LRU, JD_CACHE_SIZE entries)."""
+    encoder = encoder or get_encoder()
+    key = (encoder.name, content_hash(jd_text))
+    with _jd_lock:
+        if key in _jd_vectors:
+            _jd_vectors.move_to_end(key)
+            return _jd_vectors[key]
+    vector = encode([jd_text], encoder)[0]
+    with _jd_lock:
+        _jd_vectors[key] = vector
+        while len(_jd_vectors) > JD_CACHE_SIZE:
+            _jd_vectors.popitem(last=False)
+    return vector
+
+def semantic_pooling() -> str:
+    return os.getenv("SEMANTIC_POOLING", "topk").strip().lower()
+
+def pool_similarities(query: np.ndarray, chunk_vectors: List[np.ndarray], pooling: str = "topk", k: int = 3) -> np.ndarray:
+    """
+    Per resume, the max ("max") or the mean of the best k ("topk") chunk x query similarities;
+    0 for a resume without chunks. All chunks go through one product, then a padded
+    (resumes, max chunks) matrix is reduced row-wise.
+    """
+    lengths = np.array([len(m) for m in chunk_vectors], dtype=np.int64)
+    out = np.zeros(len(chunk_vectors))
+    if not lengths.sum():
+        return out
+    sims = np.vstack([m for m in chunk_vectors if len(m)]).astype(np.float32) @ np.asarray(query, dtype=np.float32)
+    width = int(lengths.max())
+    padded = np.full((len(chunk_vectors), width), -np.inf, dtype=np.float32)
+    padded[np.arange(width) < lengths[:, None]] = sims
+    if pooling == "max":
+        return np.where(lengths > 0, padded.max(axis=1), 0.0)
+    k = max(1, min(k, width))
+    top = -np.partition(-padded, k - 1, axis=1)[:, :k]
+    top = np.where(np.isfinite(top), top, 0.0).sum(axis=1)
+    counts = np.minimum(lengths, k)
+    return np.divide(top, counts, out=out, where=counts > 0)
+
+def semantic_scores(jd_text: str, resume_texts: List[str], candidate_ids: List[str] = None, vectors: np.ndarray = None, encoder=None, chunk_vectors: List[np.ndarray] = None, pooling: str = None) -> np.ndarray:
+    """
+    0-100 cosine similarity of every resume to the JD, aligned to `resume_texts`.
+
+    Chunk pooling (SEMANTIC_POOLING topk / max): chunk matrices are taken from `chunk_vectors`
+    when given, else from the chunk store for `candidate_ids`, else encoded. Document pooling:
+    whole-resume vectors from `vectors`, else the embedding store for `candidate_ids` whose
+    stored content is unchanged, else encoded. Either way the JD is encoded once (cached) and
+    scored against every resume in one batch.
+    """
+    encoder = encoder or get_encoder()
+    if not len(resume_texts) or not jd_text:
+        return np.zeros(len(resume_texts))
+    pooling = pooling or semantic_pooling()
+    query = jd_vector(jd_text, encoder)
+    if pooling != "document":
+        if chunk_vectors is None:
+            if candidate_ids is not None:
+                chunk_vectors = candidate_chunks(candidate_ids, resume_texts, encoder)
+            else:
+                chunk_vectors = encode_chunks(resume_texts, encoder)
+        sims = pool_similarities(query, chunk_vectors, pooling, int(os.getenv("SEMANTIC_TOP_K", "3")))
+    else:
+        if vectors is None:
+            vectors = np.zeros((len(resume_texts), encoder.dim), dtype=np.float32)
+            missing = list(range(len(resume_texts)))
+            if candidate_ids is not None:
+                ids, hashes, matrix = get_store(encoder).snapshot()
+                rows = {key: row for row, key in enumerate(zip(ids, hashes))}  # latest row wins
+                found = [(i, rows.get((cid, content_hash(t)))) for i, (cid, t) in enumerate(zip(candidate_ids, resume_texts))]
+                hits = [(i, row) for i, row in found if row is not None]
+                if hits:
+                    vectors[[i for i, _ in hits]] = matrix[[row for _, row in hits]]
+                missing = [i for i, row in found if row is None]
+            if missing:
+                vectors[missing] = encode([resume_texts[i] for i in missing], encoder)
+        sims = np.asarray(vectors, dtype=np.float32) @ query
+    scores = np.round(np.maximum(sims, 0.0) * 100, 2).astype(np.float64)
+    scores[[not t for t in resume_texts]] = 0.0
+    return scores
 
 def get_embedding(text: str) -> np.ndarray:
-    return model.encode([text])[0]
+    return encode([text])[0]
 
 def check_duplicate(text: str, threshold: float = 0.90) -> bool:
     """
     Generate embedding for text and check against known_embeddings.
     If similarity > threshold, return True.
     """
-    known = get_known_embeddings()
-    
-    new_emb = get_embedding(text)
-    
-    if not known:
-        known.append(new_emb)
-        return False
-        
-    # Stack known embeddings
-    known_matrix = np.array(known)
-    
-    # Calculate similarities
-    sims = cosine_similarity([new_emb], known_matrix)[0]
-    max_sim = np.max(sims)
-    
-    if max_sim > threshold:
+    encoder = get_encoder()
+    sync_store(encoder)
+    new_emb = encode([text], encoder)[0]
+
+    hits = vector_index.search(None, new_emb[None, :], encoder, k=1)[0]
+    if hits and hits[0][1] > threshold:
+        return True
+    # Vectors are L2-normalized: dot product == cosine similarity
+    runtime = _runtime_embeddings.setdefault(encoder.name, [])
+    if runtime and np.max(np.array(runtime) @ new_emb) > threshold:
         return True
-    
+
     # If not duplicate, add to known (runtime cache)
-    known.append(new_emb)
+    runtime.append(new_emb)
     return False
 
 # Legacy function kept for compatibility but no-op or redirects
@@ -84,10 +289,8 @@ def calculate_similarity(text1: str, text2: str) -> float:
     """
     if not text1 or not text2:
         return 0.0
-        
-    emb1 = get_embedding(text1)
-    emb2 = get_embedding(text2)
-    
-    # Reshape for sklearn
-    sim = cosine_similarity([emb1], [emb2])[0][0]
-    return round(float(sim) * 100, 2)
+
+    # Both texts through the same encoder in one batch
+    emb1, emb2 = encode([text1, text2])
+    sim = float(np.dot(emb1, emb2))
+    return round(max(sim, 0.0) * 100, 2)
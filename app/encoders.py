@@ -0,0 +1,180 @@
+"""
+Text encoders for semantic scoring and duplicate detection.
+
+  - HashingEncoder: dependency-free (scikit-learn HashingVectorizer over word 1-2 grams and
+    char 3-5 grams, sublinear tf). Always available, nothing to load.
+  - SentenceTransformerEncoder: a CPU sentence-transformer from a local path, optionally on the
+    ONNX / OpenVINO backend (quantized exports work the same way).
+
+`get_encoder()` never blocks: the sentence-transformer is loaded in a background thread on
+first use (or at startup via `start_loading()`), and the hashing encoder answers until it is
+ready, or for good if it isn't configured / fails to load. All vectors are L2-normalized
+float32, so a dot product is the cosine similarity. Vectors from different encoders are not
+comparable; each encoder has a `name` to tell them apart.
+
+Env:
+    EMBEDDING_BACKEND      auto | hashing | sentence-transformers (default auto: use the model if a path is set)
+    EMBEDDING_MODEL_PATH   Local model directory (or hub id) for sentence-transformers
+    EMBEDDING_ST_BACKEND   torch | onnx | openvino (default torch)
+    EMBEDDING_BATCH_SIZE   Texts per encode batch (default 32)
+    EMBEDDING_HASH_DIM     Hashing encoder dimension (default 512)
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+from loguru import logger
+from sklearn.feature_extraction.text import HashingVectorizer
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return (matrix / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+
+def default_batch_size() -> int:
+    return max(1, int(os.getenv("EMBEDDING_BATCH_SIZE", "32")))
+
+
+class HashingEncoder:
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+        self._words = HashingVectorizer(
+            n_features=dim, ngram_range=(1, 2), token_pattern=r"(?u)\b[\w+#.]+\b",
+            stop_words="english", norm=None
+        )
+        self._chars = HashingVectorizer(n_features=dim, analyzer="char_wb", ngram_range=(3, 5), norm=None)
+
+    def encode(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        matrix = self._words.transform(texts) + 0.5 * self._chars.transform(texts)
+        # Sublinear tf; hashing signs are kept so collisions cancel out on average
+        matrix.data = np.sign(matrix.data) * np.log1p(np.abs(matrix.data))
+        return _normalize(matrix.toarray())
+
+
+class SentenceTransformerEncoder:
+    def __init__(self, model, path: str):
+        self.model = model
+        self.dim = model.get_sentence_embedding_dimension()
+        self.name = f"st:{os.path.basename(path.rstrip('/')) or path}"
+
+    def encode(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        vectors = self.model.encode(
+            list(texts), batch_size=batch_size or default_batch_size(),
+            normalize_embeddings=True, convert_to_numpy=True, show_progress_bar=False
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class EncoderRegistry:
+    """Hashing fallback right away; the sentence-transformer once its background load finishes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fallback = HashingEncoder(int(os.getenv("EMBEDDING_HASH_DIM", "512")))
+        self._model = None
+        self._model_path = os.getenv("EMBEDDING_MODEL_PATH", "").strip()
+        backend = os.getenv("EMBEDDING_BACKEND", "auto").strip().lower()
+        wants_model = backend == "sentence-transformers" or (backend == "auto" and self._model_path)
+        self._state = "idle" if wants_model and self._model_path else "disabled"
+        self._error = ""
+        self._thread: Optional[threading.Thread] = None
+
+    def start_loading(self):
+        with self._lock:
+            if self._state != "idle":
+                return
+            self._state = "loading"
+            self._thread = threading.Thread(target=self._load, name="encoder-loader", daemon=True)
+            self._thread.start()
+
+    def _load(self):
+        try:
+            # Imported here, not at module level: importing torch alone can take seconds
+            from sentence_transformers import SentenceTransformer
+            logger.info(f"⏳ Loading sentence-transformer from {self._model_path}...")
+            model = SentenceTransformer(
+                self._model_path, device="cpu", backend=os.getenv("EMBEDDING_ST_BACKEND", "torch")
+            )
+            encoder = SentenceTransformerEncoder(model, self._model_path)
+            with self._lock:
+                self._model, self._state = encoder, "ready"
+            logger.info(f"✅ Encoder ready: {encoder.name} ({encoder.dim}d)")
+        except Exception as e:
+            with self._lock:
+                self._state, self._error = "failed", str(e)
+            logger.warning(f"⚠️ Sentence-transformer unavailable ({e}), using {self._fallback.name}.")
+
+    def get(self):
+        self.start_loading()
+        with self._lock:
+            return self._model if self._state == "ready" else self._fallback
+
+    def wait_ready(self, timeout: Optional[float] = None):
+        """Block until the background load finished (scripts / benchmarks that want the real model)."""
+        self.start_loading()
+        if self._thread:
+            self._thread.join(timeout)
+        return self.get()
+
+    def status(self) -> dict:
+        with self._lock:
+            active = self._model if self._state == "ready" else self._fallback
+            return {"state": self._state, "active": active.name, "dim": active.dim, "model_path": self._model_path, "error": self._error}
+
+
+_registry: Optional[EncoderRegistry] = None
+_registry_lock = threading.Lock()
+# One encode at a time: torch already parallelizes inside a batch
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="encoder")
+
+
+def get_registry() -> EncoderRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = EncoderRegistry()
+    return _registry
+
+
+def get_encoder():
+    return get_registry().get()
+
+
+def start_loading():
+    get_registry().start_loading()
+
+
+def reset_encoders():
+    """Forget the registry so the next call re-reads the environment."""
+    global _registry
+    with _registry_lock:
+        _registry = None
+
+
+def encode(texts: List[str], encoder=None) -> np.ndarray:
+    """(n, dim) normalized vectors, encoded in EMBEDDING_BATCH_SIZE chunks."""
+    encoder = encoder or get_encoder()
+    size = default_batch_size()
+    if len(texts) <= size:
+        return encoder.encode(list(texts), size)
+    return np.vstack([encoder.encode(list(texts[i:i + size]), size) for i in range(0, len(texts), size)])
+
+
+async def on_encoder_thread(fn, *args):
+    """Run fn(*args) on the single encoder thread, off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+
+
+async def encode_async(texts: List[str], encoder=None) -> np.ndarray:
+    """encode() on the encoder thread, off the event loop."""
+    return await on_encoder_thread(encode, list(texts), encoder or get_encoder())
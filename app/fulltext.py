@@ -0,0 +1,161 @@
+"""
+Full-text keyword search over resume text, served by the database's own index.
+
+  - SQLite: FTS5 table `candidates_fts` with external content (the candidates table itself),
+    kept in sync by insert / update / delete triggers; ranked by bm25().
+  - PostgreSQL: generated column `candidates.resume_tsv` (english tsvector) with a GIN index;
+    ranked by ts_rank().
+Both return a highlighted snippet (<mark>...</mark>) of the best-matching passage and filter by
+recruiter inside the same query. Snippets are HTML-escaped resume text: <mark> is the only markup.
+`setup_fulltext()` is idempotent and runs from init_db(); if the index can't be created (SQLite
+built without FTS5), search falls back to a LIKE scan.
+
+SQLite caveat: candidates has a TEXT primary key, so the FTS5 index points at its implicit rowid,
+which VACUUM may renumber. Run `rebuild_fulltext()` after a VACUUM of the database.
+"""
+import html
+import re
+from typing import Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import text
+
+from app.database import engine as default_engine
+
+_WORD_RE = re.compile(r"[\w+#.]+")
+# Private-use characters the database wraps matches in; swapped for <mark> after escaping
+_MARK_START, _MARK_STOP = "\ue000", "\ue001"
+
+_SQLITE_SETUP = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5(
+        resume_text, content='candidates', content_rowid='rowid', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS candidates_fts_insert AFTER INSERT ON candidates BEGIN
+        INSERT INTO candidates_fts(rowid, resume_text) VALUES (new.rowid, new.resume_text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS candidates_fts_delete AFTER DELETE ON candidates BEGIN
+        INSERT INTO candidates_fts(candidates_fts, rowid, resume_text) VALUES ('delete', old.rowid, old.resume_text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS candidates_fts_update AFTER UPDATE OF resume_text ON candidates BEGIN
+        INSERT INTO candidates_fts(candidates_fts, rowid, resume_text) VALUES ('delete', old.rowid, old.resume_text);
+        INSERT INTO candidates_fts(rowid, resume_text) VALUES (new.rowid, new.resume_text);
+    END""",
+]
+
+_POSTGRES_SETUP = [
+    """ALTER TABLE candidates ADD COLUMN IF NOT EXISTS resume_tsv tsvector
+        GENERATED ALWAYS AS (to_tsvector('english', coalesce(resume_text, ''))) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_candidates_resume_tsv ON candidates USING GIN (resume_tsv)",
+]
+
+_SUMMARY_COLUMNS = "c.id, c.name, c.status, c.match_score, c.final_score, c.upload_job_id"
+
+_available: Dict[str, bool] = {}  # engine url -> native index ready
+
+
+def setup_fulltext(engine=None) -> bool:
+    """Create the index (and backfill existing rows on first creation). True if native search is available."""
+    engine = engine or default_engine
+    dialect = engine.dialect.name
+    try:
+        with engine.begin() as conn:
+            if dialect == "sqlite":
+                created = not conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'candidates_fts'"
+                )).first()
+                for statement in _SQLITE_SETUP:
+                    conn.execute(text(statement))
+                if created:
+                    conn.execute(text("INSERT INTO candidates_fts(candidates_fts) VALUES ('rebuild')"))
+            elif dialect == "postgresql":
+                for statement in _POSTGRES_SETUP:
+                    conn.execute(text(statement))
+            else:
+                raise RuntimeError(f"no full-text index for dialect '{dialect}'")
+        _available[str(engine.url)] = True
+    except Exception as e:
+        logger.warning(f"⚠️ Full-text index unavailable ({e}), keyword search will scan rows.")
+        _available[str(engine.url)] = False
+    return _available[str(engine.url)]
+
+
+def rebuild_fulltext(engine=None) -> bool:
+    """Re-index every row from the candidates table (SQLite). Needed after VACUUM renumbers rowids."""
+    engine = engine or default_engine
+    if engine.dialect.name != "sqlite" or not setup_fulltext(engine):
+        return False
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO candidates_fts(candidates_fts) VALUES ('rebuild')"))
+    return True
+
+
+def _fts5_query(query: str) -> str:
+    """Every word as a quoted FTS5 term (implicit AND), so user input can't be a syntax error."""
+    return " ".join('"' + w.replace('"', '""') + '"' for w in _WORD_RE.findall(query))
+
+
+def search_fulltext(query: str, recruiter_username: str, limit: int = 20, engine=None) -> List[Dict]:
+    """Best keyword matches in a recruiter's pool: summaries plus `rank` (higher is better) and `snippet`."""
+    engine = engine or default_engine
+    if not _WORD_RE.search(query or ""):
+        return []
+    if str(engine.url) not in _available:
+        setup_fulltext(engine)
+    params = {"q": query, "recruiter": recruiter_username, "limit": limit}
+    dialect = engine.dialect.name
+
+    if _available[str(engine.url)] and dialect == "sqlite":
+        sql = f"""
+            SELECT {_SUMMARY_COLUMNS}, -bm25(candidates_fts) AS rank,
+                   snippet(candidates_fts, 0, :mark_start, :mark_stop, '…', 16) AS snippet
+            FROM candidates_fts JOIN candidates c ON c.rowid = candidates_fts.rowid
+            WHERE candidates_fts MATCH :q AND c.recruiter_username = :recruiter
+            ORDER BY bm25(candidates_fts) LIMIT :limit
+        """
+        params.update({"q": _fts5_query(query), "mark_start": _MARK_START, "mark_stop": _MARK_STOP})
+    elif _available[str(engine.url)] and dialect == "postgresql":
+        sql = f"""
+            SELECT {_SUMMARY_COLUMNS}, ts_rank(c.resume_tsv, q) AS rank,
+                   ts_headline('english', c.resume_text, q, :headline_options) AS snippet
+            FROM candidates c, websearch_to_tsquery('english', :q) q
+            WHERE c.resume_tsv @@ q AND c.recruiter_username = :recruiter
+            ORDER BY rank DESC LIMIT :limit
+        """
+        params["headline_options"] = f"StartSel={_MARK_START}, StopSel={_MARK_STOP}, MaxFragments=2, MaxWords=30"
+    else:
+        return _scan(query, recruiter_username, limit, engine)
+
+    with engine.connect() as conn:
+        rows = [dict(row._mapping) for row in conn.execute(text(sql), params)]
+    for row in rows:
+        row["snippet"] = _markup(row["snippet"] or "")
+    return rows
+
+
+def _scan(query: str, recruiter_username: str, limit: int, engine) -> List[Dict]:
+    """Fallback without an index: every word must appear (case-insensitive), ranked by hit count."""
+    words = [w.lower() for w in _WORD_RE.findall(query)]
+    where = " AND ".join(f"lower(c.resume_text) LIKE :w{i}" for i in range(len(words)))
+    params = {f"w{i}": f"%{w}%" for i, w in enumerate(words)}
+    params["recruiter"] = recruiter_username
+    sql = f"SELECT {_SUMMARY_COLUMNS}, c.resume_text FROM candidates c WHERE c.recruiter_username = :recruiter AND {where}"
+    with engine.connect() as conn:
+        rows = [dict(row._mapping) for row in conn.execute(text(sql), params)]
+    for row in rows:
+        body = row.pop("resume_text") or ""
+        lowered = body.lower()
+        row["rank"] = float(sum(lowered.count(w) for w in words))
+        at = lowered.find(words[0])
+        row["snippet"] = _highlight(body[max(0, at - 80):at + 120], words)
+    rows.sort(key=lambda r: r["rank"], reverse=True)
+    return rows[:limit]
+
+
+def _markup(snippet: str) -> str:
+    """Escape resume text (it may hold HTML), then turn the database's match markers into <mark>."""
+    return html.escape(snippet).replace(_MARK_START, "<mark>").replace(_MARK_STOP, "</mark>")
+
+
+def _highlight(passage: str, words: List[str]) -> str:
+    pattern = re.compile("|".join(re.escape(w) for w in sorted(words, key=len, reverse=True)), re.IGNORECASE)
+    return _markup(pattern.sub(lambda m: f"{_MARK_START}{m.group(0)}{_MARK_STOP}", passage))
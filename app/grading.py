@@ -1,5 +1,6 @@
 import json
 from app.llm import get_llm
+from app import llm_routes
 from app.interview_prompts import GRADING_PROMPT
 
 def grade_answer(question: str, answer: str) -> dict:
@@ -7,7 +8,7 @@ def grade_answer(question: str, answer: str) -> dict:
     Grade the answer using LLM.
     Returns dict with score, feedback, strength, gap.
     """
-    llm = get_llm(temperature=0, max_tokens=500)
+    llm = get_llm(llm_routes.GRADING)
     if not llm:
         return {"score": 0, "feedback": "LLM Error", "strength": "", "gap": ""}
         
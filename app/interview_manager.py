@@ -4,8 +4,12 @@ from langchain_core.prompts import PromptTemplate
 from app.schemas import InterviewSession, QuestionScore, InterviewMessage
 from app.grading import grade_answer
 from app.llm import get_llm
+from app import llm_routes
 from app.interview_prompts import INTERVIEW_SYSTEM_PROMPT
 from app.core.redis import redis_client
+from app.llm_metrics import llm_context, track_usage, merge_usage
+from app.role_classifier import classify_role, confidence_threshold
+from app.single_flight import single_flight, prompt_key
 from app.db import (
     save_session_db, get_session_db, update_session_db, log_message_db, 
     get_candidate, get_session_messages, update_candidate_interview
@@ -14,15 +18,24 @@ import json
 from loguru import logger
 
 class InterviewManager:
-    def __init__(self):
-        self.llm = get_llm(temperature=0.7, max_tokens=600)
+    @property
+    def llm(self):
+        # Resolved per use so every turn is routed through the endpoint pool
+        return get_llm(llm_routes.INTERVIEW)
 
     def deduce_role(self, jd_text: str) -> str:
+        guess = classify_role(jd_text)
+        if guess.confidence >= confidence_threshold():
+            return guess.title
         try:
              from app.interview_prompts import ROLE_DEDUCTION_PROMPT
-             chain = ROLE_DEDUCTION_PROMPT | self.llm
-             res = chain.invoke({"job_description": jd_text})
-             role = res.content.strip()
+             chain = ROLE_DEDUCTION_PROMPT | get_llm(llm_routes.ROLE_DEDUCTION)
+             inputs = {"job_description": jd_text}
+             # A retried /interview/start for the same JD waits on the call already in flight
+             role = single_flight.do_sync(
+                 prompt_key(llm_routes.ROLE_DEDUCTION, ROLE_DEDUCTION_PROMPT, inputs),
+                 lambda: chain.invoke(inputs).content
+             ).strip()
              role = role.replace('"', '').replace("'", "")
              return role
         except Exception as e:
@@ -42,7 +55,7 @@ class InterviewManager:
         if candidate_id:
             db_candidate = get_candidate(candidate_id)
             if db_candidate:
-                resume_text = db_candidate['resume_text']
+                resume_text = db_candidate.get('prompt_text') or db_candidate['resume_text']
                 jd = db_candidate['job_description']
                 match_score = db_candidate['match_score']
 
@@ -51,11 +64,12 @@ class InterviewManager:
              candidate_id = resume_text
              db_candidate = get_candidate(candidate_id)
              if db_candidate:
-                 resume_text = db_candidate['resume_text']
+                 resume_text = db_candidate.get('prompt_text') or db_candidate['resume_text']
                  jd = db_candidate['job_description']
                  match_score = db_candidate['match_score']
 
-        role = self.deduce_role(jd if jd else "")
+        with llm_context(session_id=sid, candidate_id=candidate_id), track_usage() as usage:
+            role = self.deduce_role(jd if jd else "")
 
         session = InterviewSession(
             session_id=sid,
@@ -63,14 +77,15 @@ class InterviewManager:
             job_description=jd or "",
             initial_match_score=match_score or 0.0,
             candidate_id=candidate_id or "unknown",
-            detected_role=role
+            detected_role=role,
+            llm_usage=usage.as_dict()
         )
         
         # 1. Save to Redis (Hot State)
         redis_client.set_session(sid, session.dict())
         
         # 2. Save to DB (Persistence)
-        save_session_db(sid, session.candidate_id, session.detected_role, True)
+        save_session_db(sid, session.candidate_id, session.detected_role, True, llm_usage=session.llm_usage)
         
         return session
 
@@ -89,7 +104,7 @@ class InterviewManager:
         cid = row['candidate_id']
         candidate = get_candidate(cid)
         
-        resume_text = candidate['resume_text'] if candidate else ""
+        resume_text = (candidate.get('prompt_text') or candidate['resume_text']) if candidate else ""
         jd = candidate['job_description'] if candidate else ""
         match_score = candidate['match_score'] if candidate and candidate.get('match_score') is not None else 0.0
         
@@ -100,7 +115,8 @@ class InterviewManager:
             initial_match_score=match_score,
             detected_role=row['role'],
             is_active=bool(row['is_active']),
-            candidate_id=cid
+            candidate_id=cid,
+            llm_usage=json.loads(row.get('llm_usage') or "{}")
         )
         
         # Load messages & scores
@@ -125,33 +141,35 @@ class InterviewManager:
         if not session:
             return "Error: Session not found."
             
-        try:
-            prompt = PromptTemplate(
-                input_variables=["resume_text", "job_description", "match_score", "role", "history", "last_score"],
-                template=INTERVIEW_SYSTEM_PROMPT
-            )
-            chain = prompt | self.llm
-            res = chain.invoke({
-                "role": session.detected_role,
-                "resume_text": session.resume_text,
-                "job_description": session.job_description,
-                "match_score": session.initial_match_score,
-                "history": "No history yet.",
-                "last_score": "None"
-            })
-            question = res.content.strip()
-        except Exception as e:
-            logger.error(f"Interview Start Error: {e}")
-            question = "Could you please introduce yourself?"
+        with llm_context(session_id=session_id, candidate_id=session.candidate_id), track_usage() as usage:
+            try:
+                prompt = PromptTemplate(
+                    input_variables=["resume_text", "job_description", "match_score", "role", "history", "last_score"],
+                    template=INTERVIEW_SYSTEM_PROMPT
+                )
+                chain = prompt | self.llm
+                res = chain.invoke({
+                    "role": session.detected_role,
+                    "resume_text": session.resume_text,
+                    "job_description": session.job_description,
+                    "match_score": session.initial_match_score,
+                    "history": "No history yet.",
+                    "last_score": "None"
+                })
+                question = res.content.strip()
+            except Exception as e:
+                logger.error(f"Interview Start Error: {e}")
+                question = "Could you please introduce yourself?"
 
         # Update State
+        session.llm_usage = merge_usage(session.llm_usage, usage.as_dict())
         session.current_question = question
         session.messages.append(InterviewMessage(role="assistant", content=question))
 
         # Sync
         redis_client.set_session(session_id, session.dict())
         log_message_db(session_id, "assistant", question)
-        update_session_db(session_id, question, [s.dict() for s in session.question_scores], True)
+        update_session_db(session_id, question, [s.dict() for s in session.question_scores], True, llm_usage=session.llm_usage)
         
         return question
 
@@ -167,8 +185,10 @@ class InterviewManager:
         log_message_db(session_id, "user", answer)
         
         # Grade
-        grade_data = grade_answer(current_q, answer)
+        with llm_context(session_id=session_id, candidate_id=session.candidate_id), track_usage() as usage:
+            grade_data = grade_answer(current_q, answer)
         score = grade_data['score']
+        session.llm_usage = merge_usage(session.llm_usage, usage.as_dict())
         
         new_score = QuestionScore(
             question=current_q,
@@ -184,47 +204,49 @@ class InterviewManager:
         # Check Termination
         if len(session.question_scores) >= 5:
             redis_client.delete_session(session_id) # Optional: Clear cache on finish
-            update_session_db(session_id, current_q, [s.dict() for s in session.question_scores], False)
+            update_session_db(session_id, current_q, [s.dict() for s in session.question_scores], False, llm_usage=session.llm_usage)
             return "Interview Complete.", True, grade_data['feedback'], score
 
         # Next Question
-        try:
-            history_str = ""
-            for msg in session.messages:
-                # Include local history including the just-added answer
-                role_label = "Interviewer" if msg.role == "assistant" else "Candidate"
-                history_str += f"{role_label}: {msg.content}\n"
+        with llm_context(session_id=session_id, candidate_id=session.candidate_id), track_usage() as usage:
+            try:
+                history_str = ""
+                for msg in session.messages:
+                    # Include local history including the just-added answer
+                    role_label = "Interviewer" if msg.role == "assistant" else "Candidate"
+                    history_str += f"{role_label}: {msg.content}\n"
             
-            prompt = PromptTemplate(
-                input_variables=["resume_text", "job_description", "match_score", "role", "history", "last_score"],
-                template=INTERVIEW_SYSTEM_PROMPT
-            )
-            chain = prompt | self.llm
-            res = chain.invoke({
-                "role": session.detected_role,
-                "resume_text": session.resume_text,
-                "job_description": session.job_description,
-                "match_score": session.initial_match_score,
-                "history": history_str,
-                "last_score": str(score)
-            })
-            next_q = res.content.strip()
-        except Exception:
-             # Simple fallback
-             import random
-             next_q = random.choice([
-                 "Tell me about a challenging project?",
-                 "How do you handle deadlines?"
-             ])
+                prompt = PromptTemplate(
+                    input_variables=["resume_text", "job_description", "match_score", "role", "history", "last_score"],
+                    template=INTERVIEW_SYSTEM_PROMPT
+                )
+                chain = prompt | self.llm
+                res = chain.invoke({
+                    "role": session.detected_role,
+                    "resume_text": session.resume_text,
+                    "job_description": session.job_description,
+                    "match_score": session.initial_match_score,
+                    "history": history_str,
+                    "last_score": str(score)
+                })
+                next_q = res.content.strip()
+            except Exception:
+                 # Simple fallback
+                 import random
+                 next_q = random.choice([
+                     "Tell me about a challenging project?",
+                     "How do you handle deadlines?"
+                 ])
 
         # Update Session
+        session.llm_usage = merge_usage(session.llm_usage, usage.as_dict())
         session.current_question = next_q
         session.messages.append(InterviewMessage(role="assistant", content=next_q))
         
         # Sync
         redis_client.set_session(session_id, session.dict())
         log_message_db(session_id, "assistant", next_q)
-        update_session_db(session_id, next_q, [s.dict() for s in session.question_scores], True)
+        update_session_db(session_id, next_q, [s.dict() for s in session.question_scores], True, llm_usage=session.llm_usage)
         
         return next_q, False, grade_data['feedback'], score
 
@@ -293,7 +315,8 @@ class InterviewManager:
             "transcript": [
                 {"q": q.question, "a": q.answer, "score": q.score, "feedback": q.feedback}
                 for q in session.question_scores
-            ]
+            ],
+            "llm_usage": session.llm_usage
         }
 
 interview_manager = InterviewManager()
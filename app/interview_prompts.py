@@ -164,20 +164,7 @@ Your task is to evaluate a candidate resume against a job role using:
 
 You are a classifier and scorer, not a creative writer.
 All outputs must be evidence-based and explainable.
-
-🔹 INPUT DATA
-Resume Text:
-{resume_text}
-
-Job Role: {job_role}
-Experience Level: {experience_level}
-Required Skills: {required_skills}
-
-Parameters & Weights:
-{role_template}
-
-Thresholds:
-{thresholds}
+The job context and the resume are given at the end (INPUT DATA).
 
 🔹 STEP 1: Extract structured evidence from the resume
 You MUST first extract factual evidence only.
@@ -246,6 +233,20 @@ ELSE:
 
 🔹 STEP 5: Generate structured, explainable output ONLY
 Output valid JSON matching the following structure exactly.
+
+🔹 INPUT DATA
+Job Role: {job_role}
+Experience Level: {experience_level}
+Required Skills: {required_skills}
+
+Parameters & Weights:
+{role_template}
+
+Thresholds:
+{thresholds}
+
+Resume Text:
+{resume_text}
 """
 
 RESUME_EVALUATION_PROMPT = PromptTemplate(
@@ -1,20 +1,53 @@
 import asyncio
 import json
 import logging
-from typing import List
+import time
+from typing import List, Optional
+import numpy as np
 from datetime import datetime
 from sqlalchemy.orm import Session
 from fastapi import UploadFile
 
-from app.db import get_db_session, add_candidate
+from app.db import get_db_session, add_candidate, SCREENED_OUT_STATUS
 from app.models.models import UploadJob
-from app.resume_parser import parse_resume
-from app.matcher import evaluate_resume_structured, detect_job_role, extract_required_skills, evaluate_resumes_bulk
-from app.role_templates import get_role_template
+from app.resume_parser import extract_resume_pages
+from app.resume_minimizer import build_prompt_text, savings
+from app.resume_features import extract_candidate_features
+from app.matcher import evaluate_resume_structured, detect_job_role, extract_required_skills, evaluate_resumes_bulk, rules_based_evaluations
+from app.role_classifier import classify_role, confidence_threshold
+from app.role_templates import resolve_template_key, load_template
 from app.utils import clean_text
+from app.skill_verifier import verify_skills_batch
+from app.llm_metrics import llm_context, track_usage
+from app.prerank import prerank, select_for_llm
+from app.embeddings import find_duplicates, store_candidate_vectors, duplicate_threshold, semantic_scores, encode_chunks_async
+from app.encoders import get_encoder, encode_async
+from app.near_duplicates import signatures as minhash_signatures, find_near_duplicates, jaccard_threshold
 
 logger = logging.getLogger(__name__)
 
+
+def _record_stage(timings: dict, stage: str, start: float):
+    # Accumulates: a stage can run more than once per job
+    timings[stage] = round(timings.get(stage, 0.0) + (time.perf_counter() - start) * 1000, 2)
+
+def _split_skills(required_skills: list, evidence_skills: list, in_text: list) -> tuple:
+    """
+    (matched, missing) JD skills: matched if the LLM cited it as evidence and the verifier found it
+    in the resume. A verbatim mention alone doesn't count; the verifier only drops unsupported claims.
+    """
+    cited = {s.lower() for s in evidence_skills}
+    found = set(in_text)
+    matched = [s for s in required_skills if s.lower() in cited and s in found]
+    return matched, [s for s in required_skills if s not in matched]
+
+def _annotations(source: dict) -> dict:
+    """Local signals stored alongside the evaluation (JD similarity, duplicate flag)."""
+    extra = dict(source.get("duplicate", {}))
+    if "semantic_score" in source:
+        extra["semantic_score"] = source["semantic_score"]
+    return extra
+
 async def process_upload_job(
     job_id: str, 
     files_data: List[bytes], 
@@ -22,11 +55,20 @@ async def process_upload_job(
     jd_text: str, 
     template_mode: str, 
     recruiter_username: str,
-    resume_threshold: int = 50
+    resume_threshold: int = 50,
+    cascade: Optional[dict] = None
 ):
     """
     Background task to process resumes.
     Refactored to process each resume INDIVIDUALLY with FULL TEXT context.
+
+    cascade: {"top_k": int, "min_score": float} enables two-stage screening - every resume
+    is pre-ranked locally (BM25 vs the JD) and only the top K / those above the floor are
+    sent to LLM evaluation; the rest are stored as "Screened Out (Pre-rank)".
+
+    Near-duplicates (MinHash, see app.near_duplicates) of a candidate stored for the same JD or of
+    an earlier resume in the upload are not evaluated or stored; they are reported in the job
+    results. If that earlier resume fails to save, its first copy is evaluated in its place.
     """
     session = get_db_session()
     job = session.query(UploadJob).filter(UploadJob.job_id == job_id).first()
@@ -36,152 +78,367 @@ async def process_upload_job(
         session.close()
         return
 
-    try:
-        # Update status to processing
-        job.status = "processing"
-        job.total_files = len(files_data)
-        session.commit()
+    stage_timings = {}
+    cascade_stats = {}
+    prompt_savings = {}
+    duplicate_stats = {}
+    near_duplicate_stats = {}
+
+    def _metrics() -> str:
+        return json.dumps({
+            "llm_usage": llm_usage.as_dict(),
+            "stage_timings": stage_timings,
+            "cascade": cascade_stats,
+            "prompt_minimizer": prompt_savings,
+            "duplicates": duplicate_stats,
+            "near_duplicates": near_duplicate_stats
+        })
+
+    with llm_context(recruiter=recruiter_username, job_id=job_id), track_usage() as llm_usage:
+        try:
+            # Update status to processing
+            job.status = "processing"
+            job.total_files = len(files_data)
+            session.commit()
         
-        # --- Pre-computation Context ---
-        detected_role = template_mode
-        if template_mode == "auto":
-             try:
-                 detected_role = await detect_job_role(jd_text)
-             except Exception:
-                 detected_role = "Software Engineer"
+            # --- Pre-computation Context ---
+            stage_start = time.perf_counter()
+            detected_role = template_mode
+            template_key = None
+            if template_mode == "auto":
+                 guess = classify_role(jd_text)
+                 if guess.confidence >= confidence_threshold():
+                     # Seniority was already read from the JD itself, not re-guessed from the title
+                     detected_role, template_key = guess.title, guess.template_key
+                 else:
+                     try:
+                         detected_role = await detect_job_role(jd_text)
+                     except Exception:
+                         detected_role = "Software Engineer"
         
-        role_template, thresholds = get_role_template(detected_role)
-        required_skills = await extract_required_skills(jd_text)
+            template_key = template_key or resolve_template_key(detected_role, recruiter_username)
+            role_template, thresholds = load_template(template_key, recruiter_username)
+            required_skills = await extract_required_skills(jd_text)
+            _record_stage(stage_timings, "jd_context", stage_start)
         
-        # Parse resumes first
-        parsed_resumes = []
-        errors = []
+            # Parse resumes first
+            stage_start = time.perf_counter()
+            parsed_resumes = []
+            errors = []
         
-        logger.info(f"Parsing {len(files_data)} files...")
+            logger.info(f"Parsing {len(files_data)} files...")
         
-        for i, (f_bytes, fname) in enumerate(zip(files_data, filenames)):
-            try:
-                text = parse_resume(f_bytes, fname)
-                if text:
-                    parsed_resumes.append({
-                        "index": i,
-                        "text": text,
-                        "filename": fname
+            for i, (f_bytes, fname) in enumerate(zip(files_data, filenames)):
+                try:
+                    pages = extract_resume_pages(f_bytes, fname)
+                    text = clean_text("\n".join(pages))
+                    if text:
+                        parsed_resumes.append({
+                            "index": i,
+                            "text": text,
+                            "prompt_text": build_prompt_text(pages, text),
+                            "features": extract_candidate_features(text, required_skills),
+                            "filename": fname
+                        })
+                    else:
+                        errors.append({"filename": fname, "error": "Empty text"})
+                except Exception as e:
+                    errors.append({"filename": fname, "error": str(e)})
+            _record_stage(stage_timings, "parse", stage_start)
+            prompt_savings.update(savings(
+                "\n".join(r["text"] for r in parsed_resumes),
+                "\n".join(r["prompt_text"] for r in parsed_resumes)
+            ))
+
+            # Near-duplicates (the same CV exported twice, light edits) for this JD: reported, not evaluated
+            near_duplicates = []  # (parsed resume, (candidate id or "upload:<row>", jaccard))
+            uploaded = parsed_resumes
+            if parsed_resumes:
+                stage_start = time.perf_counter()
+                try:
+                    sigs = await asyncio.to_thread(minhash_signatures, [r["text"] for r in parsed_resumes])
+                    matches = await asyncio.to_thread(find_near_duplicates, recruiter_username, sigs, jaccard_threshold(), jd_text)
+                    for r, sig, match in zip(uploaded, sigs, matches):
+                        r["minhash"] = sig
+                        if match:
+                            near_duplicates.append((r, match))
+                    parsed_resumes = [r for r, match in zip(uploaded, matches) if not match]
+                    near_duplicate_stats.update({"threshold": jaccard_threshold(), "skipped": len(near_duplicates)})
+                except Exception as e:
+                    logger.error(f"Near-duplicate check error: {e}")
+                _record_stage(stage_timings, "near_duplicates", stage_start)
+
+            # Encode once: batch duplicate search now, embedding store after save
+            encoder = None
+            if parsed_resumes:
+                stage_start = time.perf_counter()
+                try:
+                    encoder = get_encoder()
+                    vectors = await encode_async([r["text"] for r in parsed_resumes], encoder)
+                    matches = await asyncio.to_thread(find_duplicates, recruiter_username, vectors, encoder, duplicate_threshold())
+                    for r, vector, match in zip(parsed_resumes, vectors, matches):
+                        r["vector"] = vector
+                        if match:
+                            other, similarity = match
+                            if other.startswith("upload:"):
+                                r["duplicate"] = {"duplicate_of_file": parsed_resumes[int(other.split(":")[1])]["filename"]}
+                            else:
+                                r["duplicate"] = {"duplicate_of": other}
+                            r["duplicate"]["duplicate_similarity"] = round(similarity, 4)
+                    # JD similarity pooled over chunk vectors (stored with the resume after save)
+                    texts = [r["text"] for r in parsed_resumes]
+                    chunk_vectors = await encode_chunks_async(texts, encoder)
+                    scores = semantic_scores(jd_text, texts, vectors=vectors, encoder=encoder, chunk_vectors=chunk_vectors)
+                    for r, chunks, score in zip(parsed_resumes, chunk_vectors, scores):
+                        r["chunk_vectors"] = chunks
+                        r["semantic_score"] = float(score)
+                    duplicate_stats.update({
+                        "encoder": encoder.name,
+                        "threshold": duplicate_threshold(),
+                        "flagged": sum(1 for r in parsed_resumes if "duplicate" in r)
                     })
-                else:
-                    errors.append({"filename": fname, "error": "Empty text"})
-            except Exception as e:
-                errors.append({"filename": fname, "error": str(e)})
-
-        logger.info(f"Evaluating {len(parsed_resumes)} resumes (Full Text Mode)...")
-        with open("jobs_debug.log", "a", encoding="utf-8") as f:
-             f.write(f"Received {len(files_data)} files.\n")
-             f.write(f"Parsed {len(parsed_resumes)} resumes successfully.\n")
-             if len(errors) > 0:
-                 f.write(f"Parse Errors: {json.dumps(errors)}\n")
-        
-        # Bulk Evaluation (Optimized)
-        BATCH_SIZE = 10
-        valid_results = []
-        
-        for i in range(0, len(parsed_resumes), BATCH_SIZE):
-            batch = parsed_resumes[i : i + BATCH_SIZE]
-            logger.info(f"Processing Batch {i//BATCH_SIZE + 1} ({len(batch)} resumes)...")
-            
-            try:
-                # evaluate_resumes_bulk returns list of {"index": idx, "output": ResumeEvaluationOutput}
-                batch_results = await evaluate_resumes_bulk(
-                    resumes=batch,
-                    job_role=detected_role,
-                    required_skills=required_skills,
-                    role_template=role_template,
-                    thresholds=thresholds
-                )
-                if batch_results:
-                    valid_results.extend(batch_results)
-            except Exception as e:
-                logger.error(f"Batch {i//BATCH_SIZE + 1} failed: {e}")
-                with open("jobs_debug.log", "a", encoding="utf-8") as f: f.write(f"❌ Batch Error: {e}\n")
-                # Continue process other batches even if one fails
-        
-        # Save to DB
-        results_list = []
-        
-        # Map back via index
-        idx_map = {r["index"]: r for r in parsed_resumes}
+                except Exception as e:
+                    logger.error(f"Embedding / duplicate check error: {e}")
+                    encoder = None
+                _record_stage(stage_timings, "embed", stage_start)
+
+            # Stage 1 of the cascade: local pre-rank, only the best go on to the LLM
+            screened_out = []
+            if cascade and parsed_resumes:
+                stage_start = time.perf_counter()
+                prerank_scores = prerank(jd_text, [r["text"] for r in parsed_resumes])
+                keep = select_for_llm(prerank_scores, int(cascade.get("top_k") or 0), float(cascade.get("min_score") or 0.0))
+                for r, score in zip(parsed_resumes, prerank_scores):
+                    r["prerank_score"] = float(score)
+                screened_out = [r for r, selected in zip(parsed_resumes, keep) if not selected]
+                parsed_resumes = [r for r, selected in zip(parsed_resumes, keep) if selected]
+                cascade_stats.update({
+                    "top_k": int(cascade.get("top_k") or 0),
+                    "min_score": float(cascade.get("min_score") or 0.0),
+                    "pre_ranked": len(parsed_resumes) + len(screened_out),
+                    "sent_to_llm": len(parsed_resumes),
+                    "screened_out": len(screened_out),
+                })
+                _record_stage(stage_timings, "prerank", stage_start)
+
+            logger.info(f"Evaluating {len(parsed_resumes)} resumes (Full Text Mode)...")
+            with open("jobs_debug.log", "a", encoding="utf-8") as f:
+                 f.write(f"Received {len(files_data)} files.\n")
+                 f.write(f"Parsed {len(parsed_resumes)} resumes successfully.\n")
+                 if len(errors) > 0:
+                     f.write(f"Parse Errors: {json.dumps(errors)}\n")
         
-        with open("jobs_debug.log", "a", encoding="utf-8") as f: 
-            f.write(f"Saving {len(valid_results)} valid candidates to DB...\n")
-
-        for res in valid_results:
-            idx = res.get("index")
-            output = res.get("output")
-            source = idx_map.get(idx)
-            
-            if not source or not output: continue
-            
-            # Extract lists
-            r_skills = set(s.lower() for s in output.extracted_evidence.skills)
-            matched_list = [s for s in required_skills if s.lower() in r_skills]
-            missing_list = [s for s in required_skills if s.lower() not in r_skills]
-            
-            # SCORING LOGIC
-            interview_enabled = job.interview_enabled
-            final_score = 0.0
-            status = "Pending"
-            
-            if interview_enabled:
-                # Conventional Flow: Wait for interview
-                # Threshold for Shortlist: User Defined
-                if output.weighted_resume_score >= resume_threshold:
-                    status = "Shortlisted"
-                else:
-                    status = "Rejected"
-                final_score = 0.0 # Will be calc after interview
-            else:
-                # Resume Only Flow: 100% Resume Score
-                final_score = output.weighted_resume_score
-                # Threshold for Selection: User Defined
-                if final_score >= resume_threshold:
-                    status = "Selected (Resume)"
+            # Bulk Evaluation (Optimized)
+            BATCH_SIZE = 10
+
+            async def _evaluate(resumes: list) -> list:
+                """{"index", "output"} per resume: LLM batches, rules-based fallback for any it missed."""
+                stage_start = time.perf_counter()
+                valid_results = []
+
+                for i in range(0, len(resumes), BATCH_SIZE):
+                    batch = resumes[i : i + BATCH_SIZE]
+                    logger.info(f"Processing Batch {i//BATCH_SIZE + 1} ({len(batch)} resumes)...")
+
+                    try:
+                        # evaluate_resumes_bulk returns list of {"index": idx, "output": ResumeEvaluationOutput}
+                        batch_results = await evaluate_resumes_bulk(
+                            resumes=[{**r, "text": r["prompt_text"]} for r in batch],
+                            job_role=detected_role,
+                            required_skills=required_skills,
+                            role_template=role_template,
+                            thresholds=thresholds
+                        )
+                        if batch_results:
+                            valid_results.extend(batch_results)
+                    except Exception as e:
+                        logger.error(f"Batch {i//BATCH_SIZE + 1} failed: {e}")
+                        with open("jobs_debug.log", "a", encoding="utf-8") as f: f.write(f"❌ Batch Error: {e}\n")
+                        # Continue process other batches even if one fails
+                _record_stage(stage_timings, "llm_evaluation", stage_start)
+
+                # LLM outage / malformed batch output: degrade to local rules-based scoring
+                evaluated = {r.get("index") for r in valid_results}
+                unevaluated = [r for r in resumes if r["index"] not in evaluated]
+                if unevaluated:
+                    logger.warning(f"{len(unevaluated)} resumes without AI evaluation, using rules-based fallback.")
+                    stage_start = time.perf_counter()
+                    valid_results.extend(rules_based_evaluations(unevaluated, jd_text, required_skills, role_template, thresholds))
+                    _record_stage(stage_timings, "fallback", stage_start)
+                return valid_results
+
+            def _save_evaluated(valid_results: list, resumes: list):
+                """Stores each evaluated resume with its status, into results_list / stored."""
+                # Map back via index
+                idx_map = {r["index"]: r for r in resumes}
+                with open("jobs_debug.log", "a", encoding="utf-8") as f: 
+                    f.write(f"Saving {len(valid_results)} valid candidates to DB...\n")
+
+                # Verbatim skill mentions for every evaluated resume in one pass per resume
+                verified = dict(zip(
+                    [r.get("index") for r in valid_results],
+                    verify_skills_batch(required_skills, [idx_map.get(r.get("index"), {}).get("text", "") for r in valid_results])
+                ))
+
+                for res in valid_results:
+                    idx = res.get("index")
+                    output = res.get("output")
+                    source = idx_map.get(idx)
+
+                    if not source or not output: continue
+
+                    matched_list, missing_list = _split_skills(
+                        required_skills, output.extracted_evidence.skills, verified.get(idx, ([], []))[0]
+                    )
+
+                    # SCORING LOGIC
+                    interview_enabled = job.interview_enabled
+                    final_score = 0.0
+                    status = "Pending"
+
+                    if interview_enabled:
+                        # Conventional Flow: Wait for interview
+                        # Threshold for Shortlist: User Defined
+                        if output.weighted_resume_score >= resume_threshold:
+                            status = "Shortlisted"
+                        else:
+                            status = "Rejected"
+                        final_score = 0.0 # Will be calc after interview
+                    else:
+                        # Resume Only Flow: 100% Resume Score
+                        final_score = output.weighted_resume_score
+                        # Threshold for Selection: User Defined
+                        if final_score >= resume_threshold:
+                            status = "Selected (Resume)"
+                        else:
+                            status = "Rejected (Resume)"
+
+                    try:
+                        cid = add_candidate(
+                            name=source["filename"],
+                            resume_text=source["text"],
+                            prompt_text=source["prompt_text"],
+                            features=source["features"],
+                            minhash=source.get("minhash"),
+                            jd=jd_text,
+                            match_score=output.weighted_resume_score,
+                            matched_skills=matched_list,
+                            missing_skills=missing_list,
+                            resume_evaluation={**output.model_dump(), **_annotations(source)},
+                            status=status,
+                            recruiter_username=recruiter_username,
+                            interview_enabled=interview_enabled,
+                            final_score=final_score,
+                            template_key=template_key,
+                            upload_job_id=job_id,
+                            resume_threshold=resume_threshold
+                        )
+                        results_list.append({"candidate_id": cid, "status": "success", "filename": source["filename"]})
+                        stored.append((cid, source))
+                        with open("jobs_debug.log", "a", encoding="utf-8") as f: f.write(f"✅ Saved candidate {cid} ({source['filename']})\n")
+                    except Exception as e:
+                        with open("jobs_debug.log", "a", encoding="utf-8") as f: f.write(f"❌ DB Save Error: {e}\n")
+
+            valid_results = await _evaluate(parsed_resumes)
+
+            # Save to DB
+            stage_start = time.perf_counter()
+            results_list = []
+            stored = []  # (candidate_id, parsed resume) saved in this job
+            _save_evaluated(valid_results, parsed_resumes)
+
+            # Screened out by the pre-rank: stored with their pre-rank score, never sent to the LLM
+            screened_skills = verify_skills_batch(required_skills, [r["text"] for r in screened_out])
+            for source, (matched_list, missing_list) in zip(screened_out, screened_skills):
+                try:
+                    cid = add_candidate(
+                        name=source["filename"],
+                        resume_text=source["text"],
+                        prompt_text=source["prompt_text"],
+                        features=source["features"],
+                        minhash=source.get("minhash"),
+                        jd=jd_text,
+                        match_score=0.0,  # pre-rank score is relative to this upload, kept in the evaluation only
+                        matched_skills=matched_list,
+                        missing_skills=missing_list,
+                        resume_evaluation={"prerank_score": source["prerank_score"], **_annotations(source)},
+                        status=SCREENED_OUT_STATUS,
+                        recruiter_username=recruiter_username,
+                        interview_enabled=job.interview_enabled,
+                        final_score=0.0,
+                        template_key=template_key,
+                        upload_job_id=job_id,
+                        resume_threshold=resume_threshold
+                    )
+                    results_list.append({"candidate_id": cid, "status": "screened_out", "filename": source["filename"]})
+                    stored.append((cid, source))
+                except Exception as e:
+                    with open("jobs_debug.log", "a", encoding="utf-8") as f: f.write(f"❌ DB Save Error: {e}\n")
+            _record_stage(stage_timings, "save", stage_start)
+
+            # In-upload near-duplicates of a resume that failed to save: its first copy is evaluated instead
+            saved_rows = {source["index"] for _, source in stored}
+            standins = {}  # original's upload row -> copy evaluated in its place
+            for source, (other, _) in near_duplicates:
+                if other.startswith("upload:") and uploaded[int(other.split(":")[1])]["index"] not in saved_rows:
+                    standins.setdefault(int(other.split(":")[1]), source)
+            if standins:
+                copies = list(standins.values())
+                valid_copies = await _evaluate(copies)
+                stage_start = time.perf_counter()
+                _save_evaluated(valid_copies, copies)
+                _record_stage(stage_timings, "save", stage_start)
+                near_duplicates = [(r, match) for r, match in near_duplicates if all(r is not c for c in copies)]
+                near_duplicate_stats.update({"skipped": len(near_duplicates), "evaluated_copies": len(copies)})
+
+            # Append the new resumes to the persistent embedding store and the vector index
+            vectorized = [(cid, source) for cid, source in stored if "vector" in source]
+            if encoder and vectorized:
+                stage_start = time.perf_counter()
+                try:
+                    await asyncio.to_thread(
+                        store_candidate_vectors,
+                        [cid for cid, _ in vectorized],
+                        [source["text"] for _, source in vectorized],
+                        np.array([source["vector"] for _, source in vectorized]),
+                        encoder,
+                        recruiter_username,
+                        [source["chunk_vectors"] for _, source in vectorized]
+                    )
+                except Exception as e:
+                    logger.error(f"Embedding store error: {e}")
+                _record_stage(stage_timings, "index", stage_start)
+
+            # Near-duplicates link to the stored original (or the copy kept from this upload)
+            saved_ids = {source["index"]: cid for cid, source in stored}
+            for source, (other, jaccard) in near_duplicates:
+                entry = {"status": "duplicate", "filename": source["filename"], "jaccard": round(jaccard, 4)}
+                if other.startswith("upload:"):
+                    row = int(other.split(":")[1])
+                    original = standins.get(row, uploaded[row])
+                    entry.update({"duplicate_of": saved_ids.get(original["index"]), "duplicate_of_file": original["filename"]})
                 else:
-                    status = "Rejected (Resume)"
-
-            try:
-                cid = add_candidate(
-                    name=source["filename"],
-                    resume_text=source["text"],
-                    jd=jd_text,
-                    match_score=output.weighted_resume_score,
-                    matched_skills=matched_list,
-                    missing_skills=missing_list,
-                    resume_evaluation=output.model_dump(),
-                    status=status,
-                    recruiter_username=recruiter_username,
-                    interview_enabled=interview_enabled,
-                    final_score=final_score
-                )
-                results_list.append({"candidate_id": cid, "status": "success", "filename": source["filename"]})
-                with open("jobs_debug.log", "a", encoding="utf-8") as f: f.write(f"✅ Saved candidate {cid} ({source['filename']})\n")
-            except Exception as e:
-                with open("jobs_debug.log", "a", encoding="utf-8") as f: f.write(f"❌ DB Save Error: {e}\n")
-
-        # Append errors
-        results_list.extend(errors)
+                    entry["duplicate_of"] = other
+                results_list.append(entry)
+
+            # Append errors
+            results_list.extend(errors)
         
-        # Finalize Job
-        job.processed_count = len(files_data)
-        job.status = "completed"
-        job.results = json.dumps(results_list)
-        session.commit()
-        logger.info(f"Job {job_id} Completed. {len(valid_results)} successes.")
-        with open("jobs_debug.log", "a", encoding="utf-8") as f: f.write(f"Job {job_id} Completed.\n")
+            # Finalize Job
+            job.processed_count = len(files_data)
+            job.status = "completed"
+            job.results = json.dumps(results_list)
+            job.metrics = _metrics()
+            session.commit()
+            logger.info(f"Job {job_id} Completed. {len(valid_results)} successes.")
+            with open("jobs_debug.log", "a", encoding="utf-8") as f: f.write(f"Job {job_id} Completed.\n")
         
-    except Exception as e:
-        logger.error(f"Job {job_id} failed: {e}")
-        with open("jobs_debug.log", "a", encoding="utf-8") as f: f.write(f"❌ CRITICAL JOB FAILURE: {e}\n")
-        job.status = "failed"
-        job.results = json.dumps({"error": str(e)})
-        session.commit()
-    finally:
-        session.close()
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            with open("jobs_debug.log", "a", encoding="utf-8") as f: f.write(f"❌ CRITICAL JOB FAILURE: {e}\n")
+            job.status = "failed"
+            job.results = json.dumps({"error": str(e)})
+            job.metrics = _metrics()
+            session.commit()
+        finally:
+            session.close()
@@ -0,0 +1,126 @@
+"""
+Keyword fallback matcher used when the LLM is unavailable.
+
+The JD is tokenized once into a vocabulary of "skill-like" words (len > 3, not a
+stopword); resumes are then vectorized in bulk into a sparse binary term matrix,
+so matched / missing keywords for a whole upload come out of one transform.
+"""
+import re
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+
+TOKEN_PATTERN = r"(?u)\b\w+\b"
+
+# Generic JD vocabulary that says nothing about a candidate's skills
+STOPWORDS = frozenset({
+    "with", "experience", "knowledge", "working", "good", "strong", "skills",
+    "ability", "work", "team", "environment", "years", "plus", "have", "from",
+    "that", "this", "will", "your", "development", "using", "used", "proficient",
+    "understanding", "excellent", "must", "should", "requirements", "project",
+    "projects", "code", "coding", "software", "engineer", "engineering", "user",
+    "required", "preferred", "role", "candidate", "responsibilities", "include",
+    "ensure", "collaborate", "support", "design", "build", "maintain", "create",
+    "perform", "manage", "across", "within", "tools", "systems", "processes",
+    "best", "practices", "technical", "technologies", "application", "applications",
+    "solution", "solutions", "business", "functional", "specifications", "needs",
+    "issues", "problems", "quality", "performance", "high", "scalable", "secure",
+    "reliable", "efficient", "effective", "effectively", "communicate", "communication",
+    "written", "verbal", "degree", "bachelor", "master", "computer", "science",
+    "related", "field", "equivalent", "complex", "large", "scale", "modern",
+    "frameworks", "libraries", "platforms", "services", "cloud", "infrastructure",
+    "deployment", "continuous", "integration", "delivery", "agile", "scrum",
+    "methodologies", "participate", "reviews", "testing", "debugging", "troubleshooting",
+    "optimization", "security", "compliance", "standards", "documentation",
+    "mentor", "junior", "members", "stakeholders", "product", "owners", "managers",
+    "customers", "clients", "partners", "vendors", "internal", "external",
+    "teams", "cross-functional", "initiatives", "goals", "objectives", "tasks",
+    "assignments", "deadline", "driven", "detail", "oriented", "analytical",
+    "problem", "solving", "interpersonal", "organizational", "time", "management",
+    "prioritize", "multiple", "concurrent", "activities", "under", "pressure",
+    "fast", "paced", "dynamic", "startup", "culture", "passion", "learning",
+    "technologies", "innovative", "creative", "thinking", "adapt", "change",
+    "willingness", "travel", "location", "remote", "hybrid", "office", "salary",
+    "benefits", "package", "health", "dental", "vision", "insurance", "paid",
+    "vacation", "holidays", "sick", "leave", "retirement", "plan", "match",
+    "equity", "stock", "options", "bonus", "performance", "review", "annual",
+    "quarterly", "monthly", "weekly", "daily", "hours", "schedule", "shift",
+    "monday", "friday", "weekend", "evenings", "nights", "time", "full", "part",
+    "contract", "temporary", "permanent", "internship", "co-op", "entry",
+    "level", "mid", "senior", "lead", "principal", "architect", "manager",
+    "director", "executive", "officer", "chief", "head", "president", "founder",
+    "cofounder", "partner", "associate", "analyst", "consultant", "specialist",
+    "coordinator", "administrator", "generalist", "recruiter", "sourcer",
+    "coordinator", "business", "operations", "sales", "marketing", "finance",
+    "accounting", "legal", "compliance", "regulatory", "affairs", "government",
+    "public", "relations", "media", "communications", "content", "strategy",
+    "planning", "analytics", "data", "science", "research", "development",
+    "product", "project", "program", "portfolio", "management", "customer",
+    "success", "support", "service", "account", "management", "business",
+    "development", "partnerships", "alliances", "channels", "distribution",
+    "logistics", "supply", "chain", "procurement", "purchasing", "sourcing",
+    "inventory", "warehouse", "transportation", "shipping", "receiving",
+    "facilities", "maintenance", "security", "safety", "environmental",
+    "health", "quality", "assurance", "control", "manufacturing", "production",
+    "assembly", "fabrication", "machining", "welding", "construction",
+    "installation", "repair", "service", "technician", "mechanic", "electrician"})
+
+
+class KeywordMatcher:
+    def __init__(self, jd_text: str, min_length: int = 4):
+        tokens = re.findall(TOKEN_PATTERN, (jd_text or "").lower())
+        self.vocabulary = sorted({t for t in tokens if len(t) >= min_length and t not in STOPWORDS})
+        self._vectorizer = None
+        if self.vocabulary:
+            self._vectorizer = CountVectorizer(
+                vocabulary=self.vocabulary,
+                binary=True,
+                lowercase=True,
+                token_pattern=TOKEN_PATTERN,
+            )
+
+    def transform(self, resume_texts: List[str]):
+        """Sparse (n_resumes x n_keywords) binary presence matrix."""
+        matrix = self._vectorizer.transform(resume_texts)
+        matrix.sort_indices()
+        return matrix
+
+    def match_many(self, resume_texts: List[str], limit: int = 10) -> List[dict]:
+        """
+        Matched / missing JD keywords for every resume in one pass.
+        `keyword_score` is the share of JD keywords present (0-100).
+        """
+        if not self._vectorizer:
+            return [_result([], [], 0.0) for _ in resume_texts]
+
+        matrix = self.transform(resume_texts)
+        coverage = np.asarray(matrix.sum(axis=1)).ravel() / len(self.vocabulary)
+        vocab = np.array(self.vocabulary)
+        all_columns = np.arange(len(self.vocabulary))
+
+        results = []
+        for row, score in enumerate(coverage):
+            present = matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]
+            absent = np.setdiff1d(all_columns, present, assume_unique=True)
+            results.append(_result(vocab[present[:limit]].tolist(), vocab[absent[:limit]].tolist(), score * 100))
+        return results
+
+    def match(self, resume_text: str, limit: int = 10) -> dict:
+        return self.match_many([resume_text], limit=limit)[0]
+
+
+@lru_cache(maxsize=32)
+def get_keyword_matcher(jd_text: str) -> KeywordMatcher:
+    """Matcher for a JD, built once per JD and reused across resumes."""
+    return KeywordMatcher(jd_text)
+
+
+def _result(matched: List[str], missing: List[str], score: float) -> dict:
+    return {
+        "matched_skills": matched,
+        "missing_skills": missing,
+        "keyword_score": round(float(score), 2),
+        "reasoning": "LLM unavailable. Fallback to keyword matching.",
+    }
@@ -0,0 +1,179 @@
+"""
+Deterministic, LLM-free estimate of the five Likert scores
+(education, experience, skills, projects, certifications) from resume text.
+
+Used as the outage fallback for bulk evaluation and as a cheap first pass over
+large pools. Features are extracted per resume with precompiled patterns and
+mapped to 1-5 for the whole batch at once with NumPy.
+"""
+import re
+from datetime import datetime
+from typing import List
+
+import numpy as np
+
+from app.schemas import LikertScores
+from app.skill_verifier import get_verifier
+
+LIKERT_FIELDS = ("education", "experience", "skills", "projects", "certifications")
+
+_SECTION_HEADINGS = {
+    "education": ["Education", "Academic Background", "Academics", "Qualifications"],
+    "experience": ["Experience", "Work Experience", "Professional Experience", "Employment", "Employment History", "Work History", "Internships", "Internship"],
+    "projects": ["Projects", "Personal Projects", "Academic Projects", "Key Projects"],
+    "certifications": ["Certifications", "Certificates", "Licenses & Certifications", "Certification"],
+    "skills": ["Skills", "Technical Skills", "Key Skills", "Technologies", "Tech Stack"],
+}
+
+
+def _heading_pattern(titles: List[str]) -> "re.Pattern":
+    # Parsed text has its whitespace collapsed, so headings are found as Title/UPPER case words,
+    # not lines; lowercase prose ("experience with ...") does not count.
+    variants = sorted({v for t in titles for v in (t, t.upper())}, key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(re.escape(v) for v in variants) + r")\b:?")
+
+
+_SECTION_RE = {name: _heading_pattern(titles) for name, titles in _SECTION_HEADINGS.items()}
+
+# Ordered best-first: (likert score, pattern)
+DEGREE_LEXICON = [
+    # "Scrum Master" / "master data" are not degrees
+    (5, re.compile(r"\b(?:ph\.?\s?d|doctorate|m\.?\s?tech|m\.\s?e\.|m\.?\s?sc|m\.\s?s\.|(?<!scrum\s)(?<!scrum-)master'?s?(?!\s+data\b)|mba|m\.?\s?c\.?\s?a)\b", re.IGNORECASE)),
+    (4, re.compile(r"\b(?:b\.?\s?tech|b\.\s?e\.|b\.?\s?sc|b\.\s?s\.|bachelor'?s?|b\.?\s?c\.?\s?a|undergraduate)\b", re.IGNORECASE)),
+    (3, re.compile(r"\b(?:diploma|associate(?:'s)? degree|polytechnic)\b", re.IGNORECASE)),
+]
+
+_MAJOR_CERTS = re.compile(
+    r"\b(?:aws certified|azure (?:administrator|developer|solutions architect)|az-\d{3}|"
+    r"google cloud (?:certified|professional)|gcp professional|cka|ckad|cks|pmp|cissp|cisa|cism|"
+    r"ccna|ccnp|comptia|oracle certified|ocp|red hat certified|rhce|rhcsa|scrum master|csm|"
+    r"terraform associate|tensorflow developer)\b",
+    re.IGNORECASE,
+)
+_ANY_CERT = re.compile(r"\b(?:certified|certification|certificate)\b", re.IGNORECASE)
+
+_YEARS_RE = re.compile(r"\b(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs?)\b", re.IGNORECASE)
+DATE_RANGE_RE = re.compile(
+    r"\b((?:19|20)\d{2})\s*(?:-|–|—|to)\s*((?:19|20)\d{2}|present|current|now|till date|ongoing)\b",
+    re.IGNORECASE,
+)
+_PROJECT_RE = re.compile(r"\bprojects?\b", re.IGNORECASE)
+_BULLET_RE = re.compile(r"(?:^|\s)[•▪●◦➢►]\s")
+_ACTION_RE = re.compile(r"\b(?:built|developed|implemented|designed|created|engineered|deployed)\b", re.IGNORECASE)
+
+# Bin edges -> Likert 1..5 via np.digitize
+_EXPERIENCE_YEARS_BINS = [0.5, 1.5, 3, 6]
+_PROJECT_COUNT_BINS = [1, 2, 3, 5]
+
+
+def section_starts(text: str, pos: int = 0) -> List[int]:
+    """Sorted offsets of every resume section heading (Education, Experience, ...) from `pos` on."""
+    return sorted({m.start() for r in _SECTION_RE.values() for m in r.finditer(text, pos)})
+
+
+def section_body(text: str, section: str) -> str:
+    """Text between a section heading and the next heading of any section (empty if absent)."""
+    match = _SECTION_RE[section].search(text)
+    if not match:
+        return ""
+    following = section_starts(text, match.end())
+    return text[match.end():following[0] if following else len(text)]
+
+
+def years_of_experience(text: str) -> float:
+    """
+    Largest of the stated 'N years' and the span covered by date ranges (merged, capped at 40).
+    Ranges are read from the experience section when there is one, so degree dates don't count.
+    """
+    stated = max((float(m) for m in _YEARS_RE.findall(text)), default=0.0)
+
+    now = datetime.now().year
+    spans = []
+    for start, end in DATE_RANGE_RE.findall(section_body(text, "experience") or text):
+        s = int(start)
+        e = now if not end[:1].isdigit() else int(end)
+        if s <= e <= now + 1:
+            spans.append((s, e))
+    covered, covered_end = 0, None
+    for s, e in sorted(spans):
+        # Merge overlapping ranges so parallel roles/education aren't double counted
+        if covered_end is not None and s <= covered_end:
+            covered += max(e - covered_end, 0)
+            covered_end = max(e, covered_end)
+        else:
+            covered += e - s
+            covered_end = e
+    return min(max(stated, float(covered)), 40.0)
+
+
+def degree_level(text: str) -> int:
+    """Highest degree on the 1-5 scale, read from the education section (the whole text if none)."""
+    body = section_body(text, "education") or text
+    return next((level for level, pattern in DEGREE_LEXICON if pattern.search(body)), 1)
+
+
+def extract_features(text: str) -> List[float]:
+    """[degree_level, years, has_experience_section, project_count, cert_level]"""
+    text = text or ""
+    degree = degree_level(text)
+    if degree == 1 and _SECTION_RE["education"].search(text):
+        degree = 2
+
+    projects_body = section_body(text, "projects")
+    if projects_body:
+        project_count = max(len(_BULLET_RE.findall(projects_body)), len(_ACTION_RE.findall(projects_body)), 1)
+    else:
+        project_count = min(len(_PROJECT_RE.findall(text)), 3)
+
+    if _MAJOR_CERTS.search(text):
+        cert_level = 5
+    else:
+        cert_mentions = len(_ANY_CERT.findall(text)) + (1 if _SECTION_RE["certifications"].search(text) else 0)
+        cert_level = min(1 + cert_mentions, 4)
+
+    return [
+        float(degree),
+        years_of_experience(text),
+        1.0 if _SECTION_RE["experience"].search(text) else 0.0,
+        float(project_count),
+        float(cert_level),
+    ]
+
+
+def score_batch(texts: List[str], required_skills: List[str]) -> np.ndarray:
+    """
+    (n_resumes x 5) int matrix of Likert scores in LIKERT_FIELDS order.
+    """
+    if not texts:
+        return np.zeros((0, len(LIKERT_FIELDS)), dtype=int)
+
+    features = np.array([extract_features(t) for t in texts])
+    degree, years, has_exp, projects, certs = features.T
+
+    experience = np.digitize(years, _EXPERIENCE_YEARS_BINS) + 1
+    # An experience/internship section with no datable tenure still beats nothing
+    experience = np.where((experience == 1) & (has_exp > 0), 2, experience)
+
+    if required_skills:
+        verifier = get_verifier(required_skills)
+        found = np.array([len(hits) for hits in verifier.found_many(texts)], dtype=float)
+        coverage = np.clip(found / len(verifier.keys), 0, 1)
+    else:
+        coverage = np.zeros(len(texts))
+    skills = 1 + np.rint(coverage * 4)
+
+    project_scores = np.digitize(projects, _PROJECT_COUNT_BINS) + 1
+
+    scores = np.column_stack([degree, experience, skills, project_scores, certs])
+    return np.clip(scores, 1, 5).astype(int)
+
+
+def likert_scores_batch(texts: List[str], required_skills: List[str]) -> List[LikertScores]:
+    return [LikertScores(**dict(zip(LIKERT_FIELDS, row.tolist()))) for row in score_batch(texts, required_skills)]
+
+
+def weighted_scores(scores: np.ndarray, role_template: dict) -> np.ndarray:
+    """resume_score = Σ(likert / 5 × parameter_weight) × 100, for every row at once."""
+    params = role_template.get("parameters", {})
+    weights = np.array([params.get(field, 0.0) for field in LIKERT_FIELDS])
+    return np.round(scores / 5.0 @ weights * 100, 2)
@@ -1,27 +1,46 @@
-import os
+from typing import Optional
 from langchain_openai import ChatOpenAI
 from pydantic import SecretStr
 from dotenv import load_dotenv
+from app.llm_pool import get_pool
+from app.llm_routes import get_route, DEFAULT
+from app.llm_metrics import LLMMetricsHandler
+from app.llm_fake import is_offline_base_url, get_offline_http_clients
+from app.llm_cassette import get_cassette, get_cassette_http_clients
 
 load_dotenv(override=True)
 
-def get_llm(temperature: float = 0, max_tokens: int = 1000):
+def get_llm(route: str = DEFAULT, temperature: Optional[float] = None, max_tokens: Optional[int] = None):
     """
-    Get the configured LLM instance.
+    Get the configured LLM instance for a call site.
+    Model and parameters come from the routing table (see app.llm_routes);
+    explicit temperature/max_tokens override the route defaults.
+    Each call is bound to the least-loaded healthy endpoint of the pool.
     """
-    api_key = os.getenv("OPENROUTER_API_KEY") or os.getenv("OPENAI_API_KEY")
-    base_url = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
-    model_name = os.getenv("LLM_MODEL", "gpt-4o-mini")
-    
-    if not api_key:
-        print("❌ No API Key found. Please set OPENAI_API_KEY or OPENROUTER_API_KEY.")
+    pool = get_pool()
+    endpoint = pool.acquire()
+
+    if not endpoint:
+        print("❌ No API Key found. Please set OPENAI_API_KEY, OPENROUTER_API_KEY or LLM_ENDPOINTS.")
         return None
-        
+
+    cfg = get_route(route)
+    model_name = cfg.get("model") or endpoint.model
+
+    client_kwargs = {}
+    offline = is_offline_base_url(endpoint.base_url)
+    if get_cassette():
+        client_kwargs["http_client"], client_kwargs["http_async_client"] = get_cassette_http_clients(offline)
+    elif offline:
+        client_kwargs["http_client"], client_kwargs["http_async_client"] = get_offline_http_clients()
+
     return ChatOpenAI(
         model=model_name,
-        temperature=temperature,
-        api_key=SecretStr(api_key),
-        base_url=base_url,
-        max_tokens=max_tokens,
-        model_kwargs={"seed": 42}
+        temperature=cfg.get("temperature", 0) if temperature is None else temperature,
+        api_key=SecretStr(endpoint.api_key),
+        base_url=endpoint.base_url,
+        max_tokens=cfg.get("max_tokens", 1000) if max_tokens is None else max_tokens,
+        model_kwargs={"seed": 42},
+        callbacks=[pool.tracker(endpoint, reserved=True), LLMMetricsHandler(route, model_name)],
+        **client_kwargs
     )
@@ -0,0 +1,230 @@
+"""
+Record/replay of LLM traffic for reproducible performance baselines.
+
+The cassette sits at the HTTP layer (an httpx transport wrapped around the real or
+offline transport), so it captures exactly what every chain sent and received,
+including structured-output calls, without touching call sites.
+
+    record   Forward requests and append {key, tags, request, status, response, latency_ms}
+             to a JSONL cassette. Tags carry the ambient llm_context (job_id, session_id, ...).
+    replay   Serve responses from the cassette keyed by a hash of the request body, sleeping
+             recorded_latency / LLM_CASSETTE_SPEED (0 = no delay). Identical requests are
+             served in recorded order.
+
+Env:
+    LLM_CASSETTE_MODE    off | record | replay (default off)
+    LLM_CASSETTE_PATH    JSONL file (default data/llm_cassette.jsonl)
+    LLM_CASSETTE_SPEED   Replay speed-up factor (default 1.0 = recorded latency)
+    LLM_CASSETTE_MISS    What replay does for unknown requests: error | passthrough (default error)
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Deque, Dict, Optional, Tuple
+
+import httpx
+from loguru import logger
+
+from app.llm_fake import FakeOpenAITransport
+from app.llm_metrics import current_tags
+
+# Headers that no longer describe the body once it has been read and decoded
+_STRIP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+def request_key(request: httpx.Request) -> str:
+    try:
+        body = json.dumps(json.loads(request.content or b"{}"), sort_keys=True)
+    except ValueError:
+        body = (request.content or b"").decode("utf-8", errors="ignore")
+    return hashlib.sha256(f"{request.url.path}\n{body}".encode("utf-8")).hexdigest()
+
+
+class LLMCassette:
+    def __init__(self, mode: str, path: str, speed: float = 1.0, on_miss: str = "error"):
+        self.mode = mode
+        self.path = path
+        self.speed = speed
+        self.on_miss = on_miss
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Deque[dict]] = defaultdict(deque)
+        self._last: Dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+        if mode == "replay":
+            self._load()
+
+    @classmethod
+    def from_env(cls) -> Optional["LLMCassette"]:
+        mode = os.getenv("LLM_CASSETTE_MODE", "off").lower()
+        if mode not in ("record", "replay"):
+            return None
+        return cls(
+            mode=mode,
+            path=os.getenv("LLM_CASSETTE_PATH", "data/llm_cassette.jsonl"),
+            speed=float(os.getenv("LLM_CASSETTE_SPEED", "1.0")),
+            on_miss=os.getenv("LLM_CASSETTE_MISS", "error").lower(),
+        )
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            logger.warning(f"⚠️ LLM cassette {self.path} not found; every request will miss.")
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+        logger.info(f"📼 Loaded {sum(len(q) for q in self._entries.values())} LLM cassette entries from {self.path}")
+
+    def record(self, request: httpx.Request, status: int, body: bytes, latency_ms: float):
+        try:
+            response = json.loads(body)
+        except ValueError:
+            response = body.decode("utf-8", errors="ignore")
+        entry = {
+            "key": request_key(request),
+            "recorded_at": datetime.now().isoformat(),
+            "tags": current_tags(),
+            "path": request.url.path,
+            "request": json.loads(request.content or b"{}"),
+            "status": status,
+            "response": response,
+            "latency_ms": round(latency_ms, 2),
+        }
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def lookup(self, request: httpx.Request) -> Optional[dict]:
+        key = request_key(request)
+        with self._lock:
+            queue = self._entries.get(key)
+            if queue:
+                # Consume in recorded order, then keep serving the last response
+                self._last[key] = queue.popleft()
+            entry = self._last.get(key)
+            if entry:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    def replay_delay(self, entry: dict) -> float:
+        if not self.speed:
+            return 0.0
+        return entry.get("latency_ms", 0) / 1000 / self.speed
+
+
+class CassetteMiss(httpx.TransportError):
+    pass
+
+
+def _replayed_response(entry: dict) -> httpx.Response:
+    payload = entry["response"]
+    if isinstance(payload, str):
+        return httpx.Response(entry["status"], text=payload)
+    return httpx.Response(entry["status"], json=payload)
+
+
+def _rebuilt_response(response: httpx.Response, body: bytes) -> httpx.Response:
+    headers = [(k, v) for k, v in response.headers.items() if k.lower() not in _STRIP_HEADERS]
+    return httpx.Response(response.status_code, headers=headers, content=body)
+
+
+class CassetteTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Wraps an inner transport (sync and/or async) with record or replay behaviour."""
+
+    def __init__(self, cassette: LLMCassette, inner_sync: Optional[httpx.BaseTransport] = None, inner_async: Optional[httpx.AsyncBaseTransport] = None):
+        self.cassette = cassette
+        self.inner_sync = inner_sync
+        self.inner_async = inner_async
+
+    def _miss(self, request: httpx.Request):
+        raise CassetteMiss(f"No cassette entry for {request.url.path} (key {request_key(request)[:12]})", request=request)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self.cassette.mode == "replay":
+            entry = self.cassette.lookup(request)
+            if entry:
+                delay = self.cassette.replay_delay(entry)
+                if delay:
+                    time.sleep(delay)
+                return _replayed_response(entry)
+            if self.cassette.on_miss != "passthrough" or not self.inner_sync:
+                self._miss(request)
+
+        start = time.perf_counter()
+        response = self.inner_sync.handle_request(request)
+        body = response.read()
+        latency_ms = (time.perf_counter() - start) * 1000
+        if self.cassette.mode == "record":
+            self.cassette.record(request, response.status_code, body, latency_ms)
+        return _rebuilt_response(response, body)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.cassette.mode == "replay":
+            entry = self.cassette.lookup(request)
+            if entry:
+                delay = self.cassette.replay_delay(entry)
+                if delay:
+                    await asyncio.sleep(delay)
+                return _replayed_response(entry)
+            if self.cassette.on_miss != "passthrough" or not self.inner_async:
+                self._miss(request)
+
+        start = time.perf_counter()
+        response = await self.inner_async.handle_async_request(request)
+        body = await response.aread()
+        latency_ms = (time.perf_counter() - start) * 1000
+        if self.cassette.mode == "record":
+            self.cassette.record(request, response.status_code, body, latency_ms)
+        return _rebuilt_response(response, body)
+
+
+_cassette: Optional[LLMCassette] = None
+_cassette_loaded = False
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[LLMCassette]:
+    global _cassette, _cassette_loaded
+    if not _cassette_loaded:
+        with _cassette_lock:
+            if not _cassette_loaded:
+                _cassette = LLMCassette.from_env()
+                _cassette_loaded = True
+    return _cassette
+
+
+_clients: Dict[bool, Tuple[httpx.Client, httpx.AsyncClient]] = {}
+
+
+def get_cassette_http_clients(offline: bool = False) -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """Shared sync/async httpx clients routing through the cassette, over the offline or network transport."""
+    cassette = get_cassette()
+    with _cassette_lock:
+        if offline not in _clients:
+            if offline:
+                inner_sync = inner_async = FakeOpenAITransport()
+            else:
+                inner_sync, inner_async = httpx.HTTPTransport(), httpx.AsyncHTTPTransport()
+            transport = CassetteTransport(cassette, inner_sync, inner_async)
+            _clients[offline] = (httpx.Client(transport=transport), httpx.AsyncClient(transport=transport))
+    return _clients[offline]
+
+
+def reset_cassette():
+    """Drop the cached cassette and clients so the next call re-reads the environment."""
+    global _cassette, _cassette_loaded
+    with _cassette_lock:
+        _cassette = None
+        _cassette_loaded = False
+        _clients.clear()
@@ -0,0 +1,365 @@
+"""
+Offline, OpenAI-compatible LLM stand-in for load tests and benchmarks.
+
+Point an endpoint at `offline://...` (e.g. OPENAI_API_BASE=offline://fake/v1, no API key
+needed) and `get_llm` wires ChatOpenAI to an in-process httpx transport that answers
+`/chat/completions` like the real API: it recognises every prompt in
+app.interview_prompts plus BULK_EVALUATION_PROMPT, returns schema-valid JSON (including
+`response_format` structured output), reports token usage and simulates latency, token
+throughput and errors. scripts/fake_llm_server.py serves the same responder over HTTP.
+
+Responses, latency and injected errors are derived from a hash of the request body, so
+identical runs behave identically regardless of concurrency.
+
+Env:
+    FAKE_LLM_LATENCY          Base latency distribution in ms (default "fixed:0"):
+                              fixed:<ms> | uniform:<lo>:<hi> | normal:<mean>:<std> | lognormal:<median>:<sigma>
+    FAKE_LLM_TOKENS_PER_SEC   Completion token rate added on top of the base latency (0 = instant).
+    FAKE_LLM_ERROR_RATE       Fraction of requests answered with 429/500 (default 0).
+    FAKE_LLM_SEED             Seed mixed into the per-request hash (default 42).
+    FAKE_LLM_CACHE_MIN_TOKENS Simulated prompt caching: prompts of at least this many tokens report
+                              the prefix shared with an earlier request (in 128-token steps) as
+                              `prompt_tokens_details.cached_tokens`, like the OpenAI API
+                              (default 1024, 0 = off). Cache hits depend on request order.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from typing import List, Optional, Tuple
+
+import httpx
+
+OFFLINE_SCHEME = "offline://"
+
+# Small skill lexicon used to fake the skill matcher
+_SKILL_LEXICON = [
+    "Python", "Java", "JavaScript", "TypeScript", "Go", "Rust", "C++", "C#", "SQL", "NoSQL",
+    "React", "Angular", "Vue", "Node.js", "Django", "Flask", "FastAPI", "Spring", ".NET",
+    "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Terraform", "Linux", "Git", "CI/CD",
+    "PostgreSQL", "MySQL", "MongoDB", "Redis", "Kafka", "Spark", "Airflow", "Pandas", "NumPy",
+    "TensorFlow", "PyTorch", "Scikit-learn", "Machine Learning", "REST", "GraphQL", "Agile",
+]
+_ROLE_TITLES = [
+    "Machine Learning Engineer", "Data Scientist", "Data Engineer", "DevOps Engineer",
+    "Frontend Developer", "Backend Developer", "Full Stack Developer", "Product Manager",
+    "QA Engineer", "Software Engineer",
+]
+_QUESTIONS = [
+    "Got it. Can you walk me through the architecture of the most complex project on your resume?",
+    "Right. How did you decide between the tools you used there, and what trade-offs did you accept?",
+    "Cool. Tell me about a production bug you tracked down and how you fixed it.",
+    "Makes sense. How would you test and deploy that service safely?",
+    "Nice. Which part of the job description do you feel least experienced in, and how would you ramp up?",
+]
+
+
+def is_offline_base_url(base_url: Optional[str]) -> bool:
+    return bool(base_url) and base_url.startswith(OFFLINE_SCHEME)
+
+
+# --- Config ---
+
+class FakeLLMConfig:
+    def __init__(self, latency: str = "fixed:0", tokens_per_sec: float = 0.0, error_rate: float = 0.0, seed: int = 42, cache_min_tokens: int = 1024):
+        self.latency = latency
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self.seed = seed
+        self.cache_min_tokens = cache_min_tokens
+
+    @classmethod
+    def from_env(cls) -> "FakeLLMConfig":
+        return cls(
+            latency=os.getenv("FAKE_LLM_LATENCY", "fixed:0"),
+            tokens_per_sec=float(os.getenv("FAKE_LLM_TOKENS_PER_SEC", "0")),
+            error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+            seed=int(os.getenv("FAKE_LLM_SEED", "42")),
+            cache_min_tokens=int(os.getenv("FAKE_LLM_CACHE_MIN_TOKENS", "1024")),
+        )
+
+    def sample_latency_ms(self, rng: random.Random) -> float:
+        kind, *args = self.latency.split(":")
+        values = [float(a) for a in args]
+        if kind == "uniform":
+            return rng.uniform(values[0], values[1])
+        if kind == "normal":
+            return max(0.0, rng.gauss(values[0], values[1]))
+        if kind == "lognormal":
+            return values[0] * rng.lognormvariate(0.0, values[1])
+        return values[0] if values else 0.0
+
+
+# --- Prompt responders ---
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _section(text: str, start: str, end: Optional[str] = None) -> str:
+    if start not in text:
+        return ""
+    tail = text.split(start, 1)[1]
+    if end and end in tail:
+        tail = tail.split(end, 1)[0]
+    return tail.strip()
+
+
+def _skills_in(text: str) -> List[str]:
+    lowered = text.lower()
+    found = []
+    for skill in _SKILL_LEXICON:
+        s = skill.lower()
+        if re.search(rf"(?<![\w]){re.escape(s)}(?![\w])", lowered):
+            found.append(skill)
+    return found
+
+
+def _likert(rng: random.Random) -> dict:
+    return {k: rng.randint(1, 5) for k in ("education", "experience", "skills", "projects", "certifications")}
+
+
+def _evidence(text: str, rng: random.Random) -> dict:
+    return {
+        "education": rng.choice(["B.Tech Computer Science", "M.Sc Data Science", "Not Evident"]),
+        "experience": f"{rng.randint(0, 8)} years relevant experience",
+        "skills": _skills_in(text)[:12],
+        "projects": f"{rng.randint(0, 5)} projects",
+        "certifications": rng.choice(["None", "AWS Certified Developer", "Not Evident"]),
+    }
+
+
+def _feedback() -> dict:
+    return {
+        "strengths": ["Relevant technical stack"],
+        "weaknesses": ["Limited quantified impact"],
+        "improvement_suggestions": ["Add measurable outcomes to project bullets"],
+    }
+
+
+def _respond_matching(prompt: str, rng: random.Random) -> str:
+    resume = _section(prompt, "Resume:\n", "Job Description:\n")
+    jd = _section(prompt, "Job Description:\n")
+    jd_skills = _skills_in(jd)
+    resume_skills = set(_skills_in(resume))
+    return json.dumps({
+        "matched_skills": [s for s in jd_skills if s in resume_skills],
+        "missing_skills": [s for s in jd_skills if s not in resume_skills],
+        "reasoning": "Offline stand-in: lexicon overlap between resume and job description.",
+    })
+
+
+def _respond_profile(prompt: str, rng: random.Random) -> str:
+    resume = _section(prompt, "Resume Text:\n", "OUTPUT RULES:")
+    email = re.search(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", resume)
+    return json.dumps({
+        "name": " ".join(resume.split()[:2]) or "Unknown",
+        "email": email.group(0) if email else "",
+        "phone": "",
+        "skills": _skills_in(resume),
+        "education": [],
+        "experience": [],
+        "certifications": [],
+    })
+
+
+def _respond_grading(prompt: str, rng: random.Random) -> str:
+    answer = _section(prompt, "Candidate Answer:", "GRADING RUBRIC")
+    score = min(10.0, round(2 + len(answer.split()) / 15 + rng.random() * 2, 1))
+    return json.dumps({
+        "score": score,
+        "feedback": "Offline stand-in grading based on answer depth.",
+        "strength": "Clear structure" if score >= 6 else "",
+        "gap": "Needs more technical detail" if score < 8 else "",
+        "improvement": "Discuss trade-offs and edge cases.",
+    })
+
+
+def _respond_interview(prompt: str, rng: random.Random) -> str:
+    history = _section(prompt, "CHAT HISTORY:", "CURRENT STATE:")
+    turn = history.count("Interviewer:")
+    return _QUESTIONS[turn % len(_QUESTIONS)]
+
+
+def _respond_role(prompt: str, rng: random.Random) -> str:
+    jd = _section(prompt, "Job Description:\n", "Rules:").lower()
+    for title in _ROLE_TITLES:
+        if title.lower() in jd:
+            return title
+    return "Software Engineer"
+
+
+def _respond_resume_evaluation(prompt: str, rng: random.Random) -> str:
+    resume = _section(prompt, "Resume Text:\n")
+    return json.dumps({
+        "extracted_evidence": _evidence(resume, rng),
+        "likert_scores": _likert(rng),
+        "weighted_resume_score": 0.0,
+        "decision": "Pending",
+        "interview_required": False,
+        "resume_feedback": _feedback(),
+    })
+
+
+def _respond_bulk(prompt: str, rng: random.Random) -> str:
+    candidates = re.split(r"-- CANDIDATE (\d+) --", prompt)
+    items = []
+    # re.split yields [prefix, idx, text, idx, text, ...]
+    for idx, text in zip(candidates[1::2], candidates[2::2]):
+        items.append({
+            "index": int(idx),
+            "likert_scores": _likert(rng),
+            "extracted_evidence": _evidence(text, rng),
+            "resume_feedback": _feedback(),
+        })
+    return json.dumps(items)
+
+
+# (marker in rendered prompt, responder). Order matters: most specific first.
+_RESPONDERS = [
+    ("evaluate MULTIPLE candidates", _respond_bulk),
+    ("AI Resume Evaluation Engine", _respond_resume_evaluation),
+    ("expert Resume Parser", _respond_profile),
+    ("AI Resume Matcher and Recruiter", _respond_matching),
+    ("Strict Senior Technical Interviewer", _respond_grading),
+    ("identify the Job Role/Title", _respond_role),
+    ("conducting a casual yet technical screening", _respond_interview),
+]
+_SCHEMA_RESPONDERS = {
+    "ResumeEvaluationOutput": _respond_resume_evaluation,
+    "CandidateProfile": _respond_profile,
+}
+
+
+def _render_messages(messages: list) -> str:
+    parts = []
+    for m in messages:
+        content = m.get("content")
+        if isinstance(content, list):
+            content = "\n".join(p.get("text", "") for p in content if isinstance(p, dict))
+        parts.append(content or "")
+    return "\n".join(parts)
+
+
+class PromptPrefixCache:
+    """Prefix hashes of earlier prompts, at the provider's cache granularity."""
+
+    STEP_TOKENS = 128
+    MAX_ENTRIES = 50_000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen = set()
+
+    def cached_tokens(self, prompt: str, min_tokens: int) -> int:
+        """Tokens of the longest previously seen prefix; records this prompt's prefixes."""
+        if not min_tokens or _estimate_tokens(prompt) < min_tokens:
+            return 0
+        boundaries = range(min_tokens, _estimate_tokens(prompt) + 1, self.STEP_TOKENS)
+        hashes = [(tokens, hashlib.sha256(prompt[:tokens * 4].encode("utf-8")).hexdigest()) for tokens in boundaries]
+        with self._lock:
+            cached = max((tokens for tokens, h in hashes if h in self._seen), default=0)
+            if len(self._seen) > self.MAX_ENTRIES:
+                self._seen.clear()
+            self._seen.update(h for _, h in hashes)
+        return cached
+
+    def reset(self):
+        with self._lock:
+            self._seen.clear()
+
+
+prompt_cache = PromptPrefixCache()
+
+
+def fake_chat_completion(body: dict, config: FakeLLMConfig) -> Tuple[int, dict, float]:
+    """
+    Answer an OpenAI /chat/completions request body.
+    Returns (status_code, json_payload, simulated_delay_seconds).
+    """
+    digest = hashlib.sha256(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()
+    rng = random.Random(f"{config.seed}:{digest}")
+    delay_ms = config.sample_latency_ms(rng)
+
+    if config.error_rate and rng.random() < config.error_rate:
+        status = rng.choice([429, 500])
+        return status, {"error": {"message": "Simulated offline LLM failure", "type": "server_error", "code": status}}, delay_ms / 1000
+
+    prompt = _render_messages(body.get("messages", []))
+    schema_name = ((body.get("response_format") or {}).get("json_schema") or {}).get("name")
+
+    responder = _SCHEMA_RESPONDERS.get(schema_name)
+    if not responder:
+        responder = next((fn for marker, fn in _RESPONDERS if marker in prompt), None)
+    content = responder(prompt, rng) if responder else "OK"
+
+    prompt_tokens = _estimate_tokens(prompt)
+    completion_tokens = _estimate_tokens(content)
+    if config.tokens_per_sec > 0:
+        delay_ms += completion_tokens / config.tokens_per_sec * 1000
+
+    payload = {
+        "id": f"chatcmpl-offline-{digest[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "offline"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+            "logprobs": None,
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": prompt_cache.cached_tokens(prompt, config.cache_min_tokens)},
+        },
+    }
+    return 200, payload, delay_ms / 1000
+
+
+class FakeOpenAITransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """httpx transport (sync + async) serving fake_chat_completion in-process."""
+
+    def __init__(self, config: Optional[FakeLLMConfig] = None):
+        self.config = config or FakeLLMConfig.from_env()
+
+    def _answer(self, request: httpx.Request) -> Tuple[httpx.Response, float]:
+        if not request.url.path.endswith("/chat/completions"):
+            return httpx.Response(404, json={"error": {"message": f"Unsupported path {request.url.path}"}}), 0.0
+        status, payload, delay = fake_chat_completion(json.loads(request.content or b"{}"), self.config)
+        headers = {"x-request-id": str(uuid.uuid4())}
+        return httpx.Response(status, json=payload, headers=headers), delay
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response, delay = self._answer(request)
+        if delay:
+            time.sleep(delay)
+        return response
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response, delay = self._answer(request)
+        if delay:
+            await asyncio.sleep(delay)
+        return response
+
+
+_clients: Optional[Tuple[httpx.Client, httpx.AsyncClient]] = None
+_clients_lock = threading.Lock()
+
+
+def get_offline_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """Shared sync/async httpx clients bound to the fake transport."""
+    global _clients
+    if _clients is None:
+        with _clients_lock:
+            if _clients is None:
+                transport = FakeOpenAITransport()
+                _clients = (httpx.Client(transport=transport), httpx.AsyncClient(transport=transport))
+    return _clients
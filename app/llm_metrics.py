@@ -0,0 +1,318 @@
+"""
+LLM call instrumentation.
+
+A `LLMMetricsHandler` is attached to every model returned by `get_llm`. For each
+call it records wall time, prompt/completion tokens (and how many prompt tokens were
+served from the provider's prompt cache), model, route (call site)
+and the ambient context tags (recruiter, job_id, session_id) and:
+  - feeds process-wide histograms per (route, model) served at GET /llm/metrics
+  - adds the call to every active `track_usage()` scope, which is how upload
+    jobs and interview sessions get their per-job / per-session totals.
+
+Env:
+    LLM_PRICING   JSON {model: {"input": usd_per_1m_tokens, "output": usd_per_1m_tokens,
+                  "cached_input": usd_per_1m_tokens}} merged over DEFAULT_PRICING.
+                  Cached prompt tokens are billed at "cached_input" (defaults to "input").
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from loguru import logger
+
+# USD per 1M tokens
+DEFAULT_PRICING = {
+    "gpt-4o-mini": {"input": 0.15, "output": 0.60, "cached_input": 0.075},
+    "gpt-4o": {"input": 2.50, "output": 10.00, "cached_input": 1.25},
+    "gpt-4.1-mini": {"input": 0.40, "output": 1.60, "cached_input": 0.10},
+    "gpt-4.1-nano": {"input": 0.10, "output": 0.40, "cached_input": 0.025},
+    "gpt-4.1": {"input": 2.00, "output": 8.00, "cached_input": 0.50},
+}
+
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2000, 5000, 10000, 20000, 60000)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+_pricing: Optional[Dict[str, dict]] = None
+
+
+def get_pricing() -> Dict[str, dict]:
+    global _pricing
+    if _pricing is None:
+        pricing = dict(DEFAULT_PRICING)
+        raw = os.getenv("LLM_PRICING", "").strip()
+        if raw:
+            try:
+                pricing.update(json.loads(raw))
+            except ValueError as e:
+                logger.error(f"❌ Invalid LLM_PRICING config: {e}")
+        _pricing = pricing
+    return _pricing
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    """
+    USD cost of one call. Provider prefixes ('openai/gpt-4o') are ignored; unknown models cost 0.
+    `cached_tokens` is the part of `prompt_tokens` read from the prompt cache.
+    """
+    pricing = get_pricing()
+    price = pricing.get(model) or pricing.get(model.split("/")[-1])
+    if not price:
+        return 0.0
+    cached_tokens = min(cached_tokens, prompt_tokens)
+    input_cost = (prompt_tokens - cached_tokens) * price.get("input", 0) + cached_tokens * price.get("cached_input", price.get("input", 0))
+    return (input_cost + completion_tokens * price.get("output", 0)) / 1_000_000
+
+
+def _usage_from_result(response) -> dict:
+    """Pull token usage out of an LLMResult (usage_metadata first, then provider llm_output)."""
+    usage = {"prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+    try:
+        message = response.generations[0][0].message
+        meta = getattr(message, "usage_metadata", None)
+        if meta:
+            usage["prompt_tokens"] = meta.get("input_tokens", 0) or 0
+            usage["completion_tokens"] = meta.get("output_tokens", 0) or 0
+            usage["cached_tokens"] = (meta.get("input_token_details") or {}).get("cache_read", 0) or 0
+            return usage
+    except (IndexError, AttributeError, TypeError):
+        pass
+
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    usage["prompt_tokens"] = token_usage.get("prompt_tokens", 0) or 0
+    usage["completion_tokens"] = token_usage.get("completion_tokens", 0) or 0
+    usage["cached_tokens"] = (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0) or 0
+    return usage
+
+
+# --- Context tags & usage scopes ---
+
+_context_tags: ContextVar[dict] = ContextVar("llm_context_tags", default={})
+_active_usage: ContextVar[Tuple["UsageTotals", ...]] = ContextVar("llm_active_usage", default=())
+
+
+@contextmanager
+def llm_context(**tags):
+    """Tag every LLM call made inside the block, e.g. llm_context(recruiter=user, job_id=job_id)."""
+    token = _context_tags.set({**_context_tags.get(), **{k: v for k, v in tags.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _context_tags.reset(token)
+
+
+def current_tags() -> dict:
+    return dict(_context_tags.get())
+
+
+@contextmanager
+def track_usage():
+    """Collect totals for every LLM call made inside the block (nested scopes all receive the call)."""
+    totals = UsageTotals()
+    token = _active_usage.set(_active_usage.get() + (totals,))
+    try:
+        yield totals
+    finally:
+        _active_usage.reset(token)
+
+
+class UsageTotals:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.data = _empty_usage()
+
+    def add(self, route: str, latency_ms: float, prompt_tokens: int, completion_tokens: int, cost: float, error: bool, cached_tokens: int = 0):
+        call = {
+            "calls": 1,
+            "errors": int(error),
+            "prompt_tokens": prompt_tokens,
+            "cached_prompt_tokens": cached_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "latency_ms": latency_ms,
+            "cost_usd": cost,
+        }
+        with self._lock:
+            _accumulate(self.data, call)
+            _accumulate(self.data["by_route"].setdefault(route, _empty_counters()), call)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return _rounded(json.loads(json.dumps(self.data)))
+
+
+def _empty_counters() -> dict:
+    return {"calls": 0, "errors": 0, "prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "latency_ms": 0.0, "cost_usd": 0.0}
+
+
+def _empty_usage() -> dict:
+    return {**_empty_counters(), "by_route": {}}
+
+
+def _accumulate(target: dict, source: dict):
+    for key, value in source.items():
+        if key != "by_route":
+            target[key] = target.get(key, 0) + value
+
+
+def _rounded(usage: dict) -> dict:
+    for counters in [usage, *usage.get("by_route", {}).values()]:
+        counters["latency_ms"] = round(counters.get("latency_ms", 0.0), 2)
+        counters["cost_usd"] = round(counters.get("cost_usd", 0.0), 6)
+    return usage
+
+
+def merge_usage(base: Optional[dict], extra: Optional[dict]) -> dict:
+    """Add two `UsageTotals.as_dict()` payloads together (used to build per-session totals across turns)."""
+    merged = _empty_usage()
+    for usage in (base or {}, extra or {}):
+        _accumulate(merged, {k: v for k, v in usage.items() if k in merged})
+        for route, counters in usage.get("by_route", {}).items():
+            _accumulate(merged["by_route"].setdefault(route, _empty_counters()), counters)
+    return _rounded(merged)
+
+
+# --- Process-wide histograms ---
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return float(self.buckets[i]) if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def as_dict(self) -> dict:
+        labels = [str(b) for b in self.buckets] + ["+Inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.total, 2),
+            "avg": round(self.total / self.count, 2) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class RouteStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.cached_prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.prompt_tokens_hist = Histogram(TOKEN_BUCKETS)
+        self.completion_tokens_hist = Histogram(TOKEN_BUCKETS)
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_prompt_tokens": self.cached_prompt_tokens,
+            "cache_hit_rate": round(self.cached_prompt_tokens / self.prompt_tokens, 4) if self.prompt_tokens else 0.0,
+            "completion_tokens": self.completion_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "latency_ms": self.latency_ms.as_dict(),
+            "prompt_tokens_per_call": self.prompt_tokens_hist.as_dict(),
+            "completion_tokens_per_call": self.completion_tokens_hist.as_dict(),
+        }
+
+
+class LLMMetrics:
+    """Process-local aggregation keyed by route, then model."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Dict[str, RouteStats]] = {}
+
+    def record(self, route: str, model: str, latency_ms: float, prompt_tokens: int = 0, completion_tokens: int = 0, error: bool = False, cached_tokens: int = 0) -> float:
+        cost = 0.0 if error else estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens)
+        with self._lock:
+            stats = self._routes.setdefault(route, {}).setdefault(model, RouteStats())
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.latency_ms.observe(latency_ms)
+            if not error:
+                stats.prompt_tokens += prompt_tokens
+                stats.cached_prompt_tokens += cached_tokens
+                stats.completion_tokens += completion_tokens
+                stats.cost_usd += cost
+                stats.prompt_tokens_hist.observe(prompt_tokens)
+                stats.completion_tokens_hist.observe(completion_tokens)
+
+        for totals in _active_usage.get():
+            totals.add(route, latency_ms, prompt_tokens, completion_tokens, cost, error, cached_tokens)
+
+        logger.debug(
+            f"LLM call route={route} model={model} latency_ms={latency_ms:.0f} "
+            f"prompt_tokens={prompt_tokens} cached_tokens={cached_tokens} completion_tokens={completion_tokens} error={error} tags={current_tags()}"
+        )
+        return cost
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                route: {model: stats.as_dict() for model, stats in models.items()}
+                for route, models in self._routes.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+llm_metrics = LLMMetrics()
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    # Run inline so the handler sees the caller's context vars (tags, usage scopes).
+    run_inline = True
+
+    def __init__(self, route: str, model: str):
+        self.route = route
+        self.model = model
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def _elapsed_ms(self, run_id: Optional[UUID]) -> float:
+        start = self._started.pop(run_id, None)
+        return (time.perf_counter() - start) * 1000 if start else 0.0
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        usage = _usage_from_result(response)
+        llm_metrics.record(
+            self.route, self.model, self._elapsed_ms(run_id),
+            usage["prompt_tokens"], usage["completion_tokens"], cached_tokens=usage["cached_tokens"]
+        )
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs):
+        llm_metrics.record(self.route, self.model, self._elapsed_ms(run_id), error=True)
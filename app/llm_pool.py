@@ -0,0 +1,235 @@
+"""
+Pool of OpenAI-compatible LLM endpoints.
+
+Each endpoint carries its own API key, base URL, model and weight. `get_llm`
+asks the pool for an endpoint on every call and the pool hands out the one
+with the fewest in-flight requests relative to its weight. The pick itself
+reserves a slot (counted as in flight), so a burst of `get_llm` calls spreads
+out before any of them starts; the model's first request takes over the
+slot, and a model dropped without being called gives it back. Endpoints that
+keep failing are ejected for a cool-down period so traffic drains to the
+healthy keys.
+
+Configuration (env):
+    LLM_ENDPOINTS        JSON list, e.g.
+                         [{"name": "key-a", "api_key": "sk-...", "base_url": "https://api.openai.com/v1",
+                           "model": "gpt-4o-mini", "weight": 2}, ...]
+                         When unset, a single endpoint is built from
+                         OPENROUTER_API_KEY / OPENAI_API_KEY, OPENAI_API_BASE and LLM_MODEL.
+    LLM_EJECT_AFTER      Consecutive failures before an endpoint is ejected (default 3).
+    LLM_EJECT_SECONDS    Base ejection time in seconds, doubled per repeat ejection (default 30).
+
+An endpoint whose base URL starts with offline:// needs no key and is served by the
+in-process stand-in in app.llm_fake.
+"""
+import json
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from loguru import logger
+from app.llm_fake import is_offline_base_url
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_MODEL = "gpt-4o-mini"
+MAX_EJECT_SECONDS = 600
+
+
+@dataclass
+class LLMEndpoint:
+    name: str
+    api_key: str
+    base_url: str = DEFAULT_BASE_URL
+    model: str = DEFAULT_MODEL
+    weight: float = 1.0
+
+    # Runtime health state
+    outstanding: int = 0
+    consecutive_failures: int = 0
+    ejections: int = 0
+    ejected_until: float = 0.0
+    total_requests: int = 0
+    total_failures: int = 0
+
+    def is_healthy(self, now: Optional[float] = None) -> bool:
+        return (now or time.monotonic()) >= self.ejected_until
+
+    def load(self) -> float:
+        # +1 so that idle endpoints are still ordered by weight
+        return (self.outstanding + 1) / max(self.weight, 0.01)
+
+    def snapshot(self) -> dict:
+        return {
+            "name": self.name,
+            "base_url": self.base_url,
+            "model": self.model,
+            "weight": self.weight,
+            "outstanding": self.outstanding,
+            "healthy": self.is_healthy(),
+            "consecutive_failures": self.consecutive_failures,
+            "total_requests": self.total_requests,
+            "total_failures": self.total_failures,
+        }
+
+
+class EndpointTracker(BaseCallbackHandler):
+    """
+    Callback attached to every model built from the pool.
+    Keeps the in-flight counters and failure streaks of its endpoint current.
+    """
+    # Run in the caller's thread/event loop; the bookkeeping is tiny and lock-protected.
+    run_inline = True
+
+    def __init__(self, pool: "LLMEndpointPool", endpoint: LLMEndpoint, reserved: bool = False):
+        self.pool = pool
+        self.endpoint = endpoint
+        # Slot reserved by acquire(), handed to the first request (or released if there is none)
+        self._reservation = [reserved]
+        if reserved:
+            weakref.finalize(self, _release_unused, pool, endpoint, self._reservation)
+
+    def _start(self):
+        with self.pool._lock:
+            reserved, self._reservation[0] = self._reservation[0], False
+        self.pool.mark_started(self.endpoint, reserved=reserved)
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self._start()
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self._start()
+
+    def on_llm_end(self, response, **kwargs):
+        self.pool.mark_finished(self.endpoint, success=True)
+
+    def on_llm_error(self, error, **kwargs):
+        self.pool.mark_finished(self.endpoint, success=False, error=error)
+
+
+def _release_unused(pool: "LLMEndpointPool", endpoint: LLMEndpoint, reservation: list):
+    with pool._lock:
+        if reservation[0]:
+            reservation[0] = False
+            endpoint.outstanding = max(0, endpoint.outstanding - 1)
+
+
+class LLMEndpointPool:
+    def __init__(self, endpoints: List[LLMEndpoint], eject_after: int = 3, eject_seconds: float = 30.0):
+        self.endpoints = endpoints
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "LLMEndpointPool":
+        endpoints = []
+        raw = os.getenv("LLM_ENDPOINTS", "").strip()
+        default_model = os.getenv("LLM_MODEL", DEFAULT_MODEL)
+
+        if raw:
+            try:
+                for i, item in enumerate(json.loads(raw)):
+                    if not item.get("api_key") and not is_offline_base_url(item.get("base_url")):
+                        logger.warning(f"⚠️ LLM endpoint #{i} has no api_key, skipping.")
+                        continue
+                    endpoints.append(LLMEndpoint(
+                        name=item.get("name") or f"endpoint-{i}",
+                        api_key=item.get("api_key") or "offline",
+                        base_url=item.get("base_url") or DEFAULT_BASE_URL,
+                        model=item.get("model") or default_model,
+                        weight=float(item.get("weight", 1.0)),
+                    ))
+            except (ValueError, TypeError, AttributeError) as e:
+                logger.error(f"❌ Invalid LLM_ENDPOINTS config: {e}")
+
+        if not endpoints:
+            api_key = os.getenv("OPENROUTER_API_KEY") or os.getenv("OPENAI_API_KEY")
+            base_url = os.getenv("OPENAI_API_BASE", DEFAULT_BASE_URL)
+            if not api_key and is_offline_base_url(base_url):
+                api_key = "offline"
+            if api_key:
+                endpoints.append(LLMEndpoint(
+                    name="default",
+                    api_key=api_key,
+                    base_url=base_url,
+                    model=default_model,
+                ))
+
+        return cls(
+            endpoints,
+            eject_after=int(os.getenv("LLM_EJECT_AFTER", "3")),
+            eject_seconds=float(os.getenv("LLM_EJECT_SECONDS", "30")),
+        )
+
+    def acquire(self) -> Optional[LLMEndpoint]:
+        """
+        Least-outstanding-requests selection over healthy endpoints, reserving a slot on the
+        pick (pass tracker(endpoint, reserved=True) to the model so it is handed over or released).
+        If every endpoint is ejected, fail open to the one that recovers first.
+        """
+        if not self.endpoints:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            healthy = [e for e in self.endpoints if e.is_healthy(now)]
+            if not healthy:
+                endpoint = min(self.endpoints, key=lambda e: e.ejected_until)
+            else:
+                endpoint = min(healthy, key=lambda e: e.load())
+            endpoint.outstanding += 1
+            return endpoint
+
+    def tracker(self, endpoint: LLMEndpoint, reserved: bool = False) -> EndpointTracker:
+        return EndpointTracker(self, endpoint, reserved=reserved)
+
+    def mark_started(self, endpoint: LLMEndpoint, reserved: bool = False):
+        """A request began; `reserved` if it takes over the slot acquire() already counted."""
+        with self._lock:
+            if not reserved:
+                endpoint.outstanding += 1
+            endpoint.total_requests += 1
+
+    def mark_finished(self, endpoint: LLMEndpoint, success: bool, error: Optional[BaseException] = None):
+        with self._lock:
+            endpoint.outstanding = max(0, endpoint.outstanding - 1)
+            if success:
+                endpoint.consecutive_failures = 0
+                endpoint.ejections = 0
+                return
+
+            endpoint.total_failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= self.eject_after:
+                cooldown = min(self.eject_seconds * (2 ** endpoint.ejections), MAX_EJECT_SECONDS)
+                endpoint.ejected_until = time.monotonic() + cooldown
+                endpoint.ejections += 1
+                endpoint.consecutive_failures = 0
+                logger.warning(f"⚠️ Ejecting LLM endpoint '{endpoint.name}' for {cooldown:.0f}s after repeated failures: {error}")
+
+    def status(self) -> List[Dict]:
+        with self._lock:
+            return [e.snapshot() for e in self.endpoints]
+
+
+_pool: Optional[LLMEndpointPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> LLMEndpointPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = LLMEndpointPool.from_env()
+    return _pool
+
+
+def reset_pool():
+    """Drop the cached pool so the next call re-reads the environment."""
+    global _pool
+    with _pool_lock:
+        _pool = None
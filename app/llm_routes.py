@@ -0,0 +1,81 @@
+"""
+Per-call-site LLM routing table.
+
+Every prompt in the app is sent through a named route so that cheap, latency
+sensitive calls (role deduction, interview turns) and expensive, accuracy
+sensitive ones (bulk scoring) can run on different models and parameters.
+
+A route with model=None uses the model configured on the selected endpoint
+(LLM_MODEL / LLM_ENDPOINTS).
+
+Env overrides:
+    LLM_ROUTES                 JSON object, e.g. {"bulk_evaluation": {"model": "gpt-4o", "max_tokens": 6000}}
+    LLM_ROUTE_<NAME>_MODEL     e.g. LLM_ROUTE_INTERVIEW_MODEL=gpt-4o-mini
+    LLM_ROUTE_<NAME>_TEMPERATURE
+    LLM_ROUTE_<NAME>_MAX_TOKENS
+"""
+import json
+import os
+from typing import Dict, Optional
+from loguru import logger
+
+# Route names mirror the prompts in app.interview_prompts / app.matcher
+ROLE_DEDUCTION = "role_deduction"            # ROLE_DEDUCTION_PROMPT
+MATCHING = "matching"                        # MATCHING_PROMPT
+PROFILE_EXTRACTION = "profile_extraction"    # PROFILE_EXTRACTION_PROMPT
+GRADING = "grading"                          # GRADING_PROMPT
+INTERVIEW = "interview"                      # INTERVIEW_SYSTEM_PROMPT
+RESUME_EVALUATION = "resume_evaluation"      # RESUME_EVALUATION_PROMPT
+BULK_EVALUATION = "bulk_evaluation"          # BULK_EVALUATION_PROMPT
+DEFAULT = "default"
+
+DEFAULT_ROUTES: Dict[str, dict] = {
+    ROLE_DEDUCTION:     {"model": None, "temperature": 0,   "max_tokens": 50},
+    MATCHING:           {"model": None, "temperature": 0,   "max_tokens": 1000},
+    PROFILE_EXTRACTION: {"model": None, "temperature": 0,   "max_tokens": 2000},
+    GRADING:            {"model": None, "temperature": 0,   "max_tokens": 500},
+    INTERVIEW:          {"model": None, "temperature": 0.7, "max_tokens": 600},
+    RESUME_EVALUATION:  {"model": None, "temperature": 0,   "max_tokens": 2000},
+    BULK_EVALUATION:    {"model": None, "temperature": 0,   "max_tokens": 4000},
+    DEFAULT:            {"model": None, "temperature": 0,   "max_tokens": 1000},
+}
+
+_ENV_FIELDS = {"MODEL": ("model", str), "TEMPERATURE": ("temperature", float), "MAX_TOKENS": ("max_tokens", int)}
+
+
+def load_routes() -> Dict[str, dict]:
+    routes = {name: dict(cfg) for name, cfg in DEFAULT_ROUTES.items()}
+
+    raw = os.getenv("LLM_ROUTES", "").strip()
+    if raw:
+        try:
+            for name, overrides in json.loads(raw).items():
+                routes.setdefault(name, dict(DEFAULT_ROUTES[DEFAULT])).update(overrides)
+        except (ValueError, AttributeError) as e:
+            logger.error(f"❌ Invalid LLM_ROUTES config: {e}")
+
+    for name, cfg in routes.items():
+        for suffix, (field, cast) in _ENV_FIELDS.items():
+            value = os.getenv(f"LLM_ROUTE_{name.upper()}_{suffix}")
+            if value:
+                try:
+                    cfg[field] = cast(value)
+                except ValueError:
+                    logger.error(f"❌ Invalid LLM_ROUTE_{name.upper()}_{suffix}: {value}")
+
+    return routes
+
+
+_routes: Optional[Dict[str, dict]] = None
+
+
+def get_route(name: str) -> dict:
+    global _routes
+    if _routes is None:
+        _routes = load_routes()
+    return _routes.get(name) or _routes[DEFAULT]
+
+
+def reset_routes():
+    global _routes
+    _routes = None
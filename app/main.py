@@ -11,7 +11,7 @@ from app.core.middleware import log_requests_middleware
 from app.db import init_db
 
 # Import Routers
-from app.routers import auth, candidates, interview, jobs
+from app.routers import auth, candidates, interview, jobs, metrics, templates
 
 # Sentry Initialization
 if settings.SENTRY_DSN:
@@ -24,8 +24,10 @@ async def lifespan(app: FastAPI):
     logger.info(f"System Startup: {settings.TITLE} v{settings.VERSION}")
     init_db()
     
-    # Embeddings are now lazy loaded on first use
-    logger.info("Embeddings will be loaded on demand.")
+    # Sentence-transformer loads in a background thread; hashing encoder serves until then
+    from app.encoders import start_loading
+    start_loading()
+    logger.info("Encoder loading in background.")
 
     yield
     # Shutdown Logic
@@ -52,6 +54,8 @@ app.include_router(auth.router)
 app.include_router(candidates.router)
 app.include_router(interview.router)
 app.include_router(jobs.router)
+app.include_router(metrics.router)
+app.include_router(templates.router)
 
 # --- Top Level Page Routes ---
 from fastapi.responses import RedirectResponse
@@ -1,17 +1,33 @@
 import json
 import re
 from app.llm import get_llm
+from app import llm_routes
 from app.interview_prompts import MATCHING_PROMPT, PROFILE_EXTRACTION_PROMPT, RESUME_EVALUATION_PROMPT, ROLE_DEDUCTION_PROMPT
 from app.schemas import CandidateProfile, ResumeEvaluationOutput, LikertScores, ResumeFeedback, ExtractedEvidence
 import asyncio
+import numpy as np
 from loguru import logger
 from typing import List
+from app.skill_verifier import verify_skills, verify_skills_batch
+from app.keyword_matcher import get_keyword_matcher
+from app.likert_scorer import LIKERT_FIELDS, score_batch, weighted_scores
+from app.role_classifier import classify_role, confidence_threshold
+from app.single_flight import single_flight, prompt_key
+
+def _verify_matched_skills(data: dict, resume_text: str) -> tuple[list, list]:
+    """
+    Keep only LLM "matched" skills that really occur in the resume (strict, symbol-aware
+    boundaries so "Java" doesn't match "Javascript"); the rest move to missing.
+    """
+    matched, unverified = verify_skills(data.get("matched_skills", []), resume_text)
+    return matched, data.get("missing_skills", []) + unverified
+
 def extract_skills(resume_text: str, jd_text: str) -> dict:
     """
     Extract skills and reasoning using LLM.
     Returns dict with matched_skills, missing_skills, reasoning.
     """
-    llm = get_llm(temperature=0, max_tokens=1000)
+    llm = get_llm(llm_routes.MATCHING)
     if not llm:
         raise ValueError("LLM not configured")
         
@@ -24,74 +40,9 @@ def extract_skills(resume_text: str, jd_text: str) -> dict:
         })
         content = response.content.strip()
     except Exception as e:
-        logger.warning(f"⚠️ LLM Error: {e}. Switching to Regex Fallback.")
-        # Regex Fallback
-        jd_words = set(re.findall(r'\b\w+\b', jd_text.lower()))
-        resume_words = set(re.findall(r'\b\w+\b', resume_text.lower()))
-        
-        # Simple intersection (naive but works for fallback)
-        # Filter for "skill-like" words (len > 3) to reduce noise
-        stopwords = {
-            "with", "experience", "knowledge", "working", "good", "strong", "skills", 
-            "ability", "work", "team", "environment", "years", "plus", "have", "from", 
-            "that", "this", "will", "your", "development", "using", "used", "proficient",
-            "understanding", "excellent", "must", "should", "requirements", "project", 
-            "projects", "code", "coding", "software", "engineer", "engineering", "user",
-            "required", "preferred", "role", "candidate", "responsibilities", "include",
-            "ensure", "collaborate", "support", "design", "build", "maintain", "create",
-            "perform", "manage", "across", "within", "tools", "systems", "processes",
-            "best", "practices", "technical", "technologies", "application", "applications",
-            "solution", "solutions", "business", "functional", "specifications", "needs",
-            "issues", "problems", "quality", "performance", "high", "scalable", "secure",
-            "reliable", "efficient", "effective", "effectively", "communicate", "communication",
-            "written", "verbal", "degree", "bachelor", "master", "computer", "science",
-            "related", "field", "equivalent", "complex", "large", "scale", "modern",
-            "frameworks", "libraries", "platforms", "services", "cloud", "infrastructure",
-            "deployment", "continuous", "integration", "delivery", "agile", "scrum",
-            "methodologies", "participate", "reviews", "testing", "debugging", "troubleshooting",
-            "optimization", "security", "compliance", "standards", "documentation",
-            "mentor", "junior", "members", "stakeholders", "product", "owners", "managers",
-            "customers", "clients", "partners", "vendors", "internal", "external",
-            "teams", "cross-functional", "initiatives", "goals", "objectives", "tasks",
-            "assignments", "deadline", "driven", "detail", "oriented", "analytical",
-            "problem", "solving", "interpersonal", "organizational", "time", "management",
-            "prioritize", "multiple", "concurrent", "activities", "under", "pressure",
-            "fast", "paced", "dynamic", "startup", "culture", "passion", "learning",
-            "technologies", "innovative", "creative", "thinking", "adapt", "change",
-            "willingness", "travel", "location", "remote", "hybrid", "office", "salary",
-            "benefits", "package", "health", "dental", "vision", "insurance", "paid",
-            "vacation", "holidays", "sick", "leave", "retirement", "plan", "match",
-            "equity", "stock", "options", "bonus", "performance", "review", "annual",
-            "quarterly", "monthly", "weekly", "daily", "hours", "schedule", "shift",
-            "monday", "friday", "weekend", "evenings", "nights", "time", "full", "part",
-            "contract", "temporary", "permanent", "internship", "co-op", "entry",
-            "level", "mid", "senior", "lead", "principal", "architect", "manager",
-            "director", "executive", "officer", "chief", "head", "president", "founder",
-            "cofounder", "partner", "associate", "analyst", "consultant", "specialist",
-            "coordinator", "administrator", "generalist", "recruiter", "sourcer",
-            "coordinator", "business", "operations", "sales", "marketing", "finance",
-            "accounting", "legal", "compliance", "regulatory", "affairs", "government",
-            "public", "relations", "media", "communications", "content", "strategy",
-            "planning", "analytics", "data", "science", "research", "development",
-            "product", "project", "program", "portfolio", "management", "customer",
-            "success", "support", "service", "account", "management", "business",
-            "development", "partnerships", "alliances", "channels", "distribution",
-            "logistics", "supply", "chain", "procurement", "purchasing", "sourcing",
-            "inventory", "warehouse", "transportation", "shipping", "receiving",
-            "facilities", "maintenance", "security", "safety", "environmental",
-            "health", "quality", "assurance", "control", "manufacturing", "production",
-            "assembly", "fabrication", "machining", "welding", "construction",
-            "installation", "repair", "service", "technician", "mechanic", "electrician"
-        }
-        meaningful_jd = {w for w in jd_words if len(w) > 3 and w not in stopwords}
-        matched = sorted(list(meaningful_jd.intersection(resume_words)))
-        missing = sorted(list(meaningful_jd - resume_words))
-        
-        return {
-            "matched_skills": matched[:10], # Limit to top 10
-            "missing_skills": missing[:10],
-            "reasoning": "LLM unavailable. Fallback to keyword matching."
-        }
+        logger.warning(f"⚠️ LLM Error: {e}. Switching to Keyword Fallback.")
+        # Keyword Fallback (JD vocabulary vs resume terms, top 10 each)
+        return get_keyword_matcher(jd_text).match(resume_text)
 
     # Cleaning JSON code blocks if present
     if "```json" in content:
@@ -102,43 +53,14 @@ def extract_skills(resume_text: str, jd_text: str) -> dict:
     try:
         data = json.loads(content)
         
-        # Post-process: Verify skills are actually in the resume text (Case Insensitive)
+        # Post-process: Verify skills are actually in the resume text.
         # This solves the issue of "hallucinated" matches or loose matching.
-        real_matched = []
-        real_missing = data.get("missing_skills", [])
-        
-        r_text_lower = resume_text.lower()
-        
-        for skill in data.get("matched_skills", []):
-            # Check if skill is in resume using STRICT word boundaries
-            # This prevents "Java" matching "Javascript" or "OS" matching "Cost"
-            s_clean = re.escape(skill.lower())
-            
-            # Pattern: non-word-char + skill + non-word-char
-            # We use \b but specialized for some edge cases like "C++" which \b breaks on (since + is non-word)
-            # For "C++", \bC\+\+\b doesn't work well because + is a symbol.
-            # So we check if the skill contains symbols.
-            
-            if re.search(r'[^a-zA-Z0-9]', skill):
-                # If skill has symbols (C++, C#, .NET, Node.js), simple substring check is often safer 
-                # but we try to avoid being part of a larger word if possible.
-                # Heuristic: Check if it exists as a substring. 
-                # For "C++", it's unlikely to be a substring of a common word essentially.
-                if skill.lower() in r_text_lower:
-                     real_matched.append(skill)
-                else:
-                     real_missing.append(skill)
-            else:
-                # Standard alphanumeric skill (Python, Java, AWS) -> Strict \b matching
-                if re.search(rf'\b{s_clean}\b', r_text_lower):
-                    real_matched.append(skill)
-                else:
-                    real_missing.append(skill)
+        real_matched, real_missing = _verify_matched_skills(data, resume_text)
 
         # Update lists
         return {
             "matched_skills": real_matched,
-            "missing_skills": list(set(real_missing)), # Dedup
+            "missing_skills": list(dict.fromkeys(real_missing)), # Dedup
             "reasoning": data.get("reasoning", "Analysis completed.")
         }
     except json.JSONDecodeError:
@@ -150,7 +72,7 @@ def extract_skills(resume_text: str, jd_text: str) -> dict:
             "reasoning": "Error parsing AI response."
         }
 
-from app.embeddings import calculate_similarity
+from app.embeddings import semantic_scores
 
 def calculate_match_score(matched: list, missing: list, resume_text: str = "", jd_text: str = "") -> float:
     """
@@ -158,43 +80,45 @@ def calculate_match_score(matched: list, missing: list, resume_text: str = "", j
     - 60% Skill Match (Explicit)
     - 40% Semantic Match (Implicit/Vibe)
     """
+    return float(calculate_match_scores([matched], [missing], [resume_text], jd_text)[0])
+
+def calculate_match_scores(matched: List[list], missing: List[list], resume_texts: List[str], jd_text: str = "", candidate_ids: List[str] = None) -> np.ndarray:
+    """
+    calculate_match_score for a whole pool against one JD: the JD is encoded once and the
+    semantic part is one batch (see app.embeddings.semantic_scores). Aligned to the inputs.
+    """
     # 1. Skill Score
-    total_skills = len(matched) + len(missing)
-    if total_skills == 0:
-        skill_score = 0.0
-    else:
-        skill_score = (len(matched) / total_skills) * 100
-        
+    matched_counts = np.array([len(m) for m in matched], dtype=np.float64)
+    totals = matched_counts + np.array([len(m) for m in missing], dtype=np.float64)
+    skill_scores = np.divide(matched_counts * 100, totals, out=np.zeros_like(totals), where=totals > 0)
+
     # 2. Semantic Score
-    semantic_score = 0.0
-    if resume_text and jd_text:
-        semantic_score = calculate_similarity(resume_text, jd_text)
-        
-    # Weighted Average
     # If no semantic info is passed (legacy calls), fallback to skill only
-    # If no semantic info is passed (legacy calls), fallback to skill only
-    if not resume_text or not jd_text:
-        return round(skill_score, 2)
-        
-    final_score = (skill_score * 0.6) + (semantic_score * 0.4)
-    return round(final_score, 2)
+    if not jd_text:
+        return np.round(skill_scores, 2)
+    semantic = semantic_scores(jd_text, resume_texts, candidate_ids=candidate_ids)
+
+    # Weighted Average
+    has_text = np.array([bool(t) for t in resume_texts])
+    return np.round(np.where(has_text, skill_scores * 0.6 + semantic * 0.4, skill_scores), 2)
 
 async def extract_skills_async(resume_text: str, jd_text: str) -> dict:
     """
     Async version of extract_skills.
     """
-    llm = get_llm(temperature=0, max_tokens=1000)
+    llm = get_llm(llm_routes.MATCHING)
     if not llm:
         raise ValueError("LLM not configured")
         
     chain = MATCHING_PROMPT | llm
+    inputs = {"context": resume_text, "job_description": jd_text}
+
+    async def _invoke() -> str:
+        return (await chain.ainvoke(inputs)).content
     
     try:
-        response = await chain.ainvoke({
-            "context": resume_text,
-            "job_description": jd_text
-        })
-        content = response.content.strip()
+        # Identical in-flight prompts (double submits, parallel workers on one JD) share one call
+        content = (await single_flight.do(prompt_key(llm_routes.MATCHING, MATCHING_PROMPT, inputs), _invoke)).strip()
     except Exception as e:
         logger.warning(f"⚠️ Async LLM Error: {e}. Switching to Regex Fallback.")
         # Re-use sync fallback logic effectively or just call sync function wrapped
@@ -209,31 +133,11 @@ async def extract_skills_async(resume_text: str, jd_text: str) -> dict:
         
     try:
         data = json.loads(content)
-        # We can implement the same post-processing logic here or helper function
-        # For strictness, let's just return raw first or duplicate the logic
-        # A smart refactor would be to extract the post-processing to a pure function
-        # But to be safe, let's copy the post-processing
-        
-        real_matched = []
-        real_missing = data.get("missing_skills", [])
-        r_text_lower = resume_text.lower()
-        
-        for skill in data.get("matched_skills", []):
-            s_clean = re.escape(skill.lower())
-            if re.search(r'[^a-zA-Z0-9]', skill):
-                if skill.lower() in r_text_lower:
-                     real_matched.append(skill)
-                else:
-                     real_missing.append(skill)
-            else:
-                if re.search(rf'\\b{s_clean}\\b', r_text_lower):
-                    real_matched.append(skill)
-                else:
-                    real_missing.append(skill)
+        real_matched, real_missing = _verify_matched_skills(data, resume_text)
 
         return {
             "matched_skills": real_matched,
-            "missing_skills": list(set(real_missing)),
+            "missing_skills": list(dict.fromkeys(real_missing)),
             "reasoning": data.get("reasoning", "Async Analysis completed.")
         }
     except Exception as e:
@@ -248,7 +152,7 @@ async def extract_profile_async(resume_text: str) -> CandidateProfile:
     """
     Extracts structured profile (Education, Exp) using LLM.
     """
-    llm = get_llm(temperature=0, max_tokens=2000)
+    llm = get_llm(llm_routes.PROFILE_EXTRACTION)
     if not llm:
         # Return empty profile
         return CandidateProfile(name="Unknown", email="", phone="", skills=[])
@@ -274,7 +178,7 @@ async def evaluate_resume_structured(
     Evaluates a resume using the structured parameter-based approach.
     Enforces deterministic scoring and decision logic.
     """
-    llm = get_llm(temperature=0, max_tokens=2000)
+    llm = get_llm(llm_routes.RESUME_EVALUATION)
     if not llm:
         raise ValueError("LLM not configured")
 
@@ -289,8 +193,8 @@ async def evaluate_resume_structured(
             "job_role": job_role,
             "experience_level": experience_level,
             "required_skills": ", ".join(required_skills),
-            "role_template": json.dumps(role_template, indent=2),
-            "thresholds": json.dumps(thresholds, indent=2)
+            "role_template": json.dumps(role_template, indent=2, sort_keys=True),
+            "thresholds": json.dumps(thresholds, indent=2, sort_keys=True)
         })
         
         # 2. Enforce Math (Deterministic Calculation)
@@ -344,36 +248,37 @@ async def evaluate_resume_structured(
         
     except Exception as e:
         logger.error(f"❌ Evaluation Error: {e}")
-        # Return fallback object to prevent crash
-        from app.schemas import ScoreComponents, ExtractedEvidence
-        
-        return ResumeEvaluationOutput(
-            likert_scores=ScoreComponents(education=3, experience=3, skills=3, projects=3, certifications=3),
-            weighted_resume_score=50.0,
-            decision="Review Required (AI Error)",
-            interview_required=False,
-            extracted_evidence=ExtractedEvidence(
-                education="Extraction Failed", 
-                experience=[], 
-                skills=[], 
-                projects=[], 
-                certifications=[]
-            )
-        )
+        # Return a local rules-based estimate to prevent crash; flagged for manual review
+        fallback = rules_based_evaluations(
+            [{"index": 0, "text": resume_text}], "", required_skills, role_template, thresholds
+        )[0]["output"]
+        fallback.decision = "Review Required (AI Error)"
+        fallback.interview_required = False
+        return fallback
 
 async def detect_job_role(jd_text: str) -> str:
     """
-    Uses LLM to deduce the primary job role from the JD.
+    Deduces the primary job role from the JD: local classifier first, LLM only when unsure.
     """
-    llm = get_llm(temperature=0, max_tokens=50)
-    if not llm: return "Candidate"
+    guess = classify_role(jd_text)
+    if guess.confidence >= confidence_threshold():
+        return guess.title
+
+    # Low confidence: ask the LLM, keeping the local guess as the fallback
+    llm = get_llm(llm_routes.ROLE_DEDUCTION)
+    if not llm: return guess.title
     
     chain = ROLE_DEDUCTION_PROMPT | llm
+    inputs = {"job_description": jd_text}
+
+    async def _invoke() -> str:
+        return (await chain.ainvoke(inputs)).content
+
     try:
-        resp = await chain.ainvoke({"job_description": jd_text})
-        return resp.content.strip()
+        content = await single_flight.do(prompt_key(llm_routes.ROLE_DEDUCTION, ROLE_DEDUCTION_PROMPT, inputs), _invoke)
+        return content.strip()
     except:
-        return "Candidate"
+        return guess.title
 
 async def extract_required_skills(jd_text: str) -> list[str]:
     """
@@ -394,10 +299,12 @@ async def extract_required_skills(jd_text: str) -> list[str]:
     return all_skills
 
 
+# Laid out for provider-side prompt caching: the static rubric comes first, then the
+# per-upload context (role, skills, weights) that is identical for every batch of an
+# upload, and only then the per-batch candidates. Keep anything that varies per call
+# out of the part above "Candidates to Analyze".
 BULK_EVALUATION_PROMPT = """You are an expert HR Recruiter. 
-Your task is to evaluate MULTIPLE candidates for the role of '{job_role}'.
-
-Job Description Skills: {required_skills}
+Your task is to evaluate MULTIPLE candidates for one role, described below.
 
 SCORING RULES (Strictly followed):
 1. Education (1-5): 5=Top Tier/Masters, 1=No degree.
@@ -418,6 +325,10 @@ Return a JSON LIST of objects. Each object represents one candidate.
   ...
 ]
 
+ROLE: {job_role}
+Job Description Skills: {required_skills}
+Parameter Weights: {role_parameters}
+
 Candidates to Analyze:
 {candidates_text}
 """
@@ -432,15 +343,15 @@ async def evaluate_resumes_bulk(
     """
     Evaluates multiple resumes in a single LLM call.
     """
-    llm = get_llm(temperature=0, max_tokens=4000) 
+    llm = get_llm(llm_routes.BULK_EVALUATION)
     if not llm: return []
 
     # 1. Format Input
     candidates_text = ""
     for r in resumes:
         # Truncate text to avoid token limits.
-        text_snippet = r['text'][:2000].replace("\\n", " ") 
-        candidates_text += f"-- CANDIDATE {r['index']} --\\n{text_snippet}\\n\\n"
+        text_snippet = r['text'][:2000].replace("\n", " ")
+        candidates_text += f"-- CANDIDATE {r['index']} --\n{text_snippet}\n\n"
 
     from langchain_core.prompts import ChatPromptTemplate
     
@@ -451,6 +362,8 @@ async def evaluate_resumes_bulk(
         response = await chain.ainvoke({
             "job_role": job_role,
             "required_skills": ", ".join(required_skills),
+            # sort_keys: byte-identical prefix across batches
+            "role_parameters": json.dumps(role_template.get("parameters", {}), sort_keys=True),
             "candidates_text": candidates_text
         })
         
@@ -536,3 +449,49 @@ async def evaluate_resumes_bulk(
         with open("jobs_debug.log", "a", encoding="utf-8") as f: f.write(f"❌ Matcher Bulk Eval Error: {e}\n")
         return []
 
+def rules_based_evaluations(resumes: List[dict], jd_text: str, required_skills: list, role_template: dict, thresholds: dict) -> List[dict]:
+    """
+    Scores resumes without the LLM: Likert estimates from app.likert_scorer weighted by the
+    role template, computed for the whole list at once. Same shape as evaluate_resumes_bulk
+    results; used for resumes the LLM could not evaluate (outage, bad batch output).
+    """
+    if not resumes:
+        return []
+
+    texts = [r["text"] for r in resumes]
+    likert = score_batch(texts, required_skills)
+    scores = weighted_scores(likert, role_template)
+    if required_skills:
+        evidence_skills = [present for present, _ in verify_skills_batch(required_skills, texts)]
+    else:
+        evidence_skills = [m["matched_skills"] for m in get_keyword_matcher(jd_text).match_many(texts)]
+
+    shortlist = thresholds.get("shortlist", 75)
+    interview = thresholds.get("interview", 50)
+
+    results = []
+    for r, row, score, skills in zip(resumes, likert, scores, evidence_skills):
+        score = float(score)
+        decision, interview_req = "Weak Resume – Reject", False
+        if score >= shortlist:
+            decision = "Strong Match"
+        elif score >= interview:
+            decision, interview_req = "Interview Required", True
+
+        out = ResumeEvaluationOutput(
+            likert_scores=LikertScores(**dict(zip(LIKERT_FIELDS, row.tolist()))),
+            weighted_resume_score=score,
+            decision=decision,
+            interview_required=interview_req,
+            resume_feedback=ResumeFeedback(
+                strengths=[],
+                weaknesses=["Scored by rules-based fallback (AI evaluation unavailable)."],
+                improvement_suggestions=[]
+            ),
+            extracted_evidence=ExtractedEvidence(
+                education="N/A", experience="N/A", projects="N/A", certifications="N/A",
+                skills=skills
+            )
+        )
+        results.append({"index": r["index"], "output": out})
+    return results
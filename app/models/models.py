@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, Boolean, Text, ForeignKey, Integer, DateTime
+from sqlalchemy import Column, String, Float, Boolean, Text, ForeignKey, Integer, DateTime, LargeBinary, Index
 from sqlalchemy.sql import func
 from app.database import Base
 import json
@@ -9,6 +9,7 @@ class Candidate(Base):
     id = Column(String, primary_key=True, index=True)
     name = Column(String)
     resume_text = Column(String)
+    prompt_text = Column(Text, nullable=True) # Compact resume text sent to the LLM (see app.resume_minimizer)
     job_description = Column(String)
     match_score = Column(Float)
     interview_score = Column(Float, default=0.0)
@@ -21,8 +22,48 @@ class Candidate(Base):
     flags = Column(Text, default="[]")
     interview_enabled = Column(Boolean, default=True) # New Flag
     recruiter_username = Column(String, ForeignKey("recruiters.username"))
+    template_key = Column(String, nullable=True) # Role template used for scoring (intern/junior/senior/custom)
+    upload_job_id = Column(String, nullable=True, index=True)
+    resume_threshold = Column(Float, nullable=True) # Shortlist cut-off the upload was scored with
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+class CandidateFeatures(Base):
+    __tablename__ = "candidate_features"
+
+    candidate_id = Column(String, ForeignKey("candidates.id"), primary_key=True)
+    email = Column(String, index=True)
+    phone = Column(String)
+    skills = Column(Text, default="[]") # JSON list
+    education = Column(Text, default="[]") # JSON: [{"degree", "level", "year"}]
+    experience = Column(Text, default="[]") # JSON: [{"duration", "years", "description"}]
+    total_years = Column(Float, default=0.0, index=True)
+    degree_level = Column(Integer, default=1, index=True) # Likert education level (1-5)
+    extracted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class CandidateMinHash(Base):
+    __tablename__ = "candidate_minhash"
+
+    candidate_id = Column(String, ForeignKey("candidates.id"), primary_key=True)
+    signature = Column(LargeBinary) # uint32 MinHash values (see app.near_duplicates)
+
+class CandidateLshBand(Base):
+    __tablename__ = "candidate_lsh_bands"
+
+    band_key = Column(String, primary_key=True) # "<band>:<digest of the band's rows>"
+    candidate_id = Column(String, ForeignKey("candidates.id"), primary_key=True, index=True)
+
+class CandidateSkill(Base):
+    __tablename__ = "candidate_skills"
+    __table_args__ = (
+        # Covers "recruiter's candidates with skill X" without touching the table
+        Index("ix_candidate_skills_recruiter_skill", "recruiter_username", "skill", "candidate_id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    candidate_id = Column(String, ForeignKey("candidates.id"), nullable=False, index=True)
+    recruiter_username = Column(String)
+    skill = Column(String, nullable=False) # canonical name (see app.skill_index)
+
 class UploadJob(Base):
     __tablename__ = "upload_jobs"
 
@@ -33,8 +74,24 @@ class UploadJob(Base):
     status = Column(String, default="processing") # processing, completed, failed
     interview_enabled = Column(Boolean, default=True) # New Flag
     results = Column(Text, default="[]") # Store JSON list of candidate_ids or errors
+    metrics = Column(Text, default="{}") # JSON: LLM usage totals etc.
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+class RoleTemplate(Base):
+    __tablename__ = "role_templates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String, index=True) # intern / junior / senior or a custom key
+    recruiter_username = Column(String, ForeignKey("recruiters.username"), nullable=True) # NULL = shared default
+    parameters = Column(Text, default="{}") # JSON: Likert field -> weight
+    thresholds = Column(Text, default="{}") # JSON: {"shortlist": x, "interview": y}
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # One copy per recruiter; shared rows (NULL recruiter) are kept unique by upsert_role_template
+        Index("uq_role_templates_key_recruiter", "key", "recruiter_username", unique=True),
+    )
+
 class Recruiter(Base):
     __tablename__ = "recruiters"
 
@@ -52,6 +109,7 @@ class InterviewSession(Base):
     current_question = Column(String)
     scores = Column(Text, default="[]")
     is_active = Column(Boolean, default=True)
+    llm_usage = Column(Text, default="{}") # JSON: LLM token/cost totals for the session
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 class InterviewMessage(Base):
@@ -0,0 +1,119 @@
+"""
+Lexical near-duplicate detection: MinHash signatures over word shingles, LSH banding.
+
+The same CV exported twice (or lightly edited) shares almost all of its k-word shingles, so the
+estimated Jaccard similarity of the two signatures is close to 1; unrelated resumes share
+almost none. A signature has NUM_PERM values split into BANDS bands of ROWS_PER_BAND; two
+resumes become candidates for comparison when any band matches exactly, and are duplicates
+when the estimated Jaccard similarity reaches the threshold. Band keys are stored per candidate
+(table candidate_lsh_bands), so an upload is checked against the recruiter's candidates for
+the same JD with one indexed lookup instead of comparing every pair. A CV already stored for
+another JD is not a duplicate: it still has to be scored against this one.
+
+Env:
+    NEAR_DUP_JACCARD   Estimated Jaccard similarity at which a resume is a duplicate (default 0.9)
+    NEAR_DUP_SHINGLE   Words per shingle (default 5)
+"""
+import hashlib
+import os
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS  # 4 rows: pairs above ~0.6 Jaccard nearly always share a band
+_PRIME = (1 << 31) - 1  # a * x + b stays below 2**63 for 32-bit shingle hashes
+
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, _PRIME, size=NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, _PRIME, size=NUM_PERM).astype(np.uint64)
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def jaccard_threshold() -> float:
+    return float(os.getenv("NEAR_DUP_JACCARD", "0.9"))
+
+
+def shingles(text: str, k: Optional[int] = None) -> set:
+    k = k or int(os.getenv("NEAR_DUP_SHINGLE", "5"))
+    words = _WORD_RE.findall((text or "").lower())
+    if len(words) <= k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def signature(text: str) -> np.ndarray:
+    """(NUM_PERM,) uint32 MinHash signature; all _PRIME for a text without words."""
+    hashed = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles(text)), dtype=np.uint64
+    )
+    if not len(hashed):
+        return np.full(NUM_PERM, _PRIME, dtype=np.uint32)
+    # (perm, shingle) matrix, min over shingles
+    return ((np.outer(_A, hashed) + _B[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+def signatures(texts: List[str]) -> List[np.ndarray]:
+    return [signature(t) for t in texts]
+
+
+def band_keys(sig: np.ndarray) -> List[str]:
+    """One key per band: "<band>:<digest of the band's rows>"."""
+    sig = np.asarray(sig, dtype=np.uint32)
+    return [
+        f"{b}:{hashlib.md5(sig[b * ROWS_PER_BAND:(b + 1) * ROWS_PER_BAND].tobytes()).hexdigest()[:16]}"
+        for b in range(BANDS)
+    ]
+
+
+def estimate_jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.mean(np.asarray(a) == np.asarray(b)))
+
+
+def _is_empty(sig: np.ndarray) -> bool:
+    return bool(sig[0] == _PRIME and np.all(sig == _PRIME))
+
+
+def find_near_duplicates(recruiter_username: str, sigs: List[np.ndarray], threshold: Optional[float] = None, job_description: Optional[str] = None) -> List[Optional[Tuple[str, float]]]:
+    """
+    For each signature of an upload: (candidate_id, jaccard) of the closest stored candidate of
+    this recruiter (evaluated against `job_description`, when given), or ("upload:<row>", jaccard)
+    of an earlier non-duplicate resume in the same upload, when the estimated similarity reaches
+    `threshold`; else None.
+    """
+    # Avoid circular imports
+    from app.db import get_minhash_matches
+
+    threshold = jaccard_threshold() if threshold is None else threshold
+    keys = [band_keys(sig) for sig in sigs]
+    stored = get_minhash_matches(sorted({k for row in keys for k in row}), recruiter_username, job_description)
+    stored_buckets: Dict[str, List[str]] = {}
+    for cid, (cand_keys, _) in stored.items():
+        for key in cand_keys:
+            stored_buckets.setdefault(key, []).append(cid)
+
+    upload_buckets: Dict[str, List[int]] = {}
+    found = []
+    for row, (sig, row_keys) in enumerate(zip(sigs, keys)):
+        if _is_empty(sig):
+            found.append(None)
+            continue
+        best = None
+        for cid in {c for key in row_keys for c in stored_buckets.get(key, ())}:
+            score = estimate_jaccard(sig, stored[cid][1])
+            if score >= threshold and (best is None or score > best[1]):
+                best = (cid, score)
+        for other in {r for key in row_keys for r in upload_buckets.get(key, ())}:
+            score = estimate_jaccard(sig, sigs[other])
+            if score >= threshold and (best is None or score > best[1]):
+                best = (f"upload:{other}", score)
+        found.append(best)
+        if best is None:
+            # Only originals are indexed, so a duplicate always links to a kept resume
+            for key in row_keys:
+                upload_buckets.setdefault(key, []).append(row)
+    return found
@@ -0,0 +1,63 @@
+"""
+Cheap local pre-rank of resumes against a JD (first stage of the screening cascade).
+
+Okapi BM25 with the JD keyword vocabulary (see app.keyword_matcher) as the query,
+computed for the whole pool from one sparse term-frequency matrix. Scores are
+normalized to 0-100 relative to the best resume in the pool.
+"""
+import re
+from typing import List
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+
+from app.keyword_matcher import TOKEN_PATTERN, get_keyword_matcher
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(TOKEN_PATTERN)
+
+
+def bm25_scores(jd_text: str, resume_texts: List[str]) -> np.ndarray:
+    """Raw BM25 score of every resume for the JD keywords."""
+    vocabulary = get_keyword_matcher(jd_text).vocabulary
+    if not vocabulary or not resume_texts:
+        return np.zeros(len(resume_texts))
+
+    # Document lengths over all tokens, term frequencies over the JD vocabulary only
+    lengths = np.array([len(_TOKEN_RE.findall(t.lower())) for t in resume_texts], dtype=float)
+    tf = CountVectorizer(vocabulary=vocabulary, token_pattern=TOKEN_PATTERN).transform(resume_texts).tocsr().astype(float)
+
+    n = len(resume_texts)
+    df = np.bincount(tf.indices, minlength=len(vocabulary))
+    idf = np.log((n - df + 0.5) / (df + 0.5) + 1.0)
+
+    avgdl = lengths.mean() or 1.0
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avgdl)
+
+    # Saturate tf in place on the non-zeros: tf * (k1 + 1) / (tf + norm_row)
+    rows = np.repeat(np.arange(n), np.diff(tf.indptr))
+    tf.data = tf.data * (BM25_K1 + 1) / (tf.data + norm[rows]) * idf[tf.indices]
+    return np.asarray(tf.sum(axis=1)).ravel()
+
+
+def prerank(jd_text: str, resume_texts: List[str]) -> np.ndarray:
+    """Pre-rank scores on 0-100 (best resume in the pool = 100)."""
+    scores = bm25_scores(jd_text, resume_texts)
+    top = scores.max() if len(scores) else 0.0
+    return np.round(scores / top * 100, 2) if top > 0 else np.zeros(len(resume_texts))
+
+
+def select_for_llm(scores: np.ndarray, top_k: int = 0, min_score: float = 0.0) -> np.ndarray:
+    """
+    Boolean mask of resumes that go on to LLM evaluation: within the top K
+    (0 = no limit) and at or above the floor.
+    """
+    keep = scores >= min_score
+    if top_k and top_k < len(scores):
+        ranked = np.argsort(-scores, kind="stable")
+        in_top = np.zeros(len(scores), dtype=bool)
+        in_top[ranked[:top_k]] = True
+        keep &= in_top
+    return keep
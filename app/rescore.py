@@ -0,0 +1,106 @@
+"""
+Re-scoring of stored candidates after template weights or thresholds change.
+
+The Likert scores already stored in `resume_evaluation_data` are loaded into one
+matrix and weighted against each candidate's (current) role template in a single
+NumPy operation; results are written back with one bulk UPDATE. No LLM calls.
+"""
+import json
+import time
+from typing import Optional
+
+import numpy as np
+
+from app.db import bulk_update_candidates, get_candidates_for_rescore
+from app.likert_scorer import LIKERT_FIELDS
+from app.role_templates import load_template
+
+# Statuses still decided by the resume score alone; later stages (interview done, manual) are kept
+RESCORABLE_STATUSES = {"Pending", "Shortlisted", "Rejected", "Selected (Resume)", "Rejected (Resume)"}
+
+
+def rescore_candidates(
+    recruiter_username: str,
+    upload_job_id: Optional[str] = None,
+    template_key: Optional[str] = None,
+    resume_threshold: Optional[float] = None,
+) -> dict:
+    """
+    Recompute weighted_resume_score, decision and status for a recruiter's pool.
+
+    template_key: apply this template to the whole pool instead of each candidate's own.
+    resume_threshold: shortlist/select cut-off, saved on the candidates for later runs; defaults to
+        the threshold each candidate was uploaded with (the template's "interview" threshold for
+        candidates stored before thresholds were recorded).
+    """
+    start = time.perf_counter()
+    rows = get_candidates_for_rescore(recruiter_username, upload_job_id)
+    evaluations = [json.loads(r["resume_evaluation_data"] or "{}") for r in rows]
+    usable = [i for i, e in enumerate(evaluations) if isinstance(e.get("likert_scores"), dict)]
+    if not usable:
+        return {"rescored": 0, "status_changed": 0, "skipped": len(rows), "templates": {}, "elapsed_ms": 0.0}
+
+    likert = np.array([[evaluations[i]["likert_scores"].get(f, 1) for f in LIKERT_FIELDS] for i in usable], dtype=float)
+    keys = np.array([template_key or rows[i]["template_key"] or "junior" for i in usable])
+
+    # Per-row weights and thresholds, filled per template group
+    weights = np.zeros_like(likert)
+    shortlist = np.zeros(len(usable))
+    interview = np.zeros(len(usable))
+    templates = {}
+    for key in np.unique(keys):
+        template, thresholds = load_template(str(key), recruiter_username)
+        mask = keys == key
+        weights[mask] = [template.get("parameters", {}).get(f, 0.0) for f in LIKERT_FIELDS]
+        shortlist[mask] = thresholds.get("shortlist", 75)
+        interview[mask] = thresholds.get("interview", 50)
+        templates[str(key)] = {"parameters": template.get("parameters", {}), "thresholds": thresholds, "candidates": int(mask.sum())}
+
+    # resume_score = Σ(likert / 5 × parameter_weight) × 100
+    scores = np.round((likert / 5.0 * weights).sum(axis=1) * 100, 2)
+    decisions = np.select([scores >= shortlist, scores >= interview], ["Strong Match", "Interview Required"], "Weak Resume – Reject")
+
+    if resume_threshold is None:
+        stored = np.array([rows[i].get("resume_threshold") for i in usable], dtype=float)  # None -> nan
+        cutoff = np.where(np.isnan(stored), interview, stored)
+    else:
+        cutoff = np.full(len(usable), float(resume_threshold))
+    passed = scores >= cutoff
+    interview_enabled = np.array([rows[i]["interview_enabled"] is not False for i in usable])
+    statuses = np.where(
+        interview_enabled,
+        np.where(passed, "Shortlisted", "Rejected"),
+        np.where(passed, "Selected (Resume)", "Rejected (Resume)"),
+    )
+    final_scores = np.where(interview_enabled, 0.0, scores)
+
+    mappings = []
+    status_changed = 0
+    for j, i in enumerate(usable):
+        row, evaluation = rows[i], evaluations[i]
+        evaluation["weighted_resume_score"] = float(scores[j])
+        evaluation["decision"] = str(decisions[j])
+        evaluation["interview_required"] = bool(decisions[j] == "Interview Required")
+        update = {
+            "id": row["id"],
+            "match_score": float(scores[j]),
+            "resume_evaluation_data": json.dumps(evaluation),
+        }
+        if template_key:
+            update["template_key"] = template_key
+        if resume_threshold is not None:
+            update["resume_threshold"] = float(resume_threshold)
+        if row["status"] in RESCORABLE_STATUSES:
+            update["status"] = str(statuses[j])
+            update["final_score"] = float(final_scores[j])
+            status_changed += int(update["status"] != row["status"])
+        mappings.append(update)
+
+    bulk_update_candidates(mappings)
+    return {
+        "rescored": len(mappings),
+        "status_changed": status_changed,
+        "skipped": len(rows) - len(usable),
+        "templates": templates,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
@@ -0,0 +1,101 @@
+"""
+Structured candidate facts extracted once at ingest, without an LLM.
+
+Stored in the `candidate_features` table (see app.db.add_candidate) so invites, interviews,
+leaderboard filters and rescoring read fields instead of re-scanning `resume_text`:
+email, phone, skills, education and experience entries, total years and degree level.
+Uses the same section/degree/date patterns as the Likert pre-scorer.
+"""
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.db import get_candidate_features, save_candidate_features
+from app.likert_scorer import DEGREE_LEXICON, DATE_RANGE_RE, section_body, years_of_experience
+from app.resume_minimizer import phone_numbers
+from app.resume_parser import extract_email
+from app.skill_verifier import verify_skills
+
+MAX_SKILLS = 40
+_SKILL_SPLIT_RE = re.compile(r"\s*(?:[,;|/•▪●◦➢►]|\s-\s|\band\b)\s*")
+_SKILL_LABEL_RE = re.compile(r"^[A-Za-z ]{2,30}:\s*")  # "Languages: Python" -> "Python"
+_YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+
+
+def _skills(text: str, required_skills: List[str]) -> List[str]:
+    """Items listed in the Skills section, then any JD skill that appears verbatim."""
+    skills = []
+    for item in _SKILL_SPLIT_RE.split(section_body(text, "skills")):
+        item = _SKILL_LABEL_RE.sub("", item).strip(" .:-")
+        if item and len(item) <= 30 and len(item.split()) <= 3:
+            skills.append(item)
+    if required_skills:
+        skills += verify_skills(required_skills, text)[0]
+    unique = {}
+    for s in skills:
+        unique.setdefault(s.lower(), s)
+    return list(unique.values())[:MAX_SKILLS]
+
+
+def _education(text: str) -> List[Dict]:
+    body = section_body(text, "education") or text
+    entries = []
+    for level, pattern in DEGREE_LEXICON:
+        for match in pattern.finditer(body):
+            tail = body[match.start():match.start() + 80]
+            year = _YEAR_RE.search(tail)
+            degree = tail[:year.start()] if year else tail[:60]
+            entries.append({
+                "degree": degree.strip(" ,.-|"),
+                "level": level,
+                "year": year.group(0) if year else "",
+                "position": match.start(),
+            })
+    entries.sort(key=lambda e: e["position"])
+    for e in entries:
+        e.pop("position")
+    return entries
+
+
+def _experience(text: str) -> List[Dict]:
+    body = section_body(text, "experience")
+    if not body:
+        return []
+    now = datetime.now().year
+    entries, previous_end = [], 0
+    for match in DATE_RANGE_RE.finditer(body):
+        start, end = match.group(1), match.group(2)
+        end_year = now if not end[:1].isdigit() else int(end)
+        # The title/company line normally sits right before its dates
+        description = body[previous_end:match.start()].strip(" ,.-|")[-100:]
+        entries.append({
+            "duration": f"{start} - {end}",
+            "years": max(end_year - int(start), 0),
+            "description": description,
+        })
+        previous_end = match.end()
+    return entries
+
+
+def extract_candidate_features(text: str, required_skills: Optional[List[str]] = None) -> Dict:
+    text = text or ""
+    phones = phone_numbers(text)
+    education = _education(text)
+    return {
+        "email": extract_email(text).lower(),
+        "phone": phones[0] if phones else "",
+        "skills": _skills(text, required_skills or []),
+        "education": education,
+        "experience": _experience(text),
+        "total_years": years_of_experience(text),
+        "degree_level": max((e["level"] for e in education), default=1),
+    }
+
+
+def candidate_features(candidate: Dict) -> Dict:
+    """Stored features for a candidate row; rows ingested before the feature store are extracted and saved once."""
+    features = get_candidate_features(candidate["id"])
+    if features is None:
+        features = extract_candidate_features(candidate.get("resume_text") or "")
+        save_candidate_features(candidate["id"], features)
+    return features
@@ -0,0 +1,182 @@
+"""
+Compact `prompt_text` for LLM calls, built once at ingest from the per-page resume text.
+
+Steps (all line based, so run on the raw pages before whitespace is collapsed):
+  1. drop lines repeated across pages (running headers / footers) and page numbers;
+  2. drop duplicate lines;
+  3. collapse the contact block (emails, phones, profile links, addresses) into one line; an
+     address is a line in the header (before the first section heading) with an address word,
+     or a line mostly made of address words and numbers - "Built a zip compression service"
+     under Experience stays where it is;
+  4. drop low-value sections (references, hobbies, declaration, ...) and cap long bullet lists.
+
+The full text is still stored and used for everything local (skill verification, scoring).
+"""
+import re
+from collections import Counter
+from typing import List
+
+from app.likert_scorer import section_starts
+
+# Optional exact tokenizer
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+MAX_BULLETS_PER_SECTION = 8
+
+_PAGE_NUMBER_RE = re.compile(r"^\s*(?:page\s*)?\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?\s*$", re.IGNORECASE)
+_EMAIL_RE = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+PHONE_RE = re.compile(r"(?:\+?\d[\d\s().-]{8,}\d)")
+_PROFILE_RE = re.compile(r"(?:https?://)?(?:www\.)?(?:linkedin\.com|github\.com|gitlab\.com)/[\w\-./]+", re.IGNORECASE)
+_URL_RE = re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE)
+_ADDRESS_RE = re.compile(r"\b(?:address|street|road|nagar|apartment|apt\.?|pin(?:code)?|zip)\b", re.IGNORECASE)
+_ADDRESS_LABEL_RE = re.compile(r"^\s*(?:address|addr\.?)\s*[:\-]\s*", re.IGNORECASE)
+_WORD_RE = re.compile(r"\w+")
+# Opening sections likert_scorer doesn't score, which still end the header block
+_INTRO_HEADING_RE = re.compile(r"^\s*(?:(?:professional\s+|career\s+)?(?:summary|profile|objective)|about\s+me)\s*:?\s*$", re.IGNORECASE)
+_BULLET_RE = re.compile(r"^\s*(?:[-•*▪●◦➢►]|\d+[.)])\s+")
+
+_LOW_VALUE_HEADINGS = re.compile(
+    r"^\s*(?:references?|hobbies|interests|hobbies\s*(?:&|and)\s*interests|declaration|personal\s+(?:details|information|profile)|"
+    r"languages\s+known|extra[- ]?curricular(?:\s+activities)?)\s*:?\s*$",
+    re.IGNORECASE,
+)
+_HEADING_RE = re.compile(r"^\s*[A-Za-z][A-Za-z &/]{2,40}:?\s*$")
+
+
+def estimate_tokens(text: str) -> int:
+    """Prompt tokens for `text` (tiktoken when installed, else ~4 chars per token)."""
+    if not text:
+        return 0
+    if _ENCODING:
+        return len(_ENCODING.encode(text))
+    return max(1, len(text) // 4)
+
+
+def phone_numbers(text: str) -> List[str]:
+    """Phone numbers in `text`: 10+ digits, so date ranges like "2016 - 2020" aren't taken for one."""
+    return [p.strip() for p in PHONE_RE.findall(text) if sum(c.isdigit() for c in p) >= 10]
+
+
+def _normalize(line: str) -> str:
+    return re.sub(r"\s+", " ", line).strip()
+
+
+def _repeated_page_lines(pages: List[List[str]]) -> set:
+    """Lines on at least half of the pages (min 2) are headers/footers."""
+    if len(pages) < 2:
+        return set()
+    counts = Counter(line.lower() for page in pages for line in set(page))
+    min_pages = max(2, (len(pages) + 1) // 2)
+    return {line for line, n in counts.items() if n >= min_pages}
+
+
+def _is_heading(line: str) -> bool:
+    return bool(_HEADING_RE.match(line)) and (line.isupper() or line.istitle() or line.endswith(":"))
+
+
+def _is_section_heading(line: str) -> bool:
+    """A heading that opens a resume section (ends the header block); a title-case name doesn't."""
+    if _LOW_VALUE_HEADINGS.match(line) or _INTRO_HEADING_RE.match(line):
+        return True
+    return _is_heading(line) and section_starts(line)[:1] == [0]
+
+
+def _is_address(line: str, in_header: bool) -> bool:
+    if len(line) >= 120 or _BULLET_RE.match(line) or not _ADDRESS_RE.search(line):
+        return False
+    if in_header or _ADDRESS_LABEL_RE.match(line):
+        return True
+    # Outside the header: only when address words and numbers make up most of the line
+    words = _WORD_RE.findall(line)
+    addressy = sum(1 for w in words if _ADDRESS_RE.fullmatch(w) or any(c.isdigit() for c in w))
+    return addressy * 2 >= len(words)
+
+
+def minimize_resume(pages: List[str]) -> str:
+    page_lines = [[_normalize(l) for l in page.splitlines() if _normalize(l)] for page in pages if page]
+    repeated = _repeated_page_lines(page_lines)
+
+    contact = {"email": [], "phone": [], "profile": [], "address": []}
+    in_header = True
+    kept: List[str] = []
+    seen = set()
+    skipping_section = False
+    bullets_in_section = 0
+
+    for line in (l for page in page_lines for l in page):
+        lower = line.lower()
+        if lower in repeated or _PAGE_NUMBER_RE.match(line):
+            continue
+
+        if in_header and _is_section_heading(line):
+            in_header = False
+
+        # Contact details: collect into the contact line, and drop the line if that's all it holds
+        emails, profiles = _EMAIL_RE.findall(line), _PROFILE_RE.findall(line)
+        phones = phone_numbers(line)
+        address = _is_address(line, in_header)
+        if emails or phones or profiles or address:
+            contact["email"] += emails
+            contact["phone"] += phones
+            contact["profile"] += profiles
+            rest = _URL_RE.sub("", _PROFILE_RE.sub("", _EMAIL_RE.sub("", line)))
+            for phone in phones:
+                rest = rest.replace(phone, "")
+            rest = _normalize(_ADDRESS_LABEL_RE.sub("", rest).strip(" |,;-"))
+            if address:
+                contact["address"].append(rest)
+                continue
+            if len(re.sub(r"[\W_]+", "", rest)) < 15:
+                continue
+            line = rest
+            lower = line.lower()
+
+        if _LOW_VALUE_HEADINGS.match(line):
+            skipping_section = True
+            continue
+        if _is_heading(line):
+            skipping_section = False
+            bullets_in_section = 0
+        if skipping_section:
+            continue
+
+        if lower in seen:
+            continue
+        seen.add(lower)
+
+        if _BULLET_RE.match(line):
+            bullets_in_section += 1
+            if bullets_in_section > MAX_BULLETS_PER_SECTION:
+                continue
+        kept.append(line)
+
+    contact_parts = [
+        ", ".join(dict.fromkeys(values))
+        for values in (contact["email"][:1], contact["phone"][:1], contact["profile"][:2], contact["address"][:2]) if values
+    ]
+    if contact_parts:
+        # Name is normally the first line; keep contact right after it
+        kept.insert(1 if kept else 0, "Contact: " + " | ".join(contact_parts))
+    return "\n".join(kept)
+
+
+def build_prompt_text(pages: List[str], full_text: str) -> str:
+    """Minimized text, unless that doesn't actually save tokens (very short resumes)."""
+    compact = minimize_resume(pages)
+    if compact and estimate_tokens(compact) < estimate_tokens(full_text):
+        return compact
+    return full_text
+
+
+def savings(full_text: str, prompt_text: str) -> dict:
+    full_tokens, prompt_tokens = estimate_tokens(full_text), estimate_tokens(prompt_text)
+    return {
+        "full_tokens": full_tokens,
+        "prompt_tokens": prompt_tokens,
+        "saved_tokens": full_tokens - prompt_tokens,
+        "saved_pct": round((full_tokens - prompt_tokens) / full_tokens * 100, 2) if full_tokens else 0.0,
+    }
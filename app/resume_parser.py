@@ -2,6 +2,7 @@ import io
 from PyPDF2 import PdfReader
 import fitz  # PyMuPDF
 import re
+from typing import List
 from app.utils import clean_text
 
 # Optional OCR
@@ -33,20 +34,20 @@ def extract_email(text: str) -> str:
     return ""
 
 
-def parse_resume(file_bytes: bytes, filename: str) -> str:
+def extract_resume_pages(file_bytes: bytes, filename: str) -> List[str]:
     """
-    Parse resume text from bytes.
-    1. If .txt, decode utf-8.
+    Raw per-page text (line breaks kept), for the prompt minimizer.
+    1. If .txt, decode utf-8 (one page).
     2. Try PyPDF2
     3. If empty/scanned, try PyMuPDF + EasyOCR
     """
     if filename.lower().endswith(".txt"):
         try:
-            return clean_text(file_bytes.decode("utf-8", errors="ignore"))
+            return [file_bytes.decode("utf-8", errors="ignore")]
         except:
             pass
 
-    text = ""
+    pages = []
     
     # 2. Try PyPDF2
     try:
@@ -54,22 +55,20 @@ def parse_resume(file_bytes: bytes, filename: str) -> str:
         for page in reader.pages:
             extracted = page.extract_text()
             if extracted:
-                text += extracted + "\n"
+                pages.append(extracted)
     except Exception as e:
         print(f"⚠️ PyPDF2 failed: {e}")
     
-    clean = clean_text(text)
-    
     # If text is sufficient, return it
-    if len(clean) > 50:
-        return clean
+    if len(clean_text("\n".join(pages))) > 50:
+        return pages
 
     # 2. OCR Fallback
     if OCR_AVAILABLE:
         print("⚠️ Text too short/empty. Attempting OCR...")
         try:
             doc = fitz.open(stream=file_bytes, filetype="pdf")
-            ocr_text = ""
+            ocr_pages = []
             reader = get_ocr_reader()
             
             for page in doc:
@@ -79,12 +78,18 @@ def parse_resume(file_bytes: bytes, filename: str) -> str:
                 
                 # Run OCR
                 results = reader.readtext(img_bytes, detail=0)
-                ocr_text += " ".join(results) + "\n"
+                ocr_pages.append("\n".join(results))
                 
-            clean_ocr = clean_text(ocr_text)
-            if clean_ocr:
-                return clean_ocr
+            if clean_text("\n".join(ocr_pages)):
+                return ocr_pages
         except Exception as e:
             print(f"❌ OCR failed: {e}")
             
-    return clean # Return whatever we have (maybe empty)
+    return pages # Return whatever we have (maybe empty)
+
+
+def parse_resume(file_bytes: bytes, filename: str) -> str:
+    """
+    Parse resume text from bytes (whitespace-normalized, see extract_resume_pages).
+    """
+    return clean_text("\n".join(extract_resume_pages(file_bytes, filename)))
@@ -0,0 +1,165 @@
+"""
+Local job-role classification for JDs, so role deduction doesn't need an LLM round trip.
+
+Two signals:
+  1. a compiled title lexicon: an explicit title in the JD ("Senior Data Engineer") wins outright;
+  2. a nearest-centroid classifier: TF-IDF of the JD against one keyword prototype per role family.
+
+Seniority (intern / junior / senior) comes from a separate lexicon plus "N+ years" requirements
+and gives the role-template key. Callers fall back to the LLM when confidence is below
+ROLE_CLASSIFIER_THRESHOLD (env, default 0.25).
+"""
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# family title -> (title aliases, prototype keywords)
+ROLE_FAMILIES = {
+    "Backend Developer": (
+        ["backend developer", "backend engineer", "back-end developer", "back-end engineer", "api developer", "python developer", "java developer", "golang developer", "node.js developer", "django developer"],
+        "backend api rest graphql microservices server python java go golang node django flask fastapi spring boot sql postgresql mysql redis kafka",
+    ),
+    "Frontend Developer": (
+        ["frontend developer", "frontend engineer", "front-end developer", "front-end engineer", "react developer", "angular developer", "ui developer"],
+        "frontend react angular vue javascript typescript html css redux nextjs webpack browser ui components responsive",
+    ),
+    "Full Stack Developer": (
+        ["full stack developer", "full-stack developer", "full stack engineer", "fullstack developer", "mern stack developer", "mean stack developer"],
+        "full stack frontend backend react node express mongodb javascript typescript api html css mern mean",
+    ),
+    "Mobile Developer": (
+        ["mobile developer", "android developer", "ios developer", "flutter developer", "react native developer", "mobile engineer"],
+        "mobile android ios kotlin swift flutter dart react native app store play store xcode",
+    ),
+    "Data Scientist": (
+        ["data scientist", "applied scientist", "research scientist"],
+        "data science statistics machine learning models python pandas numpy scikit-learn hypothesis experiments regression classification",
+    ),
+    "Machine Learning Engineer": (
+        ["machine learning engineer", "ml engineer", "ai engineer", "deep learning engineer", "nlp engineer", "computer vision engineer", "mlops engineer"],
+        "machine learning deep learning pytorch tensorflow nlp llm computer vision model training deployment mlops transformers",
+    ),
+    "Data Engineer": (
+        ["data engineer", "etl developer", "big data engineer", "analytics engineer"],
+        "data pipelines etl spark airflow kafka hadoop warehouse snowflake bigquery redshift dbt sql batch streaming",
+    ),
+    "Data Analyst": (
+        ["data analyst", "business analyst", "bi analyst", "business intelligence analyst", "reporting analyst"],
+        "analysis dashboards excel sql tableau power bi reporting insights kpis stakeholders visualization",
+    ),
+    "DevOps Engineer": (
+        ["devops engineer", "site reliability engineer", "sre", "platform engineer", "cloud engineer", "infrastructure engineer", "build and release engineer"],
+        "devops ci cd kubernetes docker terraform ansible aws azure gcp jenkins monitoring prometheus infrastructure as code reliability",
+    ),
+    "QA Engineer": (
+        ["qa engineer", "test engineer", "sdet", "quality assurance engineer", "automation tester", "software tester", "qa analyst"],
+        "testing qa automation selenium cypress test cases regression manual testing bugs jira quality assurance",
+    ),
+    "Security Engineer": (
+        ["security engineer", "security analyst", "cybersecurity analyst", "penetration tester", "soc analyst", "appsec engineer"],
+        "security vulnerabilities penetration testing siem soc incident response owasp threat firewall compliance iso 27001",
+    ),
+    "Embedded Engineer": (
+        ["embedded engineer", "embedded software engineer", "firmware engineer", "embedded developer"],
+        "embedded firmware c c++ microcontroller rtos arm hardware drivers iot linux kernel",
+    ),
+    "UI/UX Designer": (
+        ["ui/ux designer", "ux designer", "ui designer", "product designer", "interaction designer"],
+        "design figma sketch wireframes prototypes user research usability ux ui design systems",
+    ),
+    "Product Manager": (
+        ["product manager", "product owner", "technical product manager"],
+        "product roadmap requirements stakeholders prioritization user stories agile market strategy launch metrics",
+    ),
+    "Software Engineer": (
+        ["software engineer", "software developer", "sde", "programmer", "application developer"],
+        "software engineering development programming algorithms data structures code review design patterns",
+    ),
+}
+
+# "manager" alone isn't seniority ("Product Manager", "reports to the hiring manager")
+_SENIOR_RE = re.compile(r"\b(?:senior|sr\.?|lead|principal|staff|head of|engineering manager|architect)\b", re.IGNORECASE)
+_INTERN_RE = re.compile(r"\b(?:intern|internship|trainee|fresher|apprentice|entry[- ]level)\b", re.IGNORECASE)
+_JUNIOR_RE = re.compile(r"\b(?:junior|jr\.?|associate)\b", re.IGNORECASE)
+_MIN_YEARS_RE = re.compile(r"\b(\d{1,2})\s*\+?\s*(?:-\s*\d{1,2}\s*)?(?:years?|yrs?)\b", re.IGNORECASE)
+
+_TITLE_RE = re.compile(
+    r"\b(" + "|".join(
+        re.escape(alias) for alias in sorted((a for aliases, _ in ROLE_FAMILIES.values() for a in aliases), key=len, reverse=True)
+    ) + r")\b",
+    re.IGNORECASE,
+)
+_ALIAS_TO_FAMILY = {alias: family for family, (aliases, _) in ROLE_FAMILIES.items() for alias in aliases}
+
+TITLE_MATCH_CONFIDENCE = 0.95
+
+
+@dataclass
+class RoleGuess:
+    title: str           # e.g. "Senior Data Engineer"
+    template_key: str    # intern / junior / senior
+    confidence: float    # 0-1
+    source: str          # "title" | "centroid"
+
+
+def confidence_threshold() -> float:
+    return float(os.getenv("ROLE_CLASSIFIER_THRESHOLD", "0.25"))
+
+
+@lru_cache(maxsize=1)
+def _centroids():
+    families = list(ROLE_FAMILIES)
+    vectorizer = TfidfVectorizer(token_pattern=r"(?u)\b[\w+#.]+\b", sublinear_tf=True)
+    prototypes = [" ".join(ROLE_FAMILIES[f][0]) + " " + ROLE_FAMILIES[f][1] for f in families]
+    matrix = vectorizer.fit_transform(prototypes)  # rows are L2-normalized
+    return families, vectorizer, matrix
+
+
+def seniority(jd_text: str) -> str:
+    """Template key from seniority words in the title area, then stated minimum years."""
+    # Only the opening of the JD: further down "lead the design" / "hiring manager" aren't about the role
+    head = jd_text[:300]
+    if _INTERN_RE.search(head):
+        return "intern"
+    if _SENIOR_RE.search(head):
+        return "senior"
+    if _JUNIOR_RE.search(head):
+        return "junior"
+    years = [int(y) for y in _MIN_YEARS_RE.findall(jd_text)]
+    if years and min(years) >= 5:
+        return "senior"
+    return "junior"
+
+
+def _titled(family: str, key: str) -> str:
+    if key == "senior":
+        return f"Senior {family}"
+    if key == "intern":
+        return f"{family} Intern"
+    return family
+
+
+def classify_role(jd_text: str) -> RoleGuess:
+    jd_text = jd_text or ""
+    key = seniority(jd_text)
+
+    match = _TITLE_RE.search(jd_text)
+    if match:
+        family = _ALIAS_TO_FAMILY[match.group(1).lower()]
+        return RoleGuess(_titled(family, key), key, TITLE_MATCH_CONFIDENCE, "title")
+
+    families, vectorizer, matrix = _centroids()
+    sims = (matrix @ vectorizer.transform([jd_text.lower()]).T).toarray().ravel()
+    if not sims.any():
+        return RoleGuess(_titled("Software Engineer", key), key, 0.0, "centroid")
+
+    order = np.argsort(-sims)
+    best, second = sims[order[0]], sims[order[1]] if len(order) > 1 else 0.0
+    # Similarity discounted by how close the runner-up is
+    confidence = float(best * (1 - second / best)) if best else 0.0
+    return RoleGuess(_titled(families[order[0]], key), key, round(min(1.0, confidence * 2), 3), "centroid")
+
@@ -3,30 +3,61 @@
 Defines the Role Templates and Thresholds logic as per the Virex System.
 """
 
-def get_role_template(role_name: str) -> tuple[dict, dict]:
+BUILTIN_TEMPLATE_KEYS = ("intern", "junior", "senior")
+
+def resolve_template_key(role_name: str, recruiter_username: str = None) -> str:
     """
-    Returns (template_weights, thresholds) for a given role name or key.
-    Defaults to 'Junior' if not found or unsure.
+    Maps a role name or key to a template key.
+    A recruiter's custom template key is used as-is; otherwise intern/junior/senior,
+    defaulting to 'junior' if not found or unsure.
     """
-    role_lower = role_name.lower()
+    role_lower = (role_name or "").lower().strip()
     
     # Direct Key Match (Manual Selection)
-    if role_lower == "intern":
-        return _intern_template()
-    if role_lower == "senior":
-         return _senior_template()
-    if role_lower == "junior":
-         return _junior_template()
+    if role_lower in BUILTIN_TEMPLATE_KEYS:
+        return role_lower
+    if role_lower and _stored_template(role_lower, recruiter_username):
+        return role_lower
 
     # Fuzzy Match (Auto-Detect)
     if "intern" in role_lower or "trainee" in role_lower or "fresher" in role_lower:
-        return _intern_template()
+        return "intern"
 
     if "senior" in role_lower or "lead" in role_lower or "manager" in role_lower or "principal" in role_lower:
-        return _senior_template()
+        return "senior"
 
     # Default
-    return _junior_template()
+    return "junior"
+
+def load_template(key: str, recruiter_username: str = None) -> tuple[dict, dict]:
+    """
+    (template_weights, thresholds) for a template key: the recruiter's edited copy if one
+    is stored, else the shared stored copy, else the built-in defaults.
+    """
+    stored = _stored_template(key, recruiter_username)
+    if stored:
+        return {"parameters": stored["parameters"]}, stored["thresholds"]
+    builtin = {"intern": _intern_template, "senior": _senior_template}.get(key, _junior_template)
+    return builtin()
+
+def template_exists(key: str, recruiter_username: str = None) -> bool:
+    """True for a built-in key or a template stored for this recruiter (or shared)."""
+    return key in BUILTIN_TEMPLATE_KEYS or bool(_stored_template(key, recruiter_username))
+
+def get_role_template(role_name: str, recruiter_username: str = None) -> tuple[dict, dict]:
+    """
+    Returns (template_weights, thresholds) for a given role name or key.
+    Defaults to 'Junior' if not found or unsure.
+    """
+    return load_template(resolve_template_key(role_name, recruiter_username), recruiter_username)
+
+def _stored_template(key: str, recruiter_username: str = None):
+    # Templates are recruiter-editable and persisted; fall back to built-ins if the DB is unavailable
+    try:
+        from app.db import get_role_template_db
+        return get_role_template_db(key, recruiter_username)
+    except Exception:
+        return None
 
 # Helper functions to avoid duplication
 def _intern_template():
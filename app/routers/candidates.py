@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, Query
 from fastapi.responses import JSONResponse
 from loguru import logger
 import asyncio
 from app.db import (
     add_candidate, get_leaderboard, get_candidate, 
-    update_candidate_status, clear_db
+    update_candidate_status, clear_db, get_candidate_summaries, skill_facets
 )
-from app.schemas import StartInterviewRequest
-from app.resume_parser import parse_resume, extract_email
+from app.schemas import StartInterviewRequest, RescoreRequest
+from app.resume_parser import parse_resume
+from app.resume_features import candidate_features
 from app.email_service import send_interview_invite, send_shortlist_email, send_rejection_email
 from app.utils import clean_text
 from app.matcher import extract_required_skills, detect_job_role, extract_skills_async, evaluate_resume_structured
@@ -15,6 +16,7 @@ from app.role_templates import get_role_template
 from app.jobs_service import search_jobs
 from app.routers.auth import get_current_user
 import json
+from typing import List, Optional
 
 router = APIRouter()
 
@@ -57,12 +59,17 @@ async def get_job_status(job_id: str, user: str = Depends(get_current_user)):
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
         
+        metrics = json.loads(job.metrics or "{}")
         return {
             "job_id": job.job_id,
             "status": job.status,
             "total": job.total_files,
             "processed": job.processed_count,
             "results": job.results, # JSON string
+            "llm_usage": metrics.get("llm_usage", {}),
+            "stage_timings": metrics.get("stage_timings", {}),
+            "cascade": metrics.get("cascade", {}),
+            "prompt_minimizer": metrics.get("prompt_minimizer", {}),
             "created_at": job.created_at
         }
     finally:
@@ -76,6 +83,9 @@ async def upload_resume(
     template_mode: str = Form("auto"),
     enable_interview: bool = Form(True),
     resume_threshold: int = Form(50), # New Parameter
+    cascade: bool = Form(False), # Pre-rank locally, LLM-evaluate only the best
+    cascade_top_k: int = Form(50), # 0 = no limit
+    cascade_min_score: float = Form(0.0), # Pre-rank floor (0-100, best resume = 100)
     background_tasks: BackgroundTasks = BackgroundTasks(),
     user: str = Depends(get_current_user)
 ):
@@ -130,7 +140,8 @@ async def upload_resume(
             jd_text,
             template_mode,
             user,
-            resume_threshold
+            resume_threshold,
+            {"top_k": cascade_top_k, "min_score": cascade_min_score} if cascade else None
         )
         
         return {"job_id": job_id, "message": "Upload started in background", "total_files": len(resumes)}
@@ -140,13 +151,88 @@ async def upload_resume(
         return JSONResponse(status_code=500, content={"error": str(e)})
 
 @router.get("/leaderboard")
-async def leaderboard(user: str = Depends(get_current_user)):
+async def leaderboard(
+    min_years: Optional[float] = None,
+    min_degree_level: Optional[int] = None,
+    skill: Optional[str] = None,
+    user: str = Depends(get_current_user)
+):
+    """
+    Optional filters read the ingest-time feature store: total years, degree level (1-5), a listed skill.
+    """
+    if not user: raise HTTPException(status_code=401)
+    return get_leaderboard(recruiter_username=user, min_years=min_years, min_degree_level=min_degree_level, skill=skill)
+
+@router.get("/candidates/search")
+async def search_candidates(
+    q: str,
+    k: int = Query(10, ge=1, le=100),
+    user: str = Depends(get_current_user)
+):
+    """
+    Semantic search over the recruiter's pool: the query (a JD, a skill description) is embedded
+    and matched against stored resume vectors with the ANN index (app.vector_index).
+    """
+    if not user: raise HTTPException(status_code=401)
+    from app.embeddings import search_candidates as semantic_search
+    hits = await asyncio.to_thread(semantic_search, user, q, k)
+    summaries = get_candidate_summaries([cid for cid, _ in hits])
+    # Deleted candidates may still be in the index until the next rebuild
+    results = [{**summaries[cid], "similarity": round(score, 4)} for cid, score in hits if cid in summaries]
+    return {"query": q, "results": results}
+
+@router.get("/candidates/fulltext")
+async def fulltext_search(
+    q: str,
+    limit: int = Query(20, ge=1, le=100),
+    user: str = Depends(get_current_user)
+):
+    """
+    Keyword search over the recruiter's resumes through the database full-text index
+    (SQLite FTS5 / Postgres tsvector), best matches first with a highlighted snippet.
+    """
+    if not user: raise HTTPException(status_code=401)
+    from app.fulltext import search_fulltext
+    results = await asyncio.to_thread(search_fulltext, q, user, limit)
+    return {"query": q, "results": results}
+
+@router.get("/candidates/skills/facets")
+async def skill_facet_filter(
+    has: List[str] = Query([]),
+    lacks: List[str] = Query([]),
+    facet_limit: int = Query(30, ge=1, le=200),
+    user: str = Depends(get_current_user)
+):
+    """
+    Candidates with every `has` skill and none of the `lacks` skills (repeatable params, aliases
+    like "JS" / "k8s" accepted), plus per-skill counts over the matching set.
+    """
+    if not user: raise HTTPException(status_code=401)
+    return skill_facets(user, has=has, lacks=lacks, facet_limit=facet_limit)
+
+@router.post("/candidates/rescore")
+async def rescore(req: RescoreRequest, user: str = Depends(get_current_user)):
+    """
+    Re-applies the current template weights/thresholds to stored Likert scores (no LLM calls).
+    """
     if not user: raise HTTPException(status_code=401)
-    return get_leaderboard(recruiter_username=user)
+    from app.rescore import rescore_candidates
+    from app.role_templates import template_exists
+    template_key = req.template_key.lower() if req.template_key else None
+    if template_key and not template_exists(template_key, user):
+        raise HTTPException(status_code=404, detail=f"Unknown template '{template_key}'")
+    return rescore_candidates(
+        user,
+        upload_job_id=req.job_id,
+        template_key=template_key,
+        resume_threshold=req.resume_threshold
+    )
 
 @router.delete("/candidates")
 async def reset_db():
     clear_db()
+    from app.embeddings import reset_embeddings
+    reset_embeddings()
     return {"message": "Database cleared."}
 
 async def background_rejection_flow(email: str, name: str, resume_text: str):
@@ -183,7 +269,7 @@ async def invite_candidate(cid: str, action: str = None, background_tasks: Backg
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
-    email = extract_email(candidate['resume_text'])
+    email = candidate_features(candidate)["email"]
     if not email:
         raise HTTPException(status_code=400, detail="No email found in resume")
         
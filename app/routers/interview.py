@@ -5,7 +5,7 @@ from app.schemas import StartInterviewRequest, InterviewAnswerRequest, Interview
 from app.db import get_candidate, get_active_session_by_candidate, flag_candidate, update_candidate_status
 from app.interview_manager import interview_manager
 from app.tts import TTSManager
-from app.resume_parser import extract_email
+from app.resume_features import candidate_features
 
 router = APIRouter()
 tts_manager = TTSManager()
@@ -202,7 +202,7 @@ async def get_result(request: InterviewResultRequest, background_tasks: Backgrou
         if session and session.candidate_id and session.candidate_id != "unknown":
             candidate = get_candidate(session.candidate_id)
             if candidate:
-                 email = extract_email(candidate['resume_text'])
+                 email = candidate_features(candidate)["email"]
                  name = candidate['name']
                  
                  # Ensure we don't double send if result called multiple times (Status check needed?)
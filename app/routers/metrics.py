@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.routers.auth import get_current_user
+from app.llm_metrics import llm_metrics
+from app.llm_pool import get_pool
+from app.single_flight import single_flight
+from app.encoders import get_registry
+from app.vector_index import vector_index
+
+router = APIRouter()
+
+@router.get("/llm/metrics")
+async def get_llm_metrics(user: str = Depends(get_current_user)):
+    """
+    Process-local LLM latency and token totals per route, plus endpoint pool health.
+    """
+    if not user: raise HTTPException(status_code=401)
+    return {
+        "routes": llm_metrics.snapshot(),
+        "endpoints": get_pool().status(),
+        "single_flight": single_flight.stats(),
+        "encoder": get_registry().status(),
+        "vector_index": vector_index.stats()
+    }
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.routers.auth import get_current_user
+from app.db import list_role_templates_db, upsert_role_template
+from app.likert_scorer import LIKERT_FIELDS
+from app.role_templates import BUILTIN_TEMPLATE_KEYS, load_template
+from app.schemas import RoleTemplateUpdate
+
+router = APIRouter()
+
+@router.get("/templates")
+async def list_templates(user: str = Depends(get_current_user)):
+    """
+    Effective role templates for the recruiter: built-ins (with any stored edits) plus custom keys.
+    """
+    if not user: raise HTTPException(status_code=401)
+    keys = list(BUILTIN_TEMPLATE_KEYS) + sorted({t["key"] for t in list_role_templates_db(user)} - set(BUILTIN_TEMPLATE_KEYS))
+    templates = []
+    for key in keys:
+        template, thresholds = load_template(key, user)
+        templates.append({"key": key, "parameters": template["parameters"], "thresholds": thresholds})
+    return templates
+
+@router.put("/templates/{key}")
+async def update_template(key: str, req: RoleTemplateUpdate, user: str = Depends(get_current_user)):
+    """
+    Create or edit the recruiter's copy of a template. Use POST /candidates/rescore to apply it to stored candidates.
+    """
+    if not user: raise HTTPException(status_code=401)
+
+    unknown = set(req.parameters) - set(LIKERT_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown parameters: {sorted(unknown)}")
+    weights = {f: float(req.parameters.get(f, 0.0)) for f in LIKERT_FIELDS}
+    if any(w < 0 for w in weights.values()) or abs(sum(weights.values()) - 1.0) > 0.01:
+        raise HTTPException(status_code=400, detail="Weights must be non-negative and sum to 1.")
+
+    thresholds = {name: float(req.thresholds.get(name, 0)) for name in ("shortlist", "interview")}
+    if not all(0 <= v <= 100 for v in thresholds.values()) or thresholds["interview"] > thresholds["shortlist"]:
+        raise HTTPException(status_code=400, detail="Thresholds must be 0-100 with interview <= shortlist.")
+
+    saved = upsert_role_template(key.lower(), weights, thresholds, recruiter_username=user)
+    return {"key": saved["key"], "parameters": saved["parameters"], "thresholds": saved["thresholds"]}
@@ -30,6 +30,15 @@ class StartInterviewRequest(BaseModel):
     match_score: Optional[float] = None
     candidate_id: Optional[str] = None
 
+class RoleTemplateUpdate(BaseModel):
+    parameters: dict = Field(description="Likert field -> weight (education, experience, skills, projects, certifications), summing to 1")
+    thresholds: dict = Field(description='{"shortlist": 0-100, "interview": 0-100}')
+
+class RescoreRequest(BaseModel):
+    job_id: Optional[str] = None # Limit to one upload
+    template_key: Optional[str] = None # Apply this template to the whole pool
+    resume_threshold: Optional[float] = None # Defaults to the threshold each candidate was uploaded with
+
 class InterviewAnswerRequest(BaseModel):
     session_id: str
     answer: str
@@ -67,6 +76,7 @@ class InterviewSession(BaseModel):
     question_scores: List[QuestionScore] = []
     current_question: Optional[str] = None
     is_active: bool = True
+    llm_usage: dict = {}
     
     # Metadata
     candidate_id: Optional[str] = None
@@ -0,0 +1,191 @@
+"""
+Single-flight for idempotent LLM calls (role deduction, JD skill extraction).
+
+Concurrent calls with the same key (a hash of the route and the rendered prompt) share one
+execution:
+  - within a process, followers await the leader's future (async) or wait on its event (sync);
+  - across workers, the leader holds the Redis lock `llm:sf:lock:<key>` and publishes its result
+    to `llm:sf:result:<key>` with a short TTL (so a retry right after also reuses it); other
+    workers poll for that result while the lock is held, and run the call themselves if the
+    leader gives up without one, or at once if Redis stops answering.
+Without Redis only the in-process layer applies. Only successful, JSON-serializable results
+are shared through Redis; a leader's exception is re-raised to its in-process followers.
+
+Env:
+    LLM_SINGLE_FLIGHT_TTL   Seconds a result stays in Redis (default 60, 0 = in-process only).
+"""
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from loguru import logger
+
+LOCK_TTL_SECONDS = 120
+POLL_INTERVAL_SECONDS = 0.05
+KEY_PREFIX = "llm:sf"
+
+
+def prompt_key(route: str, prompt, inputs: dict) -> str:
+    """Key for a call: route plus the prompt exactly as it would be sent."""
+    rendered = prompt.format(**inputs)
+    return hashlib.sha256(f"{route}\n{rendered}".encode("utf-8")).hexdigest()
+
+
+def _default_store():
+    try:
+        from app.core.redis import redis_client
+        return redis_client
+    except Exception as e:
+        logger.warning(f"⚠️ Single-flight: Redis unavailable ({e}), in-process only.")
+        return None
+
+
+class SingleFlight:
+    def __init__(self, store=None, result_ttl: Optional[int] = None):
+        self._store = store
+        self._store_resolved = store is not None
+        self.result_ttl = int(os.getenv("LLM_SINGLE_FLIGHT_TTL", "60")) if result_ttl is None else result_ttl
+        self._lock = threading.Lock()
+        self._async_calls: Dict[str, asyncio.Future] = {}
+        self._sync_calls: Dict[str, dict] = {}
+        self._stats = {"executed": 0, "coalesced": 0, "shared_across_workers": 0}
+
+    @property
+    def store(self):
+        if not self._store_resolved:
+            self._store = _default_store()
+            self._store_resolved = True
+        if self.result_ttl and self._store is not None and getattr(self._store, "client", None):
+            return self._store
+        return None
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    # --- Async ---
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            future = self._async_calls.get(key)
+            leader = future is None or future.get_loop() is not loop
+            if leader:
+                future = loop.create_future()
+                self._async_calls[key] = future
+        if not leader:
+            self._count("coalesced")
+            return await asyncio.shield(future)
+
+        try:
+            result = await self._shared_async(key, fn)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody was waiting
+            raise
+        finally:
+            with self._lock:
+                self._async_calls.pop(key, None)
+
+    async def _shared_async(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        store = self.store
+        if not store:
+            self._count("executed")
+            return await fn()
+
+        # The store is the blocking Redis client: every round trip runs off the event loop
+        result_key, lock_key, token = f"{KEY_PREFIX}:result:{key}", f"{KEY_PREFIX}:lock:{key}", uuid.uuid4().hex
+        deadline = time.monotonic() + LOCK_TTL_SECONDS
+        while True:
+            cached = await asyncio.to_thread(store.get_json, result_key)
+            if cached is not None:
+                self._count("shared_across_workers")
+                return cached["value"]
+            locked = await asyncio.to_thread(store.acquire_lock, lock_key, token, LOCK_TTL_SECONDS)
+            if locked is None:
+                self._count("executed")
+                return await fn()  # Redis unreachable: in-process only
+            if locked:
+                break
+            if time.monotonic() > deadline:
+                break  # leader stuck: run it ourselves
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+        try:
+            self._count("executed")
+            value = await fn()
+            await asyncio.to_thread(store.set_json, result_key, {"value": value}, self.result_ttl)
+            return value
+        finally:
+            await asyncio.to_thread(store.release_lock, lock_key, token)
+
+    # --- Sync ---
+
+    def do_sync(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._sync_calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"done": threading.Event(), "value": None, "error": None}
+                self._sync_calls[key] = call
+        if not leader:
+            self._count("coalesced")
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["value"]
+
+        try:
+            call["value"] = self._shared_sync(key, fn)
+            return call["value"]
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                self._sync_calls.pop(key, None)
+            call["done"].set()
+
+    def _shared_sync(self, key: str, fn: Callable[[], Any]) -> Any:
+        store = self.store
+        if not store:
+            self._count("executed")
+            return fn()
+
+        result_key, lock_key, token = f"{KEY_PREFIX}:result:{key}", f"{KEY_PREFIX}:lock:{key}", uuid.uuid4().hex
+        deadline = time.monotonic() + LOCK_TTL_SECONDS
+        while True:
+            cached = store.get_json(result_key)
+            if cached is not None:
+                self._count("shared_across_workers")
+                return cached["value"]
+            locked = store.acquire_lock(lock_key, token, LOCK_TTL_SECONDS)
+            if locked is None:
+                self._count("executed")
+                return fn()  # Redis unreachable: in-process only
+            if locked:
+                break
+            if time.monotonic() > deadline:
+                break
+            time.sleep(POLL_INTERVAL_SECONDS)
+
+        try:
+            self._count("executed")
+            value = fn()
+            store.set_json(result_key, {"value": value}, self.result_ttl)
+            return value
+        finally:
+            store.release_lock(lock_key, token)
+
+
+single_flight = SingleFlight()
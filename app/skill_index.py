@@ -0,0 +1,52 @@
+"""
+Canonical skill names for the inverted skill index (table candidate_skills).
+
+Skills come from free text (the resume's Skills section, LLM evidence, JD extraction), so
+the same technology shows up as "JS", "Javascript" and "JavaScript". Every skill written to
+or queried from the index goes through `canonical_skill`: lowercase, collapsed whitespace,
+trailing punctuation stripped, then the alias map below.
+"""
+from typing import Iterable, List
+
+from app.skill_verifier import normalize_skill
+
+# alias -> canonical (canonical names are lowercase)
+SKILL_ALIASES = {
+    "js": "javascript", "java script": "javascript", "ecmascript": "javascript",
+    "ts": "typescript",
+    "node": "node.js", "nodejs": "node.js", "node js": "node.js",
+    "react.js": "react", "reactjs": "react", "react js": "react",
+    "vue.js": "vue", "vuejs": "vue",
+    "angular.js": "angularjs",
+    "next.js": "nextjs", "next": "nextjs",
+    "golang": "go",
+    "py": "python", "python3": "python",
+    "k8s": "kubernetes",
+    "postgres": "postgresql", "psql": "postgresql",
+    "mongo": "mongodb",
+    "ms sql": "sql server", "mssql": "sql server",
+    "amazon web services": "aws",
+    "google cloud": "gcp", "google cloud platform": "gcp",
+    "microsoft azure": "azure",
+    "c sharp": "c#", "csharp": "c#",
+    "cpp": "c++",
+    "dotnet": ".net", "dot net": ".net",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "sklearn": "scikit-learn", "scikit learn": "scikit-learn",
+    "tf": "tensorflow",
+    "cicd": "ci/cd", "ci cd": "ci/cd",
+    "rest": "rest api", "restful": "rest api", "restful api": "rest api", "rest apis": "rest api",
+}
+
+
+def canonical_skill(skill: str) -> str:
+    key = normalize_skill(skill or "").strip(" ,;:").rstrip(".-")
+    return SKILL_ALIASES.get(key, key)
+
+
+def canonical_skills(skills: Iterable[str]) -> List[str]:
+    """Canonical, de-duplicated (first occurrence order), empty names dropped."""
+    return [s for s in dict.fromkeys(canonical_skill(s) for s in skills) if s]
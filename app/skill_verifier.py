@@ -0,0 +1,91 @@
+"""
+Skill verification against resume text.
+
+One compiled alternation per skill set finds every skill in a single pass over
+the text, instead of one regex per skill. Boundaries are symbol-aware:
+
+    - a word boundary is only required on a side where the skill itself has a word
+      character, so "C++", "C#" and ".NET" match next to punctuation;
+    - a plain-word skill may not be followed by "+" or "#", so "C" does not match "C++";
+    - internal whitespace matches any run of whitespace ("Spring  Boot").
+
+Skills nested inside longer ones ("Spring" in "Spring Boot") are credited when
+the longer skill is found.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+def normalize_skill(skill: str) -> str:
+    """Lowercase, whitespace collapsed: the form skills are matched (and indexed) in."""
+    return " ".join(skill.lower().split())
+
+
+def _skill_pattern(key: str) -> str:
+    body = r"\s+".join(re.escape(part) for part in key.split(" "))
+    left = r"(?<!\w)" if re.match(r"\w", key) else ""
+    right = r"(?![\w+#])" if re.search(r"\w$", key) else ""
+    return f"{left}{body}{right}"
+
+
+class SkillVerifier:
+    def __init__(self, skills: Iterable[str]):
+        self.keys: List[str] = list(dict.fromkeys(normalize_skill(s) for s in skills if s and s.strip()))
+        if not self.keys:
+            self._regex = None
+            self._implied: Dict[str, Set[str]] = {}
+            return
+
+        # Longest first so the alternation prefers "spring boot" over "spring" at the same offset;
+        # the lookahead makes matches zero-width so overlapping skills are all reported.
+        ordered = sorted(self.keys, key=len, reverse=True)
+        self._regex = re.compile("(?=(" + "|".join(_skill_pattern(k) for k in ordered) + "))")
+
+        self._implied = {}
+        for key in self.keys:
+            nested = {other for other in self.keys if other != key and re.search(_skill_pattern(other), key)}
+            if nested:
+                self._implied[key] = nested
+
+    def found(self, text: str) -> Set[str]:
+        """Normalized keys of every skill present in `text`."""
+        if not self._regex or not text:
+            return set()
+        hits = {normalize_skill(m.group(1)) for m in self._regex.finditer(text.lower())}
+        for key in list(hits):
+            hits |= self._implied.get(key, set())
+        return hits
+
+    def found_many(self, texts: Iterable[str]) -> List[Set[str]]:
+        return [self.found(t) for t in texts]
+
+
+@lru_cache(maxsize=256)
+def _cached_verifier(keys: Tuple[str, ...]) -> SkillVerifier:
+    return SkillVerifier(keys)
+
+
+def get_verifier(skills: Iterable[str]) -> SkillVerifier:
+    """Verifier for a skill set, compiled once and reused across resumes/requests."""
+    return _cached_verifier(tuple(sorted({normalize_skill(s) for s in skills if s and s.strip()})))
+
+
+def verify_skills(skills: List[str], text: str) -> Tuple[List[str], List[str]]:
+    """Split `skills` (original casing and order kept) into (present, absent) in `text`."""
+    hits = get_verifier(skills).found(text)
+    present = [s for s in skills if normalize_skill(s) in hits]
+    absent = [s for s in skills if normalize_skill(s) not in hits]
+    return present, absent
+
+
+def verify_skills_batch(skills: List[str], texts: List[str]) -> List[Tuple[List[str], List[str]]]:
+    """verify_skills for many resumes against the same skill set."""
+    verifier = get_verifier(skills)
+    results = []
+    for hits in verifier.found_many(texts):
+        results.append((
+            [s for s in skills if normalize_skill(s) in hits],
+            [s for s in skills if normalize_skill(s) not in hits],
+        ))
+    return results
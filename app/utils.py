@@ -1,4 +1,5 @@
 import re
+from typing import Iterator
 
 def clean_text(text: str) -> str:
     """
@@ -8,15 +9,33 @@ def clean_text(text: str) -> str:
         return ""
     return re.sub(r"\s+", " ", text).strip()
 
-def chunk_text(text: str, size: int = 300, overlap: int = 50) -> list:
+def chunk_text(text: str, max_tokens: int = 200, overlap_tokens: int = 30) -> Iterator[str]:
     """
-    Chunk text into smaller segments.
+    Yield chunks of at most ~max_tokens: the text is cut at resume section headings first
+    (Experience, Education, ...), then sections over the budget are split into word windows
+    that share ~overlap_tokens with the previous one. Token counts use the same estimate as the
+    prompt minimizer (tiktoken when installed).
     """
     if not text:
-        return []
-    chunks, start = [], 0
-    while start < len(text):
-        end = start + size
-        chunks.append(text[start:end])
-        start = end - overlap
-    return chunks
+        return
+    # Avoid circular imports
+    from app.likert_scorer import section_starts
+    from app.resume_minimizer import estimate_tokens
+
+    cuts = sorted({0, *section_starts(text)}) + [len(text)]
+    for start, end in zip(cuts, cuts[1:]):
+        section = text[start:end].strip()
+        if not section:
+            continue
+        tokens = estimate_tokens(section)
+        if tokens <= max_tokens:
+            yield section
+            continue
+        words = section.split()
+        # This section's own words-per-token ratio turns the token budget into a word count
+        size = max(1, len(words) * max_tokens // tokens)
+        step = max(1, size - len(words) * overlap_tokens // tokens)
+        for i in range(0, len(words), step):
+            yield " ".join(words[i:i + size])
+            if i + size >= len(words):
+                break
@@ -0,0 +1,297 @@
+"""
+Nearest-neighbour index over stored resume embeddings, partitioned per recruiter.
+
+Backends:
+  - faiss-cpu (optional): exact flat search while a partition is small, rebuilt as HNSW
+    (inner product) once it reaches VECTOR_INDEX_HNSW_MIN vectors;
+  - NumPy when faiss isn't installed: brute-force inner product in row chunks.
+Vectors are L2-normalized, so inner product == cosine similarity. A partition is built lazily
+from the persistent embedding store (app.embedding_store) the first time it is searched and
+then grown with `add`; each partition has its own lock. Partition None spans all recruiters.
+
+Quantization (VECTOR_INDEX_QUANTIZATION) sets what each worker keeps in RAM per vector:
+    none     float32                        4 bytes / dim
+    float16  half precision                 2 bytes / dim
+    int8     scalar-quantized + row scale   1 byte / dim (default)
+With faiss, int8 codes use a per-dimension range instead of a row scale: the min/max of the
+vectors indexed so far, widened (and the partition re-encoded) when a batch falls outside it.
+Quantized partitions fetch VECTOR_INDEX_RESCORE x k candidates and rescore them exactly against
+the float16 rows of the embedding store, which are memory-mapped and so shared by all workers.
+scripts/benchmark_vector_index.py reports the recall of each mode against exact search.
+
+Env:
+    VECTOR_INDEX_QUANTIZATION   none | float16 | int8 (default int8)
+    VECTOR_INDEX_RESCORE        Candidates fetched per result before exact rescoring (default 4)
+    VECTOR_INDEX_HNSW_MIN       Partition size at which faiss switches from flat to HNSW (default 20000)
+    VECTOR_INDEX_HNSW_M         HNSW neighbours per node (default 32)
+"""
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.embedding_store import get_store
+
+# Optional ANN backend
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+BUILD_CHUNK_ROWS = 8192
+SEARCH_CHUNK_ROWS = 8192  # quantized rows upcast to float32 at a time
+QUANTIZATIONS = ("none", "float16", "int8")
+_BYTES_PER_DIM = {"none": 4, "float16": 2, "int8": 1}
+RANGE_HEADROOM = 0.1  # faiss int8: fraction of the range added on each side when it has to grow
+
+
+def hnsw_min() -> int:
+    return int(os.getenv("VECTOR_INDEX_HNSW_MIN", "20000"))
+
+
+def quantization() -> str:
+    mode = os.getenv("VECTOR_INDEX_QUANTIZATION", "int8").strip().lower()
+    return mode if mode in QUANTIZATIONS else "int8"
+
+
+def rescore_factor() -> int:
+    return max(1, int(os.getenv("VECTOR_INDEX_RESCORE", "4")))
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row scalar quantization: (int8 codes, float32 scale) with v ~= codes * scale."""
+    scale = np.abs(vectors).max(axis=1) / 127.0
+    scale[scale == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scale[:, None]), -127, 127).astype(np.int8)
+    return codes, scale.astype(np.float32)
+
+
+class _Partition:
+    def __init__(self, dim: int, store=None, mode: Optional[str] = None):
+        self.dim = dim
+        self.mode = mode or quantization()
+        self.store = store  # embedding store holding the exact rows, for rescoring
+        self.lock = threading.RLock()
+        self.ids: List[str] = []
+        self.store_rows = 0  # embedding-store rows already considered
+        self.generation = store.generation() if store is not None else ""  # store epoch it was built from
+        self._positions: Dict[str, int] = {}
+        self.kind = "flat"
+        self._range: Optional[Tuple[np.ndarray, np.ndarray]] = None  # faiss int8: per-dim (min, max) encoded so far
+        self._index = self._faiss_index("flat") if FAISS_AVAILABLE else None
+        self._chunks: List[Tuple[np.ndarray, np.ndarray]] = []  # NumPy backend: (rows, scales) not yet merged
+        self._matrix = np.zeros((0, dim), dtype=np.int8 if self.mode == "int8" else np.float16 if self.mode == "float16" else np.float32)
+        self._scale = np.zeros(0, dtype=np.float32)
+
+    def _faiss_index(self, kind: str):
+        """Empty faiss index of `kind` (flat | hnsw); int8 ones are trained on the current range."""
+        qtype = faiss.ScalarQuantizer.QT_8bit if self.mode == "int8" else faiss.ScalarQuantizer.QT_fp16
+        if kind == "flat":
+            if self.mode == "none":
+                return faiss.IndexFlatIP(self.dim)
+            index = faiss.IndexScalarQuantizer(self.dim, qtype, faiss.METRIC_INNER_PRODUCT)
+        else:
+            m = int(os.getenv("VECTOR_INDEX_HNSW_M", "32"))
+            if self.mode == "none":
+                index = faiss.IndexHNSWFlat(self.dim, m, faiss.METRIC_INNER_PRODUCT)
+            else:
+                index = faiss.IndexHNSWSQ(self.dim, qtype, m, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efSearch = 64
+        if self.mode == "int8" and self._range is not None:
+            index.train(np.vstack(self._range).astype(np.float32))  # min/max rows: the quantizer's range
+        return index
+
+    def _rebuild(self, kind: str):
+        """Re-encode the indexed vectors into a fresh `kind` index (after a range change or to switch to HNSW)."""
+        vectors = self._index.reconstruct_n(0, self._index.ntotal) if self._index.ntotal else None
+        self._index, self.kind = self._faiss_index(kind), kind
+        if vectors is not None:
+            self._index.add(vectors)
+
+    def _widen_range(self, rows: np.ndarray) -> bool:
+        """
+        Grow the int8 range to cover `rows`; True if it changed. A range learned once from the first
+        batch would clip every later vector that reaches further along some dimension.
+        """
+        low, high = rows.min(axis=0), rows.max(axis=0)
+        if self._range is not None:
+            if (low >= self._range[0]).all() and (high <= self._range[1]).all():
+                return False
+            low, high = np.minimum(low, self._range[0]), np.maximum(high, self._range[1])
+            # Headroom, so a growing partition re-encodes a few times rather than on most adds
+            pad = RANGE_HEADROOM * (high - low)
+            low, high = np.maximum(low - pad, -1.0), np.minimum(high + pad, 1.0)
+        self._range = (low, high)
+        return True
+
+    def add(self, ids: List[str], vectors: np.ndarray) -> int:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        with self.lock:
+            # Resume content doesn't change after ingest: an id already indexed is skipped
+            fresh = [i for i, cid in enumerate(ids) if cid not in self._positions]
+            if not fresh:
+                return 0
+            for i in fresh:
+                self._positions[ids[i]] = len(self.ids)
+                self.ids.append(ids[i])
+            rows = vectors[fresh]
+            if self._index is not None:
+                if self.mode == "int8" and self._widen_range(rows):
+                    self._rebuild(self.kind)
+                self._index.add(rows)
+                if self.kind == "flat" and len(self.ids) >= hnsw_min():
+                    self._rebuild("hnsw")
+            elif self.mode == "int8":
+                self._chunks.append(quantize_int8(rows))
+            else:
+                self._chunks.append((rows.astype(self._matrix.dtype), np.ones(len(rows), dtype=np.float32)))
+            return len(fresh)
+
+    def _scan(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """NumPy backend: (rows, scores) of the top k per query, scanned in float32 row chunks."""
+        if self._chunks:
+            self._matrix = np.vstack([self._matrix, *(rows for rows, _ in self._chunks)])
+            self._scale = np.concatenate([self._scale, *(scale for _, scale in self._chunks)])
+            self._chunks = []
+        sims = np.empty((len(queries), len(self._matrix)), dtype=np.float32)
+        for start in range(0, len(self._matrix), SEARCH_CHUNK_ROWS):
+            block = self._matrix[start:start + SEARCH_CHUNK_ROWS].astype(np.float32, copy=False)
+            sims[:, start:start + len(block)] = queries @ block.T
+        if self.mode == "int8":
+            sims *= self._scale
+        rows = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        return rows, np.take_along_axis(sims, rows, axis=1)
+
+    def _rescore(self, queries: np.ndarray, rows: np.ndarray, scores: np.ndarray) -> np.ndarray:
+        """Exact scores for the shortlisted rows, from the embedding store (kept if not found)."""
+        store_rows = self.store.rows_for([self.ids[r] if r >= 0 else "" for r in rows.ravel()])
+        found = [i for i, r in enumerate(store_rows) if r is not None]
+        if not found:
+            return scores
+        _, _, matrix = self.store.snapshot()
+        order = np.argsort([store_rows[i] for i in found])  # memmap reads in file order
+        exact = np.empty(len(found), dtype=np.float32)
+        picked = [found[i] for i in order]
+        vectors = np.asarray(matrix[[store_rows[i] for i in picked]], dtype=np.float32)
+        query_rows = np.array(picked) // rows.shape[1]
+        exact[order] = np.einsum("ij,ij->i", vectors, queries[query_rows])
+        scores = scores.copy().ravel()
+        scores[found] = exact
+        return scores.reshape(rows.shape)
+
+    def search(self, queries: np.ndarray, k: int) -> List[List[Tuple[str, float]]]:
+        queries = np.ascontiguousarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        with self.lock:
+            n = len(self.ids)
+            if not n or not len(queries):
+                return [[] for _ in range(len(queries))]
+            k = min(k, n)
+            rescore = self.mode != "none" and self.store is not None
+            fetch = min(k * rescore_factor(), n) if rescore else k
+            if self._index is not None:
+                scores, rows = self._index.search(queries, fetch)
+            else:
+                rows, scores = self._scan(queries, fetch)
+            if rescore:
+                scores = self._rescore(queries, rows, scores)
+            scores = np.where(rows >= 0, scores, -np.inf)
+            order = np.argsort(-scores, axis=1)[:, :k]
+            rows, scores = np.take_along_axis(rows, order, axis=1), np.take_along_axis(scores, order, axis=1)
+            ids = self.ids
+        return [
+            [(ids[r], float(s)) for r, s in zip(row_ids, row_scores) if r >= 0]
+            for row_ids, row_scores in zip(rows, scores)
+        ]
+
+    def memory_bytes(self) -> int:
+        """RAM per partition for the vectors themselves (NumPy backend; faiss codes are the same size)."""
+        return len(self.ids) * (self.dim * _BYTES_PER_DIM[self.mode] + (4 if self.mode == "int8" else 0))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class VectorIndexService:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._partitions: Dict[Tuple[str, Optional[str]], _Partition] = {}
+
+    def partition(self, recruiter_username: Optional[str], encoder) -> _Partition:
+        key = (encoder.name, recruiter_username)
+        generation = get_store(encoder).generation()
+        with self._lock:
+            partition = self._partitions.get(key)
+            # Rebuilt after any worker cleared the store: its row offsets no longer apply
+            build = partition is None or partition.generation != generation
+            if build:
+                # Held until built, so concurrent searches wait instead of seeing an empty index
+                partition = _Partition(encoder.dim, store=get_store(encoder))
+                partition.lock.acquire()
+                self._partitions[key] = partition
+        if build:
+            try:
+                self._load_new_rows(partition, recruiter_username, encoder)
+            except Exception:
+                with self._lock:
+                    self._partitions.pop(key, None)
+                raise
+            finally:
+                partition.lock.release()
+        else:
+            # Rows other workers appended since
+            with partition.lock:
+                self._load_new_rows(partition, recruiter_username, encoder)
+        return partition
+
+    def _load_new_rows(self, partition: _Partition, recruiter_username: Optional[str], encoder):
+        """Add the embedding-store rows past `partition.store_rows` that belong to this recruiter."""
+        ids, _, matrix = get_store(encoder).snapshot()
+        if len(ids) <= partition.store_rows:
+            return
+        # Avoid circular imports
+        from app.db import get_candidate_ids
+
+        new_ids = ids[partition.store_rows:]
+        wanted = set(get_candidate_ids(recruiter_username, among=list(set(new_ids))))
+        rows = [partition.store_rows + i for i, cid in enumerate(new_ids) if cid in wanted]
+        for start in range(0, len(rows), BUILD_CHUNK_ROWS):
+            chunk = rows[start:start + BUILD_CHUNK_ROWS]
+            partition.add([ids[r] for r in chunk], np.asarray(matrix[chunk], dtype=np.float32))
+        partition.store_rows = len(ids)
+
+    def add(self, recruiter_username: Optional[str], ids: List[str], vectors: np.ndarray, encoder):
+        """
+        Add to the recruiter's and the all-recruiters partition, if those are already loaded
+        (the same rows are skipped when later read back from the store).
+        """
+        with self._lock:
+            targets = [self._partitions.get((encoder.name, key)) for key in {recruiter_username, None}]
+        for partition in targets:
+            if partition is not None:
+                partition.add(ids, vectors)
+
+    def search(self, recruiter_username: Optional[str], queries: np.ndarray, encoder, k: int = 5) -> List[List[Tuple[str, float]]]:
+        """Top-k (candidate_id, cosine) per query row, for a whole batch at once."""
+        return self.partition(recruiter_username, encoder).search(queries, k)
+
+    def reset(self):
+        with self._lock:
+            self._partitions.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "faiss" if FAISS_AVAILABLE else "numpy",
+                "partitions": [
+                    {
+                        "encoder": enc, "recruiter": rec, "vectors": len(p), "kind": p.kind if FAISS_AVAILABLE else "brute-force",
+                        "quantization": p.mode, "vector_bytes": p.memory_bytes()
+                    }
+                    for (enc, rec), p in self._partitions.items()
+                ],
+            }
+
+
+vector_index = VectorIndexService()
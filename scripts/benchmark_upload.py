@@ -0,0 +1,69 @@
+"""
+End-to-end benchmark of process_upload_job against a throwaway SQLite database.
+
+Pair it with the LLM cassette (app.llm_cassette) to get reproducible baselines:
+
+    # 1. Record once against a real (or offline) endpoint
+    LLM_CASSETTE_MODE=record LLM_CASSETTE_PATH=data/bench.jsonl python scripts/benchmark_upload.py jd.txt resumes/
+    # 2. Replay at recorded latency (or LLM_CASSETTE_SPEED=10 for 10x faster, 0 for none)
+    LLM_CASSETTE_MODE=replay LLM_CASSETTE_PATH=data/bench.jsonl python scripts/benchmark_upload.py jd.txt resumes/
+
+Usage:
+    python scripts/benchmark_upload.py <jd.txt> <resume_dir> [template_mode] [cascade_top_k]
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Must be set before app.database builds its engine
+_workdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_workdir}/bench.db"
+os.environ["EMBEDDING_STORE_DIR"] = os.path.join(_workdir, "embeddings")
+
+from app.db import init_db, get_db_session
+from app.jobs import process_upload_job
+from app.llm_cassette import get_cassette
+from app.models.models import UploadJob
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+
+    jd_text = open(sys.argv[1], encoding="utf-8").read()
+    resume_dir = sys.argv[2]
+    template_mode = sys.argv[3] if len(sys.argv) > 3 else "auto"
+    cascade = {"top_k": int(sys.argv[4]), "min_score": 0.0} if len(sys.argv) > 4 else None
+    filenames = sorted(f for f in os.listdir(resume_dir) if f.lower().endswith((".pdf", ".docx", ".txt")))
+    files_data = [open(os.path.join(resume_dir, f), "rb").read() for f in filenames]
+
+    init_db()
+    job_id = str(uuid.uuid4())
+    session = get_db_session()
+    session.add(UploadJob(job_id=job_id, recruiter_username="benchmark", total_files=len(files_data), processed_count=0, status="queued"))
+    session.commit()
+    session.close()
+
+    start = time.perf_counter()
+    asyncio.run(process_upload_job(job_id, files_data, filenames, jd_text, template_mode, "benchmark", cascade=cascade))
+    elapsed = time.perf_counter() - start
+
+    session = get_db_session()
+    job = session.query(UploadJob).filter(UploadJob.job_id == job_id).first()
+    metrics = json.loads(job.metrics or "{}")
+    session.close()
+
+    cassette = get_cassette()
+    print(f"📊 {len(filenames)} resumes, status={job.status}, wall={elapsed:.2f}s")
+    if cassette:
+        print(f"📼 cassette mode={cassette.mode} hits={cassette.hits} misses={cassette.misses}")
+    print(json.dumps(metrics, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Recall / latency / memory of the vector index quantization modes against exact float32 search.
+
+Vectors are synthetic but clustered like resume embeddings (a few hundred "role" centroids plus
+noise), or encoded from a directory of .txt resumes with the active encoder. Each mode is
+searched with and without exact rescoring from the float16 embedding store.
+
+Usage:
+    python scripts/benchmark_vector_index.py [n_vectors] [dim] [k]
+    python scripts/benchmark_vector_index.py --texts <resume_dir> [k]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.embedding_store import EmbeddingStore
+from app.vector_index import QUANTIZATIONS, _Partition
+
+N_QUERIES = 200
+
+
+def synthetic(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((max(8, n // 200), dim)).astype(np.float32)
+    vectors = centroids[rng.integers(0, len(centroids), n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def from_texts(directory: str) -> np.ndarray:
+    from app.encoders import encode
+    texts = [open(os.path.join(directory, f), encoding="utf-8", errors="ignore").read()
+             for f in sorted(os.listdir(directory)) if f.endswith(".txt")]
+    return encode(texts)
+
+
+def main():
+    args = sys.argv[1:]
+    if args[:1] == ["--texts"]:
+        vectors, k = from_texts(args[1]), int(args[2]) if len(args) > 2 else 10
+    else:
+        n = int(args[0]) if args else 50000
+        dim = int(args[1]) if len(args) > 1 else 384
+        k = int(args[2]) if len(args) > 2 else 10
+        vectors = synthetic(n, dim)
+    n, dim = vectors.shape
+    k = min(k, n)
+    ids = [f"c{i}" for i in range(n)]
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.choice(n, min(N_QUERIES, n), replace=False)] + 0.3 * rng.standard_normal((min(N_QUERIES, n), dim)).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        store = EmbeddingStore(workdir, dim)
+        store.add(ids, ["-"] * n, vectors)
+
+        exact = _Partition(dim, mode="none")
+        exact.add(ids, vectors)
+        truth = [{cid for cid, _ in hits} for hits in exact.search(queries, k)]
+
+        print(f"{n} vectors x {dim}d, {len(queries)} queries, recall@{k} vs exact float32 "
+              f"(float64 would be {dim * 8} B/vector)\n")
+        print(f"{'mode':<9} {'rescore':<8} {'B/vector':>9} {'recall':>8} {'ms/query':>9}")
+        for mode in QUANTIZATIONS:
+            for rescore in ((False,) if mode == "none" else (False, True)):
+                partition = _Partition(dim, store=store if rescore else None, mode=mode)
+                partition.add(ids, vectors)
+                partition.search(queries[:1], k)  # merge pending chunks outside the timing
+                start = time.perf_counter()
+                results = [partition.search(q[None, :], k)[0] for q in queries]
+                elapsed = (time.perf_counter() - start) * 1000 / len(queries)
+                recall = np.mean([len(t & {cid for cid, _ in hits}) / k for t, hits in zip(truth, results)])
+                print(f"{mode:<9} {str(rescore):<8} {partition.memory_bytes() / n:>9.0f} {recall:>8.4f} {elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Serves the offline LLM stand-in (app.llm_fake) as an OpenAI-compatible HTTP API,
+so several app workers / processes can share it during load tests.
+
+Usage:
+    FAKE_LLM_LATENCY=lognormal:800:0.4 FAKE_LLM_ERROR_RATE=0.02 python scripts/fake_llm_server.py [port]
+    OPENAI_API_BASE=http://127.0.0.1:8089/v1 OPENAI_API_KEY=offline uvicorn app.main:app
+"""
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.llm_fake import FakeLLMConfig, fake_chat_completion
+
+app = FastAPI(title="Offline LLM stand-in")
+config = FakeLLMConfig.from_env()
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    status, payload, delay = fake_chat_completion(await request.json(), config)
+    if delay:
+        await asyncio.sleep(delay)
+    return JSONResponse(status_code=status, content=payload)
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8089
+    print(f"🧪 Offline LLM listening on http://127.0.0.1:{port}/v1 (latency={config.latency}, errors={config.error_rate})")
+    uvicorn.run(app, host="127.0.0.1", port=port)
@@ -6,3 +6,16 @@ from app.main import app
 def client():
     with TestClient(app) as test_client:
         yield test_client
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """app.db functions against a throwaway SQLite database."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    import app.db
+    from app.database import Base
+    engine = create_engine(f"sqlite:///{tmp_path}/test.db", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(app.db, "get_db_session", sessionmaker(bind=engine))
+    yield engine
+    engine.dispose()
@@ -0,0 +1,75 @@
+import numpy as np
+from app.embedding_store import EmbeddingStore, content_hash, get_store
+from app.encoders import HashingEncoder
+
+def test_appends_are_visible_to_other_readers(tmp_path):
+    writer, reader = EmbeddingStore(str(tmp_path), 4), EmbeddingStore(str(tmp_path), 4)
+    writer.add(["a", "b"], ["h1", "h2"], np.eye(4)[:2])
+    assert len(reader) == 2
+
+    writer.add(["c"], ["h3"], np.eye(4)[2:3])
+    ids, hashes, matrix = reader.snapshot()
+    assert ids == ["a", "b", "c"] and hashes[-1] == "h3"
+    assert isinstance(matrix, np.memmap) and matrix.dtype == np.float16
+    assert reader.similarities(np.eye(4)[1]).tolist() == [0.0, 1.0, 0.0]
+
+def test_index_candidates_skips_unchanged_content(tmp_path, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_STORE_DIR", str(tmp_path))
+    from app.embeddings import index_candidates
+    encoder = HashingEncoder(64)
+
+    assert index_candidates(["c1", "c2"], ["python developer", "java developer"], encoder) == 2
+    assert index_candidates(["c1", "c2"], ["python developer", "java developer, updated"], encoder) == 1
+    store = get_store(encoder)
+    assert store.known() == {"c1": content_hash("python developer"), "c2": content_hash("java developer, updated")}
+    store.clear()
+    assert len(store) == 0
+
+def test_chunk_text_cuts_at_sections_with_overlap():
+    from app.utils import chunk_text
+    text = "Jane Doe, backend engineer. Experience " + " ".join(f"w{i}" for i in range(300)) + " Education BSc Physics 2016"
+    chunks = chunk_text(text, max_tokens=100, overlap_tokens=20)
+    assert not isinstance(chunks, list)  # generator
+    chunks = list(chunks)
+    assert chunks[0] == "Jane Doe, backend engineer." and chunks[-1] == "Education BSc Physics 2016"
+    windows = chunks[1:-1]
+    assert len(windows) > 1 and set(windows[0].split()) & set(windows[1].split())
+
+def test_chunk_pooling_scores_a_resume_on_its_best_section(tmp_path, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_STORE_DIR", str(tmp_path))
+    from app.embeddings import candidate_chunks, pool_similarities
+    query = np.array([1.0, 0.0])
+    chunks = [np.array([[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]]), np.zeros((0, 2))]
+    assert pool_similarities(query, chunks, "max").tolist() == [1.0, 0.0]
+    assert np.allclose(pool_similarities(query, chunks, "topk", k=2), [0.8, 0.0])
+
+    encoder = HashingEncoder(64)
+    texts = ["Summary. Experience Python Django", "Skills Java Spring"]
+    first = candidate_chunks(["c1", "c2"], texts, encoder)
+    blocks, _ = get_store(encoder, "chunks").blocks()
+    assert blocks["c1"][:2] == (0, len(first[0])) and blocks["c2"][:2] == (len(first[0]), len(first[0]) + len(first[1]))
+    again = candidate_chunks(["c1", "c2"], texts, encoder)  # read back, not re-encoded
+    assert len(get_store(encoder, "chunks")) == len(first[0]) + len(first[1])
+    assert np.allclose(again[0], first[0], atol=1e-3)
+
+def test_other_readers_start_over_after_a_clear(tmp_path):
+    a, b = EmbeddingStore(str(tmp_path), 4), EmbeddingStore(str(tmp_path), 4)
+    a.add(["a", "b", "c"], ["h"] * 3, np.eye(4)[:3])
+    generation = b.generation()
+    assert b.snapshot()[0] == ["a", "b", "c"]
+
+    a.clear()
+    a.add(["x"], ["h"], np.eye(4)[3:])
+    assert b.snapshot()[0] == ["x"] and b.generation() != generation
+    a.add(["y", "z", "w"], ["h"] * 3, np.eye(4)[:3])
+    ids, _, matrix = b.snapshot()
+    assert ids == ["x", "y", "z", "w"]
+    assert matrix[0].tolist() == [0, 0, 0, 1] and matrix[1].tolist() == [1, 0, 0, 0]
+
+def test_writer_appends_from_row_zero_after_another_process_cleared(tmp_path):
+    a, b = EmbeddingStore(str(tmp_path), 4), EmbeddingStore(str(tmp_path), 4)
+    a.add(["a"], ["h"], np.eye(4)[:1])
+    assert len(b) == 1
+    a.clear()
+    b.add(["x"], ["h"], np.eye(4)[1:2])
+    assert b.snapshot()[0] == ["x"] and a.snapshot()[0] == ["x"]
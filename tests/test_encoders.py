@@ -0,0 +1,48 @@
+import asyncio
+import numpy as np
+from app.encoders import HashingEncoder, EncoderRegistry, encode, encode_async
+from app.embeddings import calculate_similarity
+
+def test_hashing_encoder_ranks_related_text_higher():
+    vecs = HashingEncoder(512).encode([
+        "Python backend engineer, FastAPI, PostgreSQL, Docker",
+        "Backend developer with Python, Django and PostgreSQL",
+        "Registered nurse, patient care and ward management",
+    ])
+    assert vecs.shape == (3, 512) and vecs.dtype == np.float32
+    assert np.allclose(np.linalg.norm(vecs, axis=1), 1.0, atol=1e-5)
+    assert vecs[0] @ vecs[1] > vecs[0] @ vecs[2]
+
+def test_similarity_is_no_longer_zero():
+    assert calculate_similarity("Python developer Django", "Django Python developer") > 50
+    assert calculate_similarity("", "anything") == 0.0
+
+def test_batched_and_async_encoding_match(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_BATCH_SIZE", "2")
+    texts = [f"resume {i} python" for i in range(5)]
+    sync = encode(texts, HashingEncoder(64))
+    assert sync.shape == (5, 64)
+    assert np.allclose(asyncio.run(encode_async(texts, HashingEncoder(64))), sync)
+
+def test_registry_falls_back_when_model_cannot_load(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_MODEL_PATH", "/nonexistent/model")
+    registry = EncoderRegistry()
+    encoder = registry.wait_ready(timeout=60)
+    assert encoder.name.startswith("hashing")
+    assert registry.status()["state"] == "failed"
+
+def test_semantic_scores_encode_the_jd_once(monkeypatch):
+    import app.embeddings as embeddings
+    encoder = HashingEncoder(256)
+    calls = []
+    original = embeddings.encode
+    monkeypatch.setattr(embeddings, "encode", lambda texts, enc=None: calls.append(list(texts)) or original(texts, enc))
+    jd = "Backend engineer: Python, FastAPI, PostgreSQL"
+    resumes = ["Python FastAPI PostgreSQL engineer", "Pastry chef, French cuisine", ""]
+
+    scores = embeddings.semantic_scores(jd, resumes, encoder=encoder)
+    again = embeddings.semantic_scores(jd, resumes[:1], encoder=encoder)
+
+    assert scores.shape == (3,) and scores[0] > scores[1] and scores[2] == 0.0
+    assert again[0] == scores[0]
+    assert sum(jd in texts for texts in calls) == 1
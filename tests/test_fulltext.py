@@ -0,0 +1,50 @@
+from sqlalchemy import create_engine, text
+from app.database import Base
+import app.models.models  # noqa: F401 (registers the tables)
+from app.fulltext import _highlight, rebuild_fulltext, search_fulltext, setup_fulltext
+
+def _insert(engine, cid, recruiter, resume):
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO candidates (id, name, resume_text, recruiter_username) VALUES (:id, :id, :r, :u)"),
+                     {"id": cid, "r": resume, "u": recruiter})
+
+def test_fts5_ranks_filters_and_highlights(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/fts.db")
+    Base.metadata.create_all(bind=engine)
+    _insert(engine, "before", "alice", "Kubernetes operator written in Go")  # indexed by the backfill
+    assert setup_fulltext(engine)
+    _insert(engine, "k8s", "alice", "Platform engineer: Kubernetes, Kubernetes operators, Helm and Terraform")
+    _insert(engine, "py", "alice", "Python developer with Django")
+    _insert(engine, "other", "bob", "Kubernetes administrator")
+
+    results = search_fulltext("kubernetes", "alice", engine=engine)
+    assert [r["id"] for r in results] == ["k8s", "before"]
+    assert "<mark>Kubernetes</mark>" in results[0]["snippet"]
+    assert search_fulltext('python "django', "alice", engine=engine)[0]["id"] == "py"  # quotes can't break the query
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM candidates WHERE id = 'k8s'"))
+    assert [r["id"] for r in search_fulltext("kubernetes", "alice", engine=engine)] == ["before"]
+
+def test_snippets_escape_resume_html(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/fts.db")
+    Base.metadata.create_all(bind=engine)
+    assert setup_fulltext(engine)
+    _insert(engine, "x", "alice", 'Kubernetes <img src=x onerror="alert(1)"> & Helm')
+
+    snippet = search_fulltext("kubernetes", "alice", engine=engine)[0]["snippet"]
+    assert snippet.startswith("<mark>Kubernetes</mark>") and "<img" not in snippet and "&lt;img" in snippet
+    assert _highlight("<b>Go</b> & go", ["go"]) == "&lt;b&gt;<mark>Go</mark>&lt;/b&gt; &amp; <mark>go</mark>"
+
+def test_rebuild_after_rowids_are_renumbered(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/fts.db")
+    Base.metadata.create_all(bind=engine)
+    assert setup_fulltext(engine)
+    _insert(engine, "py", "alice", "Python developer")
+    _insert(engine, "k8s", "alice", "Kubernetes operator")
+    with engine.begin() as conn:  # what VACUUM may do to the implicit rowid of a TEXT-PK table
+        conn.execute(text("UPDATE candidates SET rowid = rowid + 100"))
+    assert search_fulltext("kubernetes", "alice", engine=engine) == []
+
+    assert rebuild_fulltext(engine)
+    assert [r["id"] for r in search_fulltext("kubernetes", "alice", engine=engine)] == ["k8s"]
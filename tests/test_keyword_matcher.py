@@ -0,0 +1,21 @@
+from app.keyword_matcher import STOPWORDS, KeywordMatcher
+
+JD = "Looking for a backend engineer with strong Python, Django and PostgreSQL experience. Docker is a plus."
+
+def test_vocabulary_drops_stopwords_and_short_words():
+    matcher = KeywordMatcher(JD)
+    assert matcher.vocabulary == ["backend", "django", "docker", "looking", "postgresql", "python"]
+    assert "experience" in STOPWORDS
+
+def test_batch_matches_equal_single_matches():
+    matcher = KeywordMatcher(JD)
+    resumes = ["Python and Django developer", "Docker, PostgreSQL, backend APIs in python", ""]
+    batch = matcher.match_many(resumes)
+
+    assert batch == [matcher.match(r) for r in resumes]
+    assert batch[0]["matched_skills"] == ["django", "python"]
+    assert batch[1]["missing_skills"] == ["django", "looking"]
+    assert batch[2]["keyword_score"] == 0.0
+
+def test_empty_jd_vocabulary():
+    assert KeywordMatcher("a to be").match("Python")["matched_skills"] == []
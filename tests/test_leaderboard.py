@@ -0,0 +1,11 @@
+from app.db import SCREENED_OUT_STATUS, add_candidate, get_leaderboard
+
+def _add(name, match_score, status, final_score=0.0):
+    return add_candidate(name=name, resume_text=name, jd="jd", match_score=match_score, matched_skills=[],
+                         missing_skills=[], status=status, recruiter_username="alice", final_score=final_score)
+
+def test_screened_out_candidates_rank_after_evaluated_ones(temp_db):
+    _add("screened", 85.0, SCREENED_OUT_STATUS)  # even rows stored before match_score=0.0
+    _add("evaluated-60", 60.0, "Rejected")
+    _add("evaluated-80", 80.0, "Shortlisted")
+    assert [c["name"] for c in get_leaderboard("alice")] == ["evaluated-80", "evaluated-60", "screened"]
@@ -0,0 +1,39 @@
+import numpy as np
+from app.likert_scorer import extract_features, score_batch, section_starts, weighted_scores
+from app.role_templates import get_role_template
+
+STRONG = (
+    "Jane Doe EDUCATION M.Tech Computer Science 2014 - 2016 EXPERIENCE Senior Engineer, Acme 2016 - 2024 "
+    "PROJECTS • Built a payments service • Developed a scheduler • Designed a CLI "
+    "CERTIFICATIONS AWS Certified Solutions Architect SKILLS Python, Docker, Kubernetes, AWS"
+)
+WEAK = "John. Looking for opportunities, contact me."
+
+def test_features_from_flattened_text():
+    degree, years, has_exp, projects, certs = extract_features(STRONG)
+    assert degree == 5
+    assert years == 8  # education dates are not counted as experience
+    assert has_exp == 1 and projects == 3 and certs == 5
+
+def test_batch_scores_and_weighting():
+    scores = score_batch([STRONG, WEAK], ["Python", "Docker", "Kubernetes", "AWS"])
+    assert scores.tolist() == [[5, 5, 5, 4, 5], [1, 1, 1, 1, 1]]
+
+    template, _ = get_role_template("senior")
+    weighted = weighted_scores(scores, template)
+    assert weighted[0] > 90
+    assert np.isclose(weighted[1], 20.0)
+
+def test_section_starts_finds_every_heading():
+    starts = section_starts(STRONG)
+    assert [STRONG[i:i + 5] for i in starts] == ["EDUCA", "EXPER", "PROJE", "CERTI", "SKILL"]
+    assert section_starts(STRONG, starts[2] + 1) == starts[3:]
+    assert section_starts(WEAK) == []
+
+def test_degree_is_read_from_education_not_job_titles():
+    assert score_batch(["EXPERIENCE Certified Scrum Master, ran sprints for 3 teams"], [])[0][0] == 1
+    assert score_batch(["EXPERIENCE Owned master data management for SAP"], [])[0][0] == 1
+    # A master's degree outside the education section doesn't count when there is one
+    text = "EDUCATION B.Tech Computer Science 2016 EXPERIENCE Mentored a master's thesis student"
+    assert extract_features(text)[0] == 4
+    assert extract_features("Jane Doe, Master of Science in Physics")[0] == 5
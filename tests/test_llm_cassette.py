@@ -0,0 +1,38 @@
+import httpx
+import pytest
+from app.llm_cassette import CassetteMiss, CassetteTransport, LLMCassette
+from app.llm_fake import FakeOpenAITransport
+from app.llm_metrics import llm_context
+
+URL = "offline://fake/v1/chat/completions"
+
+def _body(prompt: str) -> dict:
+    return {"model": "offline", "messages": [{"role": "user", "content": prompt}]}
+
+def test_record_then_replay_roundtrip(tmp_path):
+    path = str(tmp_path / "cassette.jsonl")
+    recorder = httpx.Client(transport=CassetteTransport(LLMCassette("record", path), FakeOpenAITransport()))
+    with llm_context(job_id="job-1"):
+        recorded = recorder.post(URL, json=_body("What is a mutex?")).json()
+
+    cassette = LLMCassette("replay", path, speed=0)
+    replayer = httpx.Client(transport=CassetteTransport(cassette))
+    replayed = replayer.post(URL, json=_body("What is a mutex?")).json()
+
+    assert replayed == recorded
+    assert cassette.hits == 1
+    with open(path) as f:
+        assert '"job_id": "job-1"' in f.read()
+
+def test_replay_miss_raises(tmp_path):
+    cassette = LLMCassette("replay", str(tmp_path / "missing.jsonl"))
+    client = httpx.Client(transport=CassetteTransport(cassette))
+    with pytest.raises(CassetteMiss):
+        client.post(URL, json=_body("never recorded"))
+    assert cassette.misses == 1
+
+def test_replay_speed_scales_recorded_latency():
+    cassette = LLMCassette("replay", "/nonexistent", speed=4)
+    assert cassette.replay_delay({"latency_ms": 2000}) == 0.5
+    cassette.speed = 0
+    assert cassette.replay_delay({"latency_ms": 2000}) == 0.0
@@ -0,0 +1,54 @@
+import json
+from app.interview_prompts import GRADING_PROMPT, MATCHING_PROMPT
+from app.llm_fake import FakeLLMConfig, fake_chat_completion, is_offline_base_url
+
+def _body(prompt: str, **extra) -> dict:
+    return {"model": "offline", "messages": [{"role": "user", "content": prompt}], **extra}
+
+def test_matching_prompt_returns_schema_json():
+    prompt = MATCHING_PROMPT.format(context="Python and Docker on AWS", job_description="Needs Python, Kubernetes, AWS")
+    status, payload, _ = fake_chat_completion(_body(prompt), FakeLLMConfig())
+    data = json.loads(payload["choices"][0]["message"]["content"])
+
+    assert status == 200
+    assert set(data["matched_skills"]) == {"Python", "AWS"}
+    assert data["missing_skills"] == ["Kubernetes"]
+    assert payload["usage"]["total_tokens"] > 0
+
+def test_responses_and_latency_are_deterministic():
+    config = FakeLLMConfig(latency="lognormal:500:0.5")
+    body = _body(GRADING_PROMPT.format(question="What is a mutex?", answer="A lock for mutual exclusion."))
+    first = fake_chat_completion(body, config)
+    second = fake_chat_completion(body, config)
+    assert first[1]["choices"] == second[1]["choices"]
+    assert first[2] == second[2] > 0
+
+def test_bulk_prompt_answers_every_candidate():
+    prompt = "evaluate MULTIPLE candidates\n-- CANDIDATE 3 --\\nPython dev\\n\\n-- CANDIDATE 7 --\\nJava dev"
+    _, payload, _ = fake_chat_completion(_body(prompt), FakeLLMConfig())
+    items = json.loads(payload["choices"][0]["message"]["content"])
+    assert [i["index"] for i in items] == [3, 7]
+    assert set(items[0]["likert_scores"]) == {"education", "experience", "skills", "projects", "certifications"}
+
+def test_error_rate_and_token_rate():
+    status, payload, _ = fake_chat_completion(_body("hello"), FakeLLMConfig(error_rate=1.0))
+    assert status in (429, 500) and "error" in payload
+
+    _, payload, delay = fake_chat_completion(_body("hello"), FakeLLMConfig(tokens_per_sec=1))
+    assert delay == payload["usage"]["completion_tokens"]
+
+def test_offline_base_url_detection():
+    assert is_offline_base_url("offline://fake/v1")
+    assert not is_offline_base_url("https://api.openai.com/v1")
+    assert not is_offline_base_url(None)
+
+def test_prompt_cache_reports_shared_prefix():
+    from app.llm_fake import prompt_cache
+    prompt_cache.reset()
+    config = FakeLLMConfig(cache_min_tokens=128)
+    prefix = "evaluate MULTIPLE candidates. " + "rubric " * 200
+    _, first, _ = fake_chat_completion(_body(prefix + "-- CANDIDATE 0 --\nPython dev"), config)
+    _, second, _ = fake_chat_completion(_body(prefix + "-- CANDIDATE 1 --\nJava dev"), config)
+    assert first["usage"]["prompt_tokens_details"]["cached_tokens"] == 0
+    cached = second["usage"]["prompt_tokens_details"]["cached_tokens"]
+    assert cached >= 256 and cached * 4 <= len(prefix)
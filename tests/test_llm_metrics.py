@@ -0,0 +1,63 @@
+from uuid import uuid4
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from app import llm_routes
+from app.llm_metrics import LLMMetricsHandler, llm_metrics, llm_context, track_usage, merge_usage, estimate_cost, current_tags
+
+def _call(handler, input_tokens, output_tokens, cached_tokens=0):
+    run_id = uuid4()
+    handler.on_chat_model_start({}, [[]], run_id=run_id)
+    message = AIMessage(content="{}", usage_metadata={
+        "input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens,
+        "input_token_details": {"cache_read": cached_tokens}
+    })
+    handler.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]), run_id=run_id)
+
+def test_handler_records_tokens_per_route_and_model():
+    llm_metrics.reset()
+    _call(LLMMetricsHandler(llm_routes.GRADING, "gpt-4o-mini"), 120, 30)
+
+    stats = llm_metrics.snapshot()[llm_routes.GRADING]["gpt-4o-mini"]
+    assert stats["calls"] == 1
+    assert stats["prompt_tokens"] == 120
+    assert stats["completion_tokens"] == 30
+    assert stats["prompt_tokens_per_call"]["buckets"]["128"] == 1
+
+def test_usage_scopes_nest_and_carry_cost():
+    with track_usage() as outer:
+        _call(LLMMetricsHandler(llm_routes.MATCHING, "gpt-4o-mini"), 1_000_000, 0)
+        with track_usage() as inner:
+            _call(LLMMetricsHandler(llm_routes.GRADING, "openai/gpt-4o-mini"), 10, 5)
+
+    assert inner.as_dict()["calls"] == 1
+    totals = outer.as_dict()
+    assert totals["calls"] == 2
+    assert totals["by_route"][llm_routes.MATCHING]["cost_usd"] == 0.15
+    assert totals["by_route"][llm_routes.GRADING]["total_tokens"] == 15
+
+def test_merge_usage_adds_routes():
+    with track_usage() as a:
+        _call(LLMMetricsHandler(llm_routes.INTERVIEW, "m"), 100, 10)
+    merged = merge_usage(a.as_dict(), a.as_dict())
+    assert merged["prompt_tokens"] == 200
+    assert merged["by_route"][llm_routes.INTERVIEW]["calls"] == 2
+    assert merge_usage(None, {})["calls"] == 0
+
+def test_llm_context_tags_are_scoped():
+    with llm_context(job_id="j1", recruiter="r"):
+        with llm_context(session_id="s1", recruiter=None):
+            assert current_tags() == {"job_id": "j1", "recruiter": "r", "session_id": "s1"}
+    assert current_tags() == {}
+
+def test_unknown_model_costs_nothing():
+    assert estimate_cost("some-local-model", 1000, 1000) == 0.0
+
+def test_cached_prompt_tokens_are_counted_and_discounted():
+    llm_metrics.reset()
+    with track_usage() as usage:
+        _call(LLMMetricsHandler(llm_routes.BULK_EVALUATION, "gpt-4o-mini"), 1_000_000, 0, cached_tokens=500_000)
+
+    totals = usage.as_dict()
+    assert totals["cached_prompt_tokens"] == 500_000
+    assert totals["cost_usd"] == 0.1125  # half at 0.15, half at the cached 0.075
+    assert llm_metrics.snapshot()[llm_routes.BULK_EVALUATION]["gpt-4o-mini"]["cache_hit_rate"] == 0.5
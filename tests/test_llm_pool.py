@@ -0,0 +1,76 @@
+import gc
+
+from app.llm_pool import LLMEndpoint, LLMEndpointPool
+
+def _pool(*weights, eject_after=2):
+    endpoints = [LLMEndpoint(name=f"e{i}", api_key="k", weight=w) for i, w in enumerate(weights)]
+    return LLMEndpointPool(endpoints, eject_after=eject_after, eject_seconds=30)
+
+def test_acquire_prefers_least_outstanding():
+    pool = _pool(1, 1)
+    first = pool.acquire()
+    second = pool.acquire()
+    assert second is not first
+
+def test_burst_of_acquires_spreads_before_any_start():
+    pool = _pool(1, 1, 1)
+    picked = [pool.acquire() for _ in range(6)]
+    assert [e.outstanding for e in pool.endpoints] == [2, 2, 2]
+    assert {e.name for e in picked} == {"e0", "e1", "e2"}
+
+def test_tracker_hands_reservation_to_first_request():
+    pool = _pool(1)
+    endpoint = pool.acquire()
+    tracker = pool.tracker(endpoint, reserved=True)
+    tracker.on_chat_model_start({}, [])
+    assert endpoint.outstanding == 1 and endpoint.total_requests == 1
+    tracker.on_llm_end(None)
+    assert endpoint.outstanding == 0
+    tracker.on_chat_model_start({}, [])
+    tracker.on_llm_error(RuntimeError("boom"))
+    assert endpoint.outstanding == 0 and endpoint.total_requests == 2
+
+def test_unused_reservation_is_released():
+    pool = _pool(1)
+    endpoint = pool.acquire()
+    tracker = pool.tracker(endpoint, reserved=True)
+    assert endpoint.outstanding == 1
+    del tracker
+    gc.collect()
+    assert endpoint.outstanding == 0
+
+def test_acquire_respects_weight():
+    pool = _pool(1, 3)
+    heavy = pool.endpoints[1]
+    pool.mark_started(heavy)
+    pool.mark_started(heavy)
+    # (2+1)/3 = 1.0 is still not worse than (0+1)/1 = 1.0 -> min picks the first
+    assert pool.acquire() is pool.endpoints[0]
+    assert pool.acquire() is heavy
+
+def test_failing_endpoint_is_ejected_and_recovers():
+    pool = _pool(1, 1)
+    bad = pool.endpoints[0]
+    for _ in range(2):
+        pool.mark_started(bad)
+        pool.mark_finished(bad, success=False)
+    assert not bad.is_healthy()
+    assert pool.acquire() is pool.endpoints[1]
+
+    bad.ejected_until = 0
+    pool.mark_started(bad)
+    pool.mark_finished(bad, success=True)
+    assert bad.is_healthy() and bad.ejections == 0
+
+def test_all_ejected_fails_open():
+    pool = _pool(1, eject_after=1)
+    only = pool.endpoints[0]
+    pool.mark_started(only)
+    pool.mark_finished(only, success=False)
+    assert pool.acquire() is only
+
+def test_from_env_parses_endpoints(monkeypatch):
+    monkeypatch.setenv("LLM_ENDPOINTS", '[{"name": "a", "api_key": "k1", "weight": 2}, {"api_key": ""}]')
+    pool = LLMEndpointPool.from_env()
+    assert [e.name for e in pool.endpoints] == ["a"]
+    assert pool.endpoints[0].weight == 2.0
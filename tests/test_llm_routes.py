@@ -0,0 +1,14 @@
+from app import llm_routes
+
+def test_env_overrides_route(monkeypatch):
+    monkeypatch.setenv("LLM_ROUTES", '{"bulk_evaluation": {"model": "gpt-4o"}}')
+    monkeypatch.setenv("LLM_ROUTE_INTERVIEW_MAX_TOKENS", "300")
+    routes = llm_routes.load_routes()
+    assert routes["bulk_evaluation"]["model"] == "gpt-4o"
+    assert routes["bulk_evaluation"]["max_tokens"] == 4000
+    assert routes["interview"]["max_tokens"] == 300
+    assert routes["role_deduction"]["model"] is None
+
+def test_unknown_route_uses_default():
+    llm_routes.reset_routes()
+    assert llm_routes.get_route("nope") == llm_routes.get_route(llm_routes.DEFAULT)
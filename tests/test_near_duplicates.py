@@ -0,0 +1,42 @@
+import app.db
+from app.db import add_candidate
+from app.near_duplicates import band_keys, estimate_jaccard, find_near_duplicates, signature
+
+RESUME = (
+    "Jane Doe. Senior backend engineer with six years of Python experience building FastAPI "
+    "services, PostgreSQL schemas and Celery pipelines. Led the migration of a monolith to "
+    "Kubernetes, mentored four engineers and owned on-call for the payments platform. "
+    "Education: BSc Computer Science, University of Leeds, 2016."
+)
+EDITED = RESUME.replace("four engineers", "five engineers") + " References available on request."
+OTHER = (
+    "John Smith. Registered nurse with ten years in intensive care and emergency medicine, "
+    "trained in triage, ventilator management and patient education. Nursing degree, 2012."
+)
+
+def test_signature_estimates_jaccard():
+    assert estimate_jaccard(signature(RESUME), signature(RESUME)) == 1.0
+    assert estimate_jaccard(signature(RESUME), signature(EDITED)) > 0.6
+    assert estimate_jaccard(signature(RESUME), signature(OTHER)) < 0.1
+    assert len(band_keys(signature(RESUME))) == 32
+
+def test_find_near_duplicates_within_and_across_uploads(monkeypatch):
+    stored = {"cand-1": (band_keys(signature(OTHER)), signature(OTHER))}
+    monkeypatch.setattr(app.db, "get_minhash_matches", lambda keys, recruiter=None, job_description=None: {
+        cid: ([k for k in cand_keys if k in keys], sig) for cid, (cand_keys, sig) in stored.items()
+    })
+    sigs = [signature(t) for t in (RESUME, RESUME, OTHER, "")]
+    found = find_near_duplicates("alice", sigs, threshold=0.8)
+
+    assert found[0] is None
+    assert found[1] == ("upload:0", 1.0)
+    assert found[2] == ("cand-1", 1.0)
+    assert found[3] is None  # no words, never a duplicate
+
+def test_stored_resume_only_matches_uploads_for_the_same_jd(temp_db):
+    add_candidate(name="jane.pdf", resume_text=RESUME, jd="Backend engineer", match_score=70.0, matched_skills=[],
+                  missing_skills=[], recruiter_username="alice", minhash=signature(RESUME))
+    cid, jaccard = find_near_duplicates("alice", [signature(RESUME)], job_description="Backend engineer")[0]
+    assert jaccard == 1.0
+    assert find_near_duplicates("alice", [signature(RESUME)], job_description="Data engineer") == [None]
+    assert find_near_duplicates("bob", [signature(RESUME)], job_description="Backend engineer") == [None]
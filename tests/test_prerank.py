@@ -0,0 +1,22 @@
+import numpy as np
+from app.prerank import bm25_scores, prerank, select_for_llm
+
+JD = "Backend engineer: Python, Django, PostgreSQL, Docker"
+RESUMES = [
+    "Python Django developer, PostgreSQL and Docker in production",
+    "Python scripting",
+    "Pastry chef with ten years in French kitchens",
+]
+
+def test_prerank_orders_by_relevance():
+    scores = prerank(JD, RESUMES)
+    assert scores[0] == 100.0
+    assert scores[0] > scores[1] > scores[2] == 0.0
+    assert np.all(bm25_scores("", RESUMES) == 0)
+
+def test_select_top_k_and_floor():
+    scores = np.array([10.0, 90.0, 50.0, 70.0])
+    assert select_for_llm(scores, top_k=2).tolist() == [False, True, False, True]
+    assert select_for_llm(scores, min_score=50).tolist() == [False, True, True, True]
+    assert select_for_llm(scores, top_k=3, min_score=60).tolist() == [False, True, False, True]
+    assert select_for_llm(scores).all()
@@ -0,0 +1,67 @@
+import json
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import app.rescore as rescore
+from app.db import upsert_role_template
+from app.models.models import RoleTemplate
+from app.role_templates import template_exists
+
+TEMPLATE = ({"parameters": {"education": 0.2, "experience": 0.2, "skills": 0.2, "projects": 0.2, "certifications": 0.2}},
+            {"shortlist": 80, "interview": 50})
+
+def _row(cid, likert, status="Shortlisted", interview_enabled=True, resume_threshold=None):
+    evaluation = {"likert_scores": dict(zip(rescore.LIKERT_FIELDS, likert))} if likert else {"prerank_score": 12.0}
+    return {"id": cid, "status": status, "interview_enabled": interview_enabled, "interview_score": 0.0,
+            "template_key": "junior", "resume_threshold": resume_threshold, "resume_evaluation_data": json.dumps(evaluation)}
+
+def test_rescore_is_vectorized_and_bulk_written(monkeypatch):
+    rows = [
+        _row("a", [5, 5, 5, 5, 5]),
+        _row("b", [2, 2, 2, 2, 2]),
+        _row("c", [3, 3, 3, 3, 3], interview_enabled=False, status="Rejected (Resume)"),
+        _row("d", [5, 5, 5, 5, 5], status="completed"),
+        _row("e", None, status="Screened Out (Pre-rank)"),
+    ]
+    written = []
+    monkeypatch.setattr(rescore, "get_candidates_for_rescore", lambda user, job_id=None: rows)
+    monkeypatch.setattr(rescore, "bulk_update_candidates", lambda mappings: written.extend(mappings))
+    monkeypatch.setattr(rescore, "load_template", lambda key, user=None: TEMPLATE)
+
+    summary = rescore.rescore_candidates("alice")
+    by_id = {m["id"]: m for m in written}
+
+    assert summary["rescored"] == 4 and summary["skipped"] == 1
+    assert by_id["a"]["match_score"] == 100.0 and by_id["a"]["status"] == "Shortlisted"
+    assert by_id["b"]["match_score"] == 40.0 and by_id["b"]["status"] == "Rejected"
+    assert by_id["c"]["status"] == "Selected (Resume)" and by_id["c"]["final_score"] == 60.0
+    assert "status" not in by_id["d"]  # post-interview status is left alone
+    assert json.loads(by_id["b"]["resume_evaluation_data"])["decision"] == "Weak Resume – Reject"
+
+def test_rescore_keeps_each_candidates_upload_threshold(monkeypatch):
+    # 60 passes the template's interview threshold (50) but not the 70 the upload used
+    rows = [_row("a", [3, 3, 3, 3, 3], resume_threshold=70.0), _row("b", [3, 3, 3, 3, 3])]
+    written = []
+    monkeypatch.setattr(rescore, "get_candidates_for_rescore", lambda user, job_id=None: rows)
+    monkeypatch.setattr(rescore, "bulk_update_candidates", lambda mappings: written.extend(mappings))
+    monkeypatch.setattr(rescore, "load_template", lambda key, user=None: TEMPLATE)
+
+    rescore.rescore_candidates("alice")
+    by_id = {m["id"]: m for m in written}
+    assert by_id["a"]["status"] == "Rejected" and by_id["b"]["status"] == "Shortlisted"
+    assert "resume_threshold" not in by_id["a"]
+
+    written.clear()
+    rescore.rescore_candidates("alice", resume_threshold=55)
+    assert all(m["status"] == "Shortlisted" and m["resume_threshold"] == 55.0 for m in written)
+
+def test_template_keys_are_validated_and_unique_per_recruiter(temp_db):
+    upsert_role_template("data", {"skills": 1.0}, {"shortlist": 80, "interview": 50}, recruiter_username="alice")
+    assert template_exists("senior") and template_exists("data", "alice")
+    assert not template_exists("data", "bob") and not template_exists("sneior", "alice")
+
+    with Session(temp_db) as session:
+        session.add(RoleTemplate(key="data", recruiter_username="alice"))
+        with pytest.raises(IntegrityError):
+            session.commit()
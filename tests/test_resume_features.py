@@ -0,0 +1,21 @@
+from app.resume_features import extract_candidate_features
+
+RESUME = (
+    "Jane Doe jane.doe@example.com +91 98765 43210 EDUCATION B.Tech Computer Science, IIT Delhi 2012 - 2016 "
+    "EXPERIENCE Backend Engineer, Acme 2016 - 2020 Senior Engineer, Globex 2020 - 2024 "
+    "SKILLS Languages: Python, Go; Docker | Kubernetes and PostgreSQL"
+)
+
+def test_extracts_structured_features():
+    f = extract_candidate_features(RESUME, ["Python", "AWS", "Kubernetes"])
+    assert f["email"] == "jane.doe@example.com"
+    assert f["phone"].replace(" ", "") == "+919876543210"
+    assert f["skills"] == ["Python", "Go", "Docker", "Kubernetes", "PostgreSQL"]
+    assert f["degree_level"] == 4 and f["education"][0]["year"] == "2012"
+    assert [e["duration"] for e in f["experience"]] == ["2016 - 2020", "2020 - 2024"]
+    assert f["experience"][1]["description"] == "Senior Engineer, Globex"
+    assert f["total_years"] == 8
+
+def test_empty_resume():
+    f = extract_candidate_features("", ["Python"])
+    assert f["email"] == "" and f["skills"] == [] and f["experience"] == [] and f["degree_level"] == 1
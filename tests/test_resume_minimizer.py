@@ -0,0 +1,48 @@
+from app.resume_minimizer import minimize_resume, savings
+
+PAGE_1 = """Jane Doe
+jane@x.com | +91 98765 43210 | linkedin.com/in/jane
+Acme Resume - Confidential
+EXPERIENCE
+Backend Engineer, Acme 2016 - 2020
+- Built APIs in Python
+- Built APIs in Python
+Page 1 of 2"""
+PAGE_2 = "Acme Resume - Confidential\nPROJECTS\n" + "\n".join(f"- Project {i}" for i in range(12)) + """
+HOBBIES
+Cricket, chess
+SKILLS
+Python, Docker
+Page 2 of 2"""
+
+def test_minimizer_strips_noise_and_keeps_signal():
+    out = minimize_resume([PAGE_1, PAGE_2]).splitlines()
+
+    assert out[:2] == ["Jane Doe", "Contact: jane@x.com | +91 98765 43210 | linkedin.com/in/jane"]
+    assert "Acme Resume - Confidential" not in out
+    assert not any(line.startswith("Page") for line in out)
+    assert out.count("- Built APIs in Python") == 1
+    assert "Backend Engineer, Acme 2016 - 2020" in out  # dates are not phone numbers
+    assert "- Project 7" in out and "- Project 8" not in out
+    assert "Cricket, chess" not in out
+    assert out[-2:] == ["SKILLS", "Python, Docker"]
+
+def test_savings_report():
+    report = savings(PAGE_1 + PAGE_2, minimize_resume([PAGE_1, PAGE_2]))
+    assert report["saved_tokens"] > 0 and 0 < report["saved_pct"] < 100
+
+def test_address_words_in_experience_bullets_are_kept():
+    bullets = [
+        "- Built a zip compression service for log archives",
+        "- Designed IP address management for 40k devices",
+        "- Led Road Safety analytics for the state transport board",
+        "- Implemented PIN verification for card payments",
+        "- Street-level demand forecasting with XGBoost",
+    ]
+    page = "\n".join(["Jane Doe", "Address: 12 MG Road, Bengaluru, Pin 560001", "jane@x.com", "EXPERIENCE", *bullets,
+                      "Flat 4, 221B Baker Street, NW1 6XE"])
+    out = minimize_resume([page]).splitlines()
+
+    # A bare address line is collapsed into the contact line wherever it is
+    assert out[:2] == ["Jane Doe", "Contact: jane@x.com | 12 MG Road, Bengaluru, Pin 560001, Flat 4, 221B Baker Street, NW1 6XE"]
+    assert out[2:] == ["EXPERIENCE", *bullets]
@@ -0,0 +1,27 @@
+from app.role_classifier import classify_role, seniority
+from app.role_templates import resolve_template_key
+
+def test_explicit_title_wins():
+    guess = classify_role("We are hiring a Senior Data Engineer to build Spark pipelines.")
+    assert (guess.title, guess.template_key, guess.source) == ("Senior Data Engineer", "senior", "title")
+    assert guess.confidence >= 0.9
+
+def test_centroid_from_skills_only():
+    guess = classify_role("You will build UI components with React, TypeScript, CSS and Redux.")
+    assert guess.title == "Frontend Developer"
+    assert guess.source == "centroid" and guess.confidence > 0.25
+
+def test_seniority_and_template_key_agree():
+    assert seniority("Internship: pandas and statistics") == "intern"
+    assert seniority("Kubernetes, Terraform, AWS. 6+ years required") == "senior"
+    guess = classify_role("Internship: pandas, scikit-learn regression models and statistics")
+    assert guess.title == "Data Scientist Intern"
+    assert resolve_template_key(guess.title) == guess.template_key == "intern"
+
+def test_unrelated_text_has_no_confidence():
+    assert classify_role("great team player with good communication").confidence == 0.0
+
+def test_manager_alone_is_not_seniority():
+    assert classify_role("Product Manager to own the roadmap and user stories").template_key == "junior"
+    assert seniority("Backend developer, reporting to the hiring manager") == "junior"
+    assert seniority("Engineering Manager, platform team") == "senior"
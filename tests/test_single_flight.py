@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+from app.single_flight import SingleFlight, prompt_key
+from app.interview_prompts import ROLE_DEDUCTION_PROMPT
+
+class MemoryStore:
+    """Stand-in for RedisClient's JSON/lock helpers, shared by two 'workers'."""
+    client = True
+
+    def __init__(self):
+        self.data = {}
+
+    def get_json(self, key): return self.data.get(key)
+    def set_json(self, key, data, expire=60): self.data[key] = data
+
+    def acquire_lock(self, key, token, expire=120):
+        if key in self.data: return False
+        self.data[key] = token
+        return True
+
+    def release_lock(self, key, token):
+        if self.data.get(key) == token: del self.data[key]
+
+def test_concurrent_async_calls_share_one_execution():
+    flight, calls = SingleFlight(result_ttl=0), []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "Data Engineer"
+
+    async def run():
+        return await asyncio.gather(*[flight.do("k", slow) for _ in range(5)])
+
+    assert asyncio.run(run()) == ["Data Engineer"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"executed": 1, "coalesced": 4, "shared_across_workers": 0}
+
+def test_sync_calls_coalesce_and_errors_propagate():
+    flight, results = SingleFlight(result_ttl=0), []
+
+    def slow():
+        time.sleep(0.05)
+        raise RuntimeError("provider down")
+
+    def worker():
+        try: flight.do_sync("k", slow)
+        except RuntimeError as e: results.append(str(e))
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert results == ["provider down"] * 3
+    assert flight.stats()["executed"] == 1
+
+def test_result_shared_across_workers_via_store():
+    store = MemoryStore()
+    worker_a, worker_b = SingleFlight(store=store), SingleFlight(store=store)
+    key = prompt_key("role_deduction", ROLE_DEDUCTION_PROMPT, {"job_description": "Senior Data Engineer"})
+
+    assert worker_a.do_sync(key, lambda: "Senior Data Engineer") == "Senior Data Engineer"
+    assert asyncio.run(worker_b.do(key, lambda: asyncio.sleep(0, "unused"))) == "Senior Data Engineer"
+    assert worker_b.stats()["shared_across_workers"] == 1
+    assert not any(k.startswith("llm:sf:lock") for k in store.data)
+
+def test_async_store_round_trips_leave_the_event_loop_free():
+    ticks, seen = [], []
+
+    class SlowStore(MemoryStore):
+        def get_json(self, key):
+            time.sleep(0.1)  # a slow Redis round trip
+            seen.append(len(ticks))
+            return super().get_json(key)
+
+    flight = SingleFlight(store=SlowStore())
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(1)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(flight.do("k", lambda: asyncio.sleep(0, "value")), ticker())
+
+    asyncio.run(run())
+    assert seen[0] >= 3  # the ticker kept running during the lookup
+
+def test_unreachable_store_runs_the_call_at_once():
+    class DownStore(MemoryStore):
+        def acquire_lock(self, key, token, expire=120): return None  # connection error
+
+    store = DownStore()
+    flight, start = SingleFlight(store=store), time.monotonic()
+    assert flight.do_sync("k", lambda: "sync") == "sync"
+    assert asyncio.run(flight.do("k", lambda: asyncio.sleep(0, "async"))) == "async"
+    assert time.monotonic() - start < 1 and store.data == {}
+    assert flight.stats()["executed"] == 2
@@ -0,0 +1,56 @@
+import app.db
+from app.db import add_candidate, backfill_candidate_skills, get_leaderboard, skill_facets
+from app.models.models import CandidateSkill
+from app.skill_index import canonical_skill, canonical_skills
+
+def _add(name, skills, recruiter="alice"):
+    return add_candidate(name=name, resume_text=name, jd="jd", match_score=50.0, matched_skills=skills,
+                         missing_skills=[], recruiter_username=recruiter)
+
+def test_aliases_share_one_canonical_name():
+    assert canonical_skill("JS") == canonical_skill("Javascript") == canonical_skill("JavaScript ") == "javascript"
+    assert canonical_skill("K8s") == "kubernetes" and canonical_skill("Golang") == "go"
+    assert canonical_skill(".NET") == ".net" and canonical_skill("Node.js.") == "node.js"
+    assert canonical_skills(["Python", "python3", "", "React.js", "react"]) == ["python", "react"]
+
+def test_skill_facets_combine_has_and_lacks(temp_db):
+    a = _add("a", ["Python", "Django", "AWS"])
+    b = _add("b", ["Python", "JS"])
+    c = _add("c", ["JavaScript", "React"])
+    _add("bob's", ["Python", "Django"], recruiter="bob")
+
+    everyone = skill_facets("alice")
+    assert everyone["total"] == 3
+    assert everyone["facets"][:2] == [{"skill": "javascript", "count": 2}, {"skill": "python", "count": 2}]
+
+    # GROUP BY / HAVING: every skill in `has`, aliases included
+    both = skill_facets("alice", has=["python", "js"])
+    assert both["candidate_ids"] == [b] and both["filters"]["has"] == ["python", "javascript"]
+    # EXCEPT: none of the skills in `lacks`
+    assert sorted(skill_facets("alice", has=["Python"], lacks=["django"])["candidate_ids"]) == [b]
+    assert sorted(skill_facets("alice", lacks=["Python"])["candidate_ids"]) == [c]
+    # counts are over the matching candidates only, and never include another recruiter's
+    facets = {f["skill"]: f["count"] for f in skill_facets("alice", has=["python"])["facets"]}
+    assert facets == {"python": 2, "django": 1, "aws": 1, "javascript": 1}
+    assert skill_facets("alice", has=["python"], facet_limit=1)["facets"] == [{"skill": "python", "count": 2}]
+    assert a in skill_facets("alice", has=["aws"])["candidate_ids"]
+
+def test_leaderboard_skill_filter_uses_canonical_names(temp_db):
+    _add("js", ["JavaScript"])
+    _add("py", ["Python"])
+    _add("bob-js", ["JS"], recruiter="bob")
+    assert [c["name"] for c in get_leaderboard("alice", skill="js")] == ["js"]
+    assert [c["name"] for c in get_leaderboard("alice", skill="Golang")] == []
+
+def test_backfill_indexes_candidates_once(temp_db):
+    _add("a", ["Python", "K8s"])
+    _add("b", ["Go"], recruiter="bob")
+    session = app.db.get_db_session()
+    session.query(CandidateSkill).delete()
+    session.commit()
+
+    assert backfill_candidate_skills() == 3
+    rows = {(r.recruiter_username, r.skill) for r in session.query(CandidateSkill).all()}
+    session.close()
+    assert rows == {("alice", "python"), ("alice", "kubernetes"), ("bob", "go")}
+    assert backfill_candidate_skills() == 0  # no-op once the index has rows
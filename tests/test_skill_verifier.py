@@ -0,0 +1,31 @@
+from app.skill_verifier import SkillVerifier, verify_skills, verify_skills_batch
+
+RESUME = "Built services in C++ and C# on .NET 6; front-end in Node.js. Spring  Boot microservices, some Javascript."
+
+def test_symbol_skills_and_word_boundaries():
+    present, absent = verify_skills(["C++", "C#", ".NET", "Node.js", "Java", "C", "Spring Boot"], RESUME)
+    assert present == ["C++", "C#", ".NET", "Node.js", "Spring Boot"]
+    assert absent == ["Java", "C"]
+
+def test_nested_and_overlapping_skills():
+    verifier = SkillVerifier(["Spring", "Spring Boot", "Machine Learning", "Learning Systems"])
+    assert verifier.found("spring boot and machine learning systems") == {
+        "spring", "spring boot", "machine learning", "learning systems"
+    }
+
+def test_batch_verification_matches_single():
+    skills = ["Python", "AWS", "Go"]
+    texts = ["Python on AWS", "Golang and Go modules", ""]
+    assert verify_skills_batch(skills, texts) == [verify_skills(skills, t) for t in texts]
+    assert verify_skills_batch(skills, texts)[1] == (["Go"], ["Python", "AWS"])
+
+def test_upload_matches_need_llm_evidence_the_text_supports():
+    from app.jobs import _split_skills
+    required = ["Python", "C++", "Kubernetes", "Go"]
+    in_text = verify_skills(required, "Python and C++ services; Kubernetes mentioned once. Go")[0]
+    # Kubernetes appears in the text, but the LLM didn't cite it
+    matched, missing = _split_skills(required, ["python", "C++", "go", "Rust"], in_text)
+    assert matched == ["Python", "C++", "Go"] and missing == ["Kubernetes"]
+    # Kubernetes is cited, but the resume doesn't support it
+    matched, missing = _split_skills(required, ["Python", "Kubernetes"], verify_skills(required, "Python only")[0])
+    assert matched == ["Python"] and missing == ["C++", "Kubernetes", "Go"]
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+from app.encoders import HashingEncoder
+from app.vector_index import VectorIndexService, _Partition
+
+def test_partition_returns_top_k_by_cosine():
+    partition = _Partition(4, mode="none")
+    vectors = np.array([[1, 0, 0, 0], [0.8, 0.6, 0, 0], [0, 1, 0, 0]], dtype=np.float32)
+    assert partition.add(["a", "b", "c"], vectors) == 3
+    assert partition.add(["a"], vectors[:1]) == 0  # already indexed
+
+    hits = partition.search(np.array([[1, 0, 0, 0], [0, 1, 0, 0]]), k=2)
+    assert [cid for cid, _ in hits[0]] == ["a", "b"]
+    assert [cid for cid, _ in hits[1]] == ["c", "b"]
+    assert abs(hits[0][1][1] - 0.8) < 1e-6
+
+def test_add_only_reaches_loaded_partitions(tmp_path, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_STORE_DIR", str(tmp_path))
+    encoder = HashingEncoder(32)
+    service = VectorIndexService()
+    service.partition("alice", encoder)  # empty store: nothing read from the DB
+    service.add("alice", ["c1"], encoder.encode(["python developer"]), encoder)
+    service.add("bob", ["c2"], encoder.encode(["java developer"]), encoder)
+
+    stats = {p["recruiter"]: p["vectors"] for p in service.stats()["partitions"]}
+    assert stats == {"alice": 1}
+    assert service.search("alice", encoder.encode(["python developer"]), encoder)[0][0][0] == "c1"
+
+def test_find_duplicates_flags_repeats_within_an_upload(tmp_path, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_STORE_DIR", str(tmp_path))
+    import app.embeddings as embeddings
+    monkeypatch.setattr(embeddings, "sync_store", lambda encoder=None: 0)
+    monkeypatch.setattr(embeddings, "vector_index", VectorIndexService())
+    encoder = HashingEncoder(256)
+    texts = [
+        "Senior Python engineer, FastAPI and PostgreSQL, 6 years",
+        "Registered nurse, ICU and emergency care",
+        "Senior Python engineer, FastAPI and PostgreSQL, 6 years",
+    ]
+    found = embeddings.find_duplicates("alice", encoder.encode(texts), encoder, threshold=0.9)
+    assert found[0] is None and found[1] is None
+    assert found[2][0] == "upload:0" and found[2][1] > 0.99
+
+def test_search_candidates_ranks_the_pool_for_a_query(monkeypatch):
+    import app.embeddings as embeddings
+    encoder = HashingEncoder(256)
+    service = VectorIndexService()
+    monkeypatch.setattr(embeddings, "sync_store", lambda encoder=None: 0)
+    monkeypatch.setattr(embeddings, "vector_index", service)
+    monkeypatch.setattr(service, "partition", lambda recruiter, enc: partition)
+    partition = _Partition(encoder.dim)
+    partition.add(["py", "nurse"], encoder.encode(["Python FastAPI backend developer", "ICU registered nurse"]))
+
+    hits = embeddings.search_candidates("alice", "backend engineer with Python", k=2, encoder=encoder)
+    assert [cid for cid, _ in hits] == ["py", "nurse"]
+    assert embeddings.search_candidates("alice", "  ", encoder=encoder) == []
+
+def test_int8_partition_rescores_from_the_store(tmp_path):
+    from app.embedding_store import EmbeddingStore
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((500, 32)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"c{i}" for i in range(500)]
+    store = EmbeddingStore(str(tmp_path), 32)
+    store.add(ids, ["-"] * 500, vectors)
+    exact, quantized = _Partition(32, mode="none"), _Partition(32, store=store, mode="int8")
+    exact.add(ids, vectors)
+    quantized.add(ids, vectors)
+
+    expected, got = exact.search(vectors[:5], 10), quantized.search(vectors[:5], 10)
+    assert [[cid for cid, _ in hits] for hits in got] == [[cid for cid, _ in hits] for hits in expected]
+    assert abs(got[0][0][1] - 1.0) < 1e-3  # exact (float16) score, not the int8 estimate
+    assert quantized.memory_bytes() < exact.memory_bytes() / 3
+
+def test_partition_is_rebuilt_after_the_store_is_cleared(tmp_path, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_STORE_DIR", str(tmp_path))
+    from app.embedding_store import get_store
+    encoder = HashingEncoder(32)
+    service = VectorIndexService()
+    first = service.partition("alice", encoder)
+    service.add("alice", ["c1"], encoder.encode(["python developer"]), encoder)
+    get_store(encoder).clear()  # as another worker's DELETE /candidates would
+    rebuilt = service.partition("alice", encoder)
+    assert rebuilt is not first and len(rebuilt) == 0
+
+def test_faiss_int8_range_is_not_learned_from_the_first_batch(monkeypatch):
+    pytest.importorskip("faiss")
+    monkeypatch.setenv("VECTOR_INDEX_HNSW_MIN", "3")
+    partition = _Partition(8, mode="int8")
+    eye = np.eye(8, dtype=np.float32)
+    partition.add(["a"], eye[:1])  # a first batch that only spans dimension 0
+    partition.add(["b"], eye[1:2])
+    hits = partition.search(eye[1:2], k=1)[0]
+    assert hits[0][0] == "b" and abs(hits[0][1] - 1.0) < 0.02
+
+    partition.add(["c"], -eye[2:3])  # switches to HNSW with the same fixed range
+    assert partition.kind == "hnsw"
+    hits = partition.search(-eye[2:3], k=1)[0]
+    assert hits[0][0] == "c" and abs(hits[0][1] - 1.0) < 0.02